@@ -0,0 +1,3 @@
+"""
+Offline micro-benchmarks for the MCP server.
+"""
@@ -0,0 +1,80 @@
+"""
+Run the micro-benchmarks and compare them with the stored baseline.
+
+    python -m benchmarks                      # run all, compare with baselines.json
+    python -m benchmarks -k email             # only benchmarks whose name contains "email"
+    python -m benchmarks --save-baseline      # record the results as the new baseline
+    python -m benchmarks --threshold 0.1      # flag slowdowns beyond 10%
+
+Exits with status 1 when a benchmark regressed beyond the threshold.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from . import suite  # noqa: F401  (registers the benchmarks)
+from .harness import (
+    BENCHMARKS,
+    DEFAULT_BASELINE,
+    compare,
+    environment,
+    format_report,
+    load_baseline,
+    run,
+    save_baseline,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the MCP server")
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown flagged as a regression (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="Rounds per benchmark (default: 5)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Seconds per round at least (default: 0.1)")
+    parser.add_argument("--json", type=Path, help="Also write the comparison as JSON to this path")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    # Logging calls stay in the measured code, but nothing is printed
+    logging.basicConfig(level=logging.CRITICAL)
+
+    selected = [bench for name, bench in BENCHMARKS.items() if args.filter in name]
+    if args.list:
+        print("\n".join(bench.name for bench in selected))
+        return 0
+    if not selected:
+        print(f"No benchmark matches {args.filter!r}", file=sys.stderr)
+        return 2
+
+    results = []
+    for bench in selected:
+        print(f"running {bench.name}...", file=sys.stderr)
+        results.append(run(bench, repeat=args.repeat, min_time=args.min_time))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is not None and baseline["environment"] != environment():
+        print(
+            "warning: baseline was recorded on a different machine or Python "
+            f"({baseline['environment']}); regressions are not flagged, "
+            "re-record it here with --save-baseline",
+            file=sys.stderr,
+        )
+    rows = compare(results, baseline, args.threshold)
+    print(format_report(rows, args.threshold))
+    if args.json:
+        args.json.write_text(json.dumps({"environment": environment(), "results": rows}, indent=2))
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Timing, baselines and regression reports for the micro-benchmarks.
+
+A benchmark is a factory registered with ``@benchmark``. The factory is
+called once per round to set up fresh state and returns the operation to
+time (a plain function or a coroutine function). Each round runs the
+operation ``number`` times, calibrated so a round takes at least
+``min_time`` seconds unless the benchmark fixes it, with the garbage
+collector paused as ``timeit`` does. The best round is reported: on a quiet
+machine it is the most repeatable figure.
+
+Baselines are stored as JSON next to this file and are local-only: timings
+only compare within one machine and Python version, so the file is not
+committed, it records both, and ``compare`` does not flag regressions
+against a baseline recorded elsewhere.
+"""
+
+import asyncio
+import gc
+import inspect
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+
+Operation = Callable[[], Any]
+Factory = Callable[[], Operation]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    factory: Factory
+    number: Optional[int] = None
+
+
+@dataclass
+class Result:
+    name: str
+    number: int
+    rounds: list[float]  # nanoseconds per operation, one entry per round
+
+    @property
+    def best(self) -> float:
+        return min(self.rounds)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.rounds)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ns_per_op": round(self.best, 1),
+            "median_ns_per_op": round(self.median, 1),
+            "number": self.number,
+            "rounds": len(self.rounds),
+        }
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: Optional[int] = None) -> Callable[[Factory], Factory]:
+    """Register a benchmark factory under ``name``."""
+
+    def register(factory: Factory) -> Factory:
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark: {name}")
+        BENCHMARKS[name] = Benchmark(name, factory, number)
+        return factory
+
+    return register
+
+
+def _time_sync(operation: Operation, number: int) -> int:
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        operation()
+    return time.perf_counter_ns() - start
+
+
+async def _time_async(operation: Operation, number: int) -> int:
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        await operation()
+    return time.perf_counter_ns() - start
+
+
+def _time_round(bench: Benchmark, number: int) -> int:
+    operation = bench.factory()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if inspect.iscoroutinefunction(operation):
+            return asyncio.run(_time_async(operation, number))
+        return _time_sync(operation, number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def run(bench: Benchmark, repeat: int = 5, min_time: float = 0.1) -> Result:
+    """Time ``bench`` over ``repeat`` rounds."""
+    number = bench.number
+    if number is None:
+        # Same progression as timeit's autorange: 1, 2, 5, 10, 20, 50...
+        scale = 1
+        while True:
+            number = next(
+                (n * scale for n in (1, 2, 5) if _time_round(bench, n * scale) >= min_time * 1e9),
+                None,
+            )
+            if number is not None:
+                break
+            scale *= 10
+    rounds = [_time_round(bench, number) / number for _ in range(repeat)]
+    return Result(bench.name, number, rounds)
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def load_baseline(path: Path) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: list[Result], merge: bool = True) -> None:
+    """Write ``results`` as the baseline, keeping other benchmarks' entries."""
+    previous = load_baseline(path) if merge else None
+    benchmarks = dict(previous["benchmarks"]) if previous else {}
+    benchmarks.update({result.name: result.to_dict() for result in results})
+    path.write_text(json.dumps(
+        {"environment": environment(), "benchmarks": dict(sorted(benchmarks.items()))},
+        indent=2,
+    ) + "\n")
+
+
+def compare(
+    results: list[Result], baseline: Optional[dict[str, Any]], threshold: float
+) -> list[dict[str, Any]]:
+    """
+    Compare results with the baseline.
+
+    Args:
+        results: Fresh timings
+        baseline: Contents of the baseline file, if any
+        threshold: Relative slowdown (e.g. 0.2 for 20%) reported as a regression
+
+    Returns:
+        One row per result with ``status`` ``ok``, ``regression``,
+        ``improvement`` or ``new``, or ``skipped`` when the baseline was
+        recorded on another machine or Python
+    """
+    stored = baseline["benchmarks"] if baseline else {}
+    comparable = baseline is None or baseline.get("environment") == environment()
+    rows = []
+    for result in results:
+        row: dict[str, Any] = {"name": result.name, "ns_per_op": round(result.best, 1)}
+        if result.name not in stored:
+            row["status"] = "new"
+        else:
+            before = stored[result.name]["ns_per_op"]
+            change = result.best / before - 1
+            row["baseline_ns_per_op"] = before
+            row["change"] = round(change, 4)
+            if not comparable:
+                row["status"] = "skipped"
+            elif change > threshold:
+                row["status"] = "regression"
+            elif change < -threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def _format_ns(value: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.1f} ns"
+
+
+def format_report(rows: list[dict[str, Any]], threshold: float) -> str:
+    lines = [f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'change':>9}  status"]
+    for row in rows:
+        baseline = _format_ns(row["baseline_ns_per_op"]) if "baseline_ns_per_op" in row else "-"
+        change = f"{row['change']:+.1%}" if "change" in row else "-"
+        status = row["status"].upper() if row["status"] == "regression" else row["status"]
+        lines.append(
+            f"{row['name']:<40}{baseline:>12}{_format_ns(row['ns_per_op']):>12}{change:>9}  {status}"
+        )
+    regressions = sum(row["status"] == "regression" for row in rows)
+    lines.append(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return "\n".join(lines)
@@ -0,0 +1,60 @@
+"""
+Compare per-call overhead of the dependency-injecting tool wrapper.
+
+Run with:
+
+    python -m benchmarks.wrapper_overhead
+
+The registry wrapper's own timing is tracked against the stored baseline by
+the suite (``python -m benchmarks -k wrapper``).
+"""
+
+import asyncio
+import time
+
+from src.mcp_tools import DEPENDENCIES, make_wrapper
+
+CALLS = 100_000
+
+
+async def sample_action(
+    recipients: list, subject: str, postmark_api_key: str, sender_email: str
+) -> int:
+    return len(recipients)
+
+
+def legacy_wrapper(action_func, dependencies: dict):
+    """The wrapper as it was before the dependency registry: update kwargs per call."""
+    wanted = {name: value for name, value in dependencies.items()}
+
+    async def wrapper(**kwargs):
+        kwargs.update(wanted)
+        return await action_func(**kwargs)
+
+    return wrapper
+
+
+async def _time_calls(wrapper) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await wrapper(recipients=["a@example.com"], subject="Hello")
+    return (time.perf_counter() - start) / CALLS * 1e9
+
+
+async def main() -> None:
+    values = {"postmark_api_key": "key", "sender_email": "from@example.com"}
+    DEPENDENCIES.update(values)
+
+    legacy = legacy_wrapper(sample_action, values)
+    registry = make_wrapper(sample_action)
+
+    # Best of several rounds to smooth out scheduler noise
+    baseline = min([await _time_calls(legacy) for _ in range(5)])
+    current = min([await _time_calls(registry) for _ in range(5)])
+
+    print(f"legacy wrapper:   {baseline:8.1f} ns/call")
+    print(f"registry wrapper: {current:8.1f} ns/call ({current / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,24 +2,25 @@
 Simplified MCP server reference implementation.
 
 This server demonstrates a minimal MCP setup with email sending capability.
+
+Heavy dependencies (pydantic-settings, mcp, starlette, uvicorn) are imported
+inside ``main`` so each startup phase can be timed with ``--profile-startup``.
 """
 
 import argparse
 import logging
+import math
+import os
+from pathlib import Path
 from typing import cast
 
-import uvicorn
-
-from src.config import load_config
-from src.mcp_tools import MCPServer, register_tools
+from src.startup import StartupProfiler
 
 
 def setup_logging(
     log_level: str = "INFO", file_logging: bool = False, logs_dir: str = "logs"
 ) -> logging.Logger:
     """Configure application logging with optional file logging."""
-    from pathlib import Path
-
     # Configure formatters
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -60,15 +61,32 @@ def main():
         parser.add_argument("--host", default="0.0.0.0")
         parser.add_argument("--port", type=int, default=8080)
         parser.add_argument("--log-level", default=None, help="Override log level")
+        parser.add_argument(
+            "--profile-startup",
+            action="store_true",
+            default=os.getenv("MCP_STARTUP_PROFILE", "").lower() == "true",
+            help="Log import and initialization timings per startup phase",
+        )
+        parser.add_argument(
+            "--profile-startup-output",
+            type=Path,
+            default=None,
+            help="Also write the startup profile as JSON to this path",
+        )
         args = parser.parse_args()
+        profiler = StartupProfiler(enabled=args.profile_startup)
 
         # Load configuration
-        config = load_config()
+        with profiler.phase("config_load"):
+            from src.config import load_config
+
+            config = load_config()
 
         # Set up logging (after secrets are loaded, set appropriate log level)
-        log_level = args.log_level or config.LOG_LEVEL
-        logger = setup_logging(log_level, config.FILE_LOGGING, config.LOGS_DIR)
-        
+        with profiler.phase("logging_setup"):
+            log_level = args.log_level or config.LOG_LEVEL
+            logger = setup_logging(log_level, config.FILE_LOGGING, config.LOGS_DIR)
+
         # Ensure logging level is appropriate after secrets are loaded
         if log_level.upper() == "DEBUG":
             logger.warning("DEBUG logging enabled - ensure no secrets are logged")
@@ -76,25 +94,65 @@ def main():
         if args.log_level:
             logger.info(f"Log level overridden to {args.log_level.upper()}")
 
+        if config.TRACING_SAMPLE_RATIO > 0:
+            with profiler.phase("tracing_setup"):
+                from src.tracing import (
+                    FileSpanExporter,
+                    InMemorySpanExporter,
+                    configure_tracing,
+                )
+
+                if config.TRACING_EXPORTER == "memory":
+                    exporter = InMemorySpanExporter()
+                else:
+                    trace_file = config.TRACING_FILE or Path(config.LOGS_DIR) / "traces.jsonl"
+                    exporter = FileSpanExporter(Path(trace_file))
+                configure_tracing(config.TRACING_SAMPLE_RATIO, exporter)
+                logger.info(f"Tracing enabled: {config.TRACING_EXPORTER} exporter")
+
         # Initialize MCP server
         logger.info("Initializing MCP server")
-        mcp_server = MCPServer(api_key=cast(str, config.MCP_SERVER_AUTH_KEY))
+        with profiler.phase("server_init"):
+            from src.manifest import DEFAULT_MANIFEST_PATH
+            from src.mcp_tools import MCPServer, register_tools
+
+            mcp_server = MCPServer(
+                api_key=cast(str, config.MCP_SERVER_AUTH_KEY),
+                config=config,
+            )
 
         # Register tools
         logger.info("Registering MCP tools")
-        register_tools(
-            mcp_server=mcp_server,
-            api_key=cast(str, config.POSTMARK_API_KEY),
-            from_email=cast(str, config.SENDER_EMAIL),
-        )
+        with profiler.phase("tool_discovery"):
+            register_tools(
+                mcp_server=mcp_server,
+                api_key=cast(str, config.POSTMARK_API_KEY),
+                from_email=cast(str, config.SENDER_EMAIL),
+                manifest_path=Path(config.TOOL_MANIFEST_PATH or DEFAULT_MANIFEST_PATH),
+                config=config,
+            )
 
         # Create and run app
         logger.info(f"Starting MCP server on http://{args.host}:{args.port}")
-        app = mcp_server.create_app(debug=True)
+        with profiler.phase("app_creation"):
+            app = mcp_server.create_app(debug=True)
+
+        with profiler.phase("server_import"):
+            import uvicorn
+
+        profiler.log_report(logger, args.profile_startup_output)
 
         # Start server
         logger.info("Starting Uvicorn server")
-        uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+        uvicorn.run(
+            app,
+            host=args.host,
+            port=args.port,
+            log_level="info",
+            # Bound how long open SSE streams can delay shutdown; uvicorn takes
+            # whole seconds, rounded up so a fractional drain still gets to run
+            timeout_graceful_shutdown=math.ceil(config.SHUTDOWN_DRAIN_TIMEOUT),
+        )
 
     except Exception as e:
         if "logger" in locals():
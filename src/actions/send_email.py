@@ -3,15 +3,31 @@ Send email action implementation.
 """
 
 import logging
-from typing import List
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, List, Optional
 
 from ..utils import email
+from ..utils.attachments import AttachmentLoader, AttachmentRef
+from ..utils.mail_transports import MailTransport
+from ..utils.scheduler import OutboundScheduler
+from ..utils.suppression import SuppressionIndex
 
 logger = logging.getLogger(__name__)
 
 
 async def send_email_action(
-    recipients: List[str], subject: str, body: str, postmark_api_key: str, sender_email: str
+    recipients: List[str],
+    subject: str,
+    body: str,
+    postmark_api_key: str,
+    sender_email: str,
+    mail_transport: Optional[MailTransport] = None,
+    outbox: Optional[OutboundScheduler] = None,
+    suppression_list: Optional[SuppressionIndex] = None,
+    send_at: Optional[str] = None,
+    attachments: Optional[List[AttachmentRef]] = None,
+    attachment_loader: Optional[AttachmentLoader] = None,
 ) -> str:
     """
     Send a simple email to the specified recipients.
@@ -22,19 +38,56 @@ async def send_email_action(
         body: Email body content
         postmark_api_key: Postmark API key (injected)
         sender_email: From email address (injected)
+        mail_transport: Shared mail transport with failover (injected)
+        outbox: Send-rate shaper and deferred delivery queue (injected)
+        suppression_list: Hard-bounced and complaining addresses to skip (injected)
+        send_at: Optional ISO 8601 time to deliver the email at (UTC if no offset)
+        attachments: Optional files to attach, each a server-side path or an allowed URL
+        attachment_loader: Streams attachment content within memory caps (injected)
 
     Returns:
-        Success message with recipient count
+        Success message with recipient count, or the id of the scheduled email
     """
     logger.info(f"Send email action called with {len(recipients)} recipients")
+
+    if attachments and attachment_loader is None:
+        raise ValueError("Attachments are not available on this server")
+
+    # Before throttling, so rejected calls do not use up send budget
+    valid = email.validate_recipients(recipients, suppression_list)
+
+    if send_at is not None:
+        if outbox is None:
+            raise ValueError("Scheduled delivery is not available on this server")
+        due = datetime.fromisoformat(send_at)
+        if due.tzinfo is None:
+            due = due.replace(tzinfo=timezone.utc)
+        # Rejected now rather than failing every delivery attempt later
+        if attachments:
+            await attachment_loader.check(attachments)
+        item: dict[str, Any] = {"recipients": valid, "subject": subject, "body": body}
+        if attachments:
+            # References are stored and resolved at delivery time
+            item["attachments"] = [ref.model_dump(exclude_none=True) for ref in attachments]
+        message_id = await outbox.schedule(item, due.timestamp())
+        logger.info(f"Email {message_id} scheduled for {due.isoformat()}")
+        return f"Email scheduled for {due.isoformat()} with id {message_id}"
+
     try:
-        result = await email.send_email(
-            recipients=recipients,
-            subject=subject,
-            body=body,
-            api_key=postmark_api_key,
-            from_email=sender_email,
-        )
+        if outbox is not None:
+            await outbox.throttle()
+        loading = attachment_loader.load(attachments) if attachments else nullcontext([])
+        async with loading as files:
+            result = await email.send_email(
+                recipients=valid,
+                subject=subject,
+                body=body,
+                api_key=postmark_api_key,
+                from_email=sender_email,
+                transport=mail_transport,
+                suppression=suppression_list,
+                attachments=files,
+            )
         logger.info("Email sending completed successfully")
         return result
     except Exception as e:
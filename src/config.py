@@ -2,10 +2,12 @@
 Simplified configuration for the MCP server reference implementation.
 """
 
+import os
 from pathlib import Path
 from typing import Optional
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -22,6 +24,92 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     FILE_LOGGING: bool = True
     LOGS_DIR: str = "logs"
+    TOOL_MANIFEST_PATH: Optional[str] = None  # defaults to tool_manifest.json in project root
+
+    # Shared clients
+    SMTP_HOST: str = "smtp.postmarkapp.com"
+    SMTP_PORT: int = 587
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_WARM_CONNECTIONS: int = 0  # connections opened at startup
+    SMTP_TIMEOUT: float = 10.0  # connect/read timeout for SMTP relays
+    HTTP_CLIENT_TIMEOUT: float = 10.0
+
+    # Outbound send shaping and scheduled delivery
+    SEND_RATE_PER_SECOND: float = Field(10.0, gt=0)
+    SEND_BURST: int = Field(20, ge=1)
+    OUTBOX_PATH: str = "data/outbox.sqlite3"
+    OUTBOX_MAX_BACKLOG: int = 10000  # readiness fails above this many pending messages
+    OUTBOX_MAX_ATTEMPTS: int = 5
+
+    # Suppression list fed by Postmark bounce/complaint webhooks
+    POSTMARK_WEBHOOK_SECRET: Optional[str] = None  # webhook route is disabled without it
+    SUPPRESSION_PATH: str = "data/suppression.bin"
+
+    # Attachments
+    ATTACHMENT_DIR: Optional[str] = None  # path references must resolve inside it
+    ATTACHMENT_URL_PREFIXES: str = ""  # comma-separated allowed URL prefixes
+    ATTACHMENT_SPOOL_THRESHOLD: int = 256 * 1024
+    ATTACHMENT_CALL_MEMORY: int = 1024 * 1024
+    ATTACHMENT_MEMORY_BUDGET: int = 64 * 1024 * 1024
+    ATTACHMENT_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # Mail circuit breakers and failover
+    MAIL_FAILOVER: Optional[str] = None  # "postmark_http" or "smtp"
+    POSTMARK_API_URL: str = "https://api.postmarkapp.com"
+    SMTP_FALLBACK_HOST: Optional[str] = None
+    SMTP_FALLBACK_PORT: int = 587
+    SMTP_FALLBACK_USERNAME: Optional[str] = None  # defaults to the Postmark API key
+    SMTP_FALLBACK_PASSWORD: Optional[str] = None
+    MAIL_BREAKER_FAILURE_RATE: float = 0.5
+    MAIL_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    MAIL_BREAKER_WINDOW: int = 20
+    MAIL_BREAKER_MIN_CALLS: int = 5
+    MAIL_BREAKER_OPEN_SECONDS: float = 30.0
+
+    # Pools for actions declaring EXECUTION_MODE = "thread" or "process"
+    ACTION_THREAD_WORKERS: int = 8
+    ACTION_PROCESS_WORKERS: Optional[int] = None  # defaults to the CPU count
+
+    # Background jobs for actions declaring ASYNC_JOB = True
+    JOB_MAX_JOBS: int = 1000
+    JOB_RESULT_TTL: float = 3600.0  # seconds finished jobs are kept
+
+    # Tenants (one API key and dependency set per customer); off while unset
+    TENANTS_FILE: Optional[str] = None
+    TENANTS_RELOAD_INTERVAL: float = 30.0  # seconds between checks for changes
+
+    # SSE sessions survive reconnects with Last-Event-ID within the grace period
+    SSE_REPLAY_BUFFER: int = 256  # messages kept per session for replay
+    SSE_RESUME_GRACE: float = 30.0  # seconds a disconnected session is kept
+    SSE_MAX_BATCH: int = 100  # messages accepted in one JSON-RPC batch POST
+
+    # Anonymised JSON-RPC traffic for python -m src.replay; off while unset
+    TRAFFIC_RECORD_FILE: Optional[str] = None  # gzip-compressed if it ends in .gz
+
+    # Hot reload with SIGHUP or POST /admin/reload
+    RELOAD_RETIRE_DELAY: float = 30.0  # seconds replaced clients stay open for calls using them
+
+    # Seconds allowed for background work to drain on shutdown
+    SHUTDOWN_DRAIN_TIMEOUT: float = 10.0
+
+    # Readiness
+    MAX_SESSIONS: int = 200
+    HEALTH_PROBE_INTERVAL: float = 30.0
+    HEALTH_PROBE_TIMEOUT: float = 10.0
+    HEALTH_MAX_LOOP_LAG: float = 0.5
+    HEALTH_SMTP_PROBE: bool = False  # a mail provider outage would make every replica unready
+    HEALTH_HTTP_PROBE_URL: Optional[str] = None
+
+    # Event-loop watchdog and admin profiling
+    WATCHDOG_ENABLED: bool = True
+    WATCHDOG_STALL_THRESHOLD: float = 0.2  # seconds the loop may be blocked
+    PROFILE_MAX_SECONDS: float = 30.0
+    MEMORY_TRACE_MAX_FRAMES: int = 25  # deepest tracemalloc traceback /admin/memory/start allows
+
+    # Tracing (off while the sample ratio is 0)
+    TRACING_SAMPLE_RATIO: float = 0.0
+    TRACING_EXPORTER: str = "file"  # "file" or "memory"
+    TRACING_FILE: Optional[str] = None  # defaults to traces.jsonl in LOGS_DIR
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -30,12 +118,27 @@ class Settings(BaseSettings):
     )
 
 
-def load_config(dotenv_path: Optional[Path] = None) -> Settings:
+# Variables the process was started with; .env never overrides them
+_PROCESS_ENV = frozenset(os.environ)
+
+
+def _reload_dotenv(dotenv_path: Path) -> None:
+    # load_dotenv keeps values already in the environment, which after the
+    # first load includes every value taken from .env itself
+    for key, value in dotenv_values(dotenv_path).items():
+        if key not in _PROCESS_ENV and value is not None:
+            os.environ[key] = value
+
+
+def load_config(dotenv_path: Optional[Path] = None, reload: bool = False) -> Settings:
     """
     Load configuration from environment variables and .env file.
 
     Args:
         dotenv_path: Path to .env file. Defaults to .env in project root.
+        reload: Apply edited .env values over those loaded from it before.
+            Variables set in the process environment still take precedence;
+            variables removed from .env keep their previous value.
 
     Returns:
         Settings object with loaded configuration.
@@ -47,7 +150,10 @@ def load_config(dotenv_path: Optional[Path] = None) -> Settings:
     if dotenv_path is None:
         dotenv_path = Path(__file__).parents[1] / ".env"
 
-    load_dotenv(dotenv_path=dotenv_path)
+    if reload:
+        _reload_dotenv(dotenv_path)
+    else:
+        load_dotenv(dotenv_path=dotenv_path)
 
     # Create settings
     settings = Settings()
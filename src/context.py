@@ -0,0 +1,24 @@
+"""
+Context variables describing the request currently being served.
+
+Values set while handling an SSE connection are inherited by every tool call
+dispatched on that session.
+"""
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .jobs import Job
+    from .tenants import Tenant
+
+# Identifier of the SSE session a tool call belongs to
+current_session_id: ContextVar[Optional[str]] = ContextVar(
+    "current_session_id", default=None
+)
+
+# Background job a tool call is running as, if any
+current_job: ContextVar[Optional["Job"]] = ContextVar("current_job", default=None)
+
+# Tenant whose API key authenticated the request (None for the server's own key)
+current_tenant: ContextVar[Optional["Tenant"]] = ContextVar("current_tenant", default=None)
@@ -0,0 +1,380 @@
+"""
+Dependency providers for MCP actions.
+
+Actions declare the server objects they need as parameters; the registry
+decides how each one is produced:
+
+- ``Scope.SINGLETON``: constructed once, on first use (or at startup when
+  ``eager=True``), shared by every call.
+- ``Scope.SESSION``: constructed once per SSE session and closed when the
+  session ends.
+- ``Scope.CALL``: constructed for each tool call and closed afterwards.
+- ``Scope.TENANT``: constructed once per tenant (see ``tenants``) and shared
+  by that tenant's calls; requests without a tenant share one instance.
+
+Plain values registered with ``update`` behave like already-constructed
+singletons, so ``DEPENDENCIES.update({"weather_api_key": ...})`` keeps working.
+"""
+
+import inspect
+import logging
+import weakref
+from enum import Enum
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Mapping, Optional
+
+from .context import current_session_id, current_tenant
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[Any], Optional[Awaitable[None]]]
+
+
+class Scope(str, Enum):
+    """Lifetime of a dependency instance."""
+
+    SINGLETON = "singleton"
+    SESSION = "session"
+    CALL = "call"
+    TENANT = "tenant"
+
+
+class Provider:
+    """Describes how a named dependency is constructed, warmed up and closed."""
+
+    __slots__ = ("factory", "scope", "startup", "shutdown", "eager")
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        scope: Scope = Scope.SINGLETON,
+        startup: Optional[Hook] = None,
+        shutdown: Optional[Hook] = None,
+        eager: bool = False,
+    ):
+        self.factory = factory
+        self.scope = scope
+        self.startup = startup
+        self.shutdown = shutdown
+        self.eager = eager
+
+
+async def _run_hook(hook: Optional[Hook], instance: Any) -> None:
+    if hook is None:
+        return
+    result = hook(instance)
+    if inspect.isawaitable(result):
+        await result
+
+
+class DependencyRegistry:
+    """Named dependency providers with singleton, per-session and per-call scopes."""
+
+    def __init__(self):
+        self._providers: dict[str, Provider] = {}
+        self._singletons: dict[str, Any] = {}
+        self._values: set[str] = set()
+        self._sessions: dict[str, dict[str, Any]] = {}
+        self._tenants: dict[Optional[str], dict[str, Any]] = {}
+        self._bindings: "weakref.WeakSet[DependencyBinding]" = weakref.WeakSet()
+        # Bumped whenever providers change so bindings know to re-resolve
+        self.generation = 0
+
+    def _changed(self) -> None:
+        self.generation += 1
+        for binding in self._bindings:
+            binding.static_only = False
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._providers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._providers)
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    def register_value(self, name: str, value: Any) -> None:
+        """Register an already-constructed object shared by every call."""
+        self._providers[name] = Provider(factory=lambda: value)
+        self._singletons[name] = value
+        self._values.add(name)
+        for instances in self._tenants.values():
+            instances.pop(name, None)
+        self._changed()
+
+    def register_factory(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        scope: Scope = Scope.SINGLETON,
+        startup: Optional[Hook] = None,
+        shutdown: Optional[Hook] = None,
+        eager: bool = False,
+    ) -> None:
+        """
+        Register a lazily constructed dependency.
+
+        Args:
+            name: Parameter name actions use to request the dependency
+            factory: Zero-argument callable building a new instance
+            scope: Lifetime of each instance
+            startup: Optional (async) hook run on an instance at app startup
+            shutdown: Optional (async) hook run when an instance is discarded
+            eager: Construct a singleton at app startup instead of first use
+        """
+        self._providers[name] = Provider(factory, scope, startup, shutdown, eager)
+        self._singletons.pop(name, None)
+        for instances in self._tenants.values():
+            instances.pop(name, None)
+        self._values.discard(name)
+        self._changed()
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        """Register several plain values at once."""
+        for name, value in values.items():
+            self.register_value(name, value)
+
+    def provider(self, name: str) -> Provider:
+        return self._providers[name]
+
+    def get(self, name: str) -> Any:
+        """Resolve a dependency for the current session or call."""
+        provider = self._providers[name]
+
+        if provider.scope is Scope.SINGLETON:
+            if name not in self._singletons:
+                logger.debug(f"Constructing singleton dependency: {name}")
+                self._singletons[name] = provider.factory()
+            return self._singletons[name]
+
+        if provider.scope is Scope.SESSION:
+            session_id = current_session_id.get()
+            if session_id is None:
+                raise RuntimeError(
+                    f"Session-scoped dependency {name} requested outside an SSE session"
+                )
+            instances = self._sessions.setdefault(session_id, {})
+            if name not in instances:
+                logger.debug(f"Constructing dependency {name} for session {session_id}")
+                instances[name] = provider.factory()
+            return instances[name]
+
+        if provider.scope is Scope.TENANT:
+            tenant = current_tenant.get()
+            tenant_id = tenant.id if tenant is not None else None
+            instances = self._tenants.setdefault(tenant_id, {})
+            if name not in instances:
+                logger.debug(f"Constructing dependency {name} for tenant {tenant_id}")
+                instances[name] = provider.factory()
+            return instances[name]
+
+        return provider.factory()
+
+    def instances(self, name: str) -> list[Any]:
+        """Return the constructed singleton or per-tenant instances of ``name``."""
+        if name in self._singletons:
+            return [self._singletons[name]]
+        return [instances[name] for instances in self._tenants.values() if name in instances]
+
+    def session_instances(self, session_id: str) -> list[str]:
+        """Return the names of dependencies constructed for an SSE session."""
+        return sorted(self._sessions.get(session_id, {}))
+
+    def bind(self, names: Iterable[str]) -> "DependencyBinding":
+        """Create a binding that resolves ``names`` for an action on every call."""
+        binding = DependencyBinding(self, tuple(names))
+        self._bindings.add(binding)
+        return binding
+
+    async def release(self, name: str, instance: Any) -> None:
+        """Close a call-scoped instance."""
+        await _run_hook(self._providers[name].shutdown, instance)
+
+    async def close_session(self, session_id: str) -> None:
+        """Close every instance created for an SSE session."""
+        instances = self._sessions.pop(session_id, {})
+        for name, instance in instances.items():
+            try:
+                await _run_hook(self._providers[name].shutdown, instance)
+            except Exception as e:
+                logger.error(f"Failed to close {name} for session {session_id}: {str(e)}")
+
+    async def close_tenant(self, tenant_id: Optional[str]) -> None:
+        """Close every instance created for a tenant, e.g. after its settings changed."""
+        instances = self._tenants.pop(tenant_id, {})
+        # Bindings cache tenant instances; they must not hand out closed ones
+        self._changed()
+        for name, instance in instances.items():
+            try:
+                await _run_hook(self._providers[name].shutdown, instance)
+            except Exception as e:
+                logger.error(f"Failed to close {name} for tenant {tenant_id}: {str(e)}")
+
+    def replace(
+        self, other: "DependencyRegistry", keep: Iterable[str] = ()
+    ) -> list[tuple[Provider, Any]]:
+        """
+        Swap in every provider of ``other`` in one step, e.g. after a reload.
+
+        Providers ``other`` does not define stay as they are, and so do those
+        named in ``keep``, with their instances. Singleton and tenant
+        instances of replaced providers are retired: they are returned rather
+        than closed, so calls still using them can finish before
+        ``close_retired``. Session instances stay with their sessions.
+
+        Returns:
+            (provider, instance) pairs to pass to ``close_retired``
+        """
+        replaced = set(other._providers) - set(keep)
+        retired = [
+            (self._providers[name], instance)
+            for name, instance in self._singletons.items()
+            if name in replaced and name not in self._values
+        ]
+        for instances in self._tenants.values():
+            for name in replaced & instances.keys():
+                retired.append((self._providers[name], instances.pop(name)))
+
+        for name in replaced:
+            self._providers[name] = other._providers[name]
+            self._singletons.pop(name, None)
+            if name in other._singletons:
+                self._singletons[name] = other._singletons[name]
+            if name in other._values:
+                self._values.add(name)
+            else:
+                self._values.discard(name)
+        self._changed()
+        return retired
+
+    async def close_retired(self, retired: Iterable[tuple[Provider, Any]]) -> None:
+        """Close instances returned by ``replace``."""
+        for provider, instance in retired:
+            try:
+                await _run_hook(provider.shutdown, instance)
+            except Exception as e:
+                logger.error(f"Failed to close replaced {type(instance).__name__}: {str(e)}")
+
+    async def startup(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Construct eager singletons and run startup hooks for constructed ones.
+
+        Eager tenant-scoped dependencies are constructed for requests without
+        a tenant; other tenants' instances are built on first use.
+
+        Args:
+            names: Only start these dependencies, e.g. the ones a reload
+                replaced; all of them by default
+        """
+        for name, provider in self._providers.items():
+            if names is not None and name not in names:
+                continue
+            if provider.scope not in (Scope.SINGLETON, Scope.TENANT):
+                continue
+            if provider.eager:
+                self.get(name)
+            for instance in self.instances(name):
+                await _run_hook(provider.startup, instance)
+
+    async def shutdown(self) -> None:
+        """Close every session, tenant and singleton instance."""
+        for session_id in list(self._sessions):
+            await self.close_session(session_id)
+        for tenant_id in list(self._tenants):
+            await self.close_tenant(tenant_id)
+
+        for name in [name for name in self._singletons if name not in self._values]:
+            instance = self._singletons.pop(name)
+            try:
+                await _run_hook(self._providers[name].shutdown, instance)
+            except Exception as e:
+                logger.error(f"Failed to close dependency {name}: {str(e)}")
+        self._changed()
+
+
+class DependencyBinding:
+    """
+    Resolves a fixed set of dependency names for one action.
+
+    When every dependency is a singleton, ``static_only`` is true and
+    ``static`` holds the resolved values, ready to be passed straight through
+    as ``**kwargs`` without building a dict per call. When the other
+    dependencies are all tenant-scoped, the resolved values are cached per
+    tenant instead. The registry clears ``static_only`` whenever its providers
+    change or a tenant's instances are closed, and the next ``resolve``
+    re-binds.
+    """
+
+    __slots__ = (
+        "_registry",
+        "_names",
+        "_generation",
+        "_dynamic",
+        "_tenant_only",
+        "_per_tenant",
+        "static",
+        "static_only",
+        "call_scoped",
+        "__weakref__",
+    )
+
+    def __init__(self, registry: DependencyRegistry, names: tuple[str, ...]):
+        self._registry = registry
+        self._names = names
+        self._generation = -1
+        self._dynamic: tuple[str, ...] = ()
+        self._tenant_only = False
+        self._per_tenant: dict[Optional[str], dict[str, Any]] = {}
+        self.static: dict[str, Any] = {}
+        self.static_only = False
+        self.call_scoped: tuple[str, ...] = ()
+
+    def _rebind(self) -> None:
+        registry = self._registry
+        static = {}
+        dynamic = []
+        call_scoped = []
+        for name in self._names:
+            scope = registry.provider(name).scope
+            if scope is Scope.SINGLETON:
+                static[name] = registry.get(name)
+            else:
+                dynamic.append(name)
+                if scope is Scope.CALL:
+                    call_scoped.append(name)
+        self.static = static
+        self._dynamic = tuple(dynamic)
+        self._tenant_only = all(
+            registry.provider(name).scope is Scope.TENANT for name in dynamic
+        )
+        self._per_tenant = {}
+        self.call_scoped = tuple(call_scoped)
+        self._generation = registry.generation
+
+    def resolve(self) -> dict[str, Any]:
+        """Return the dependency values to inject into the current call."""
+        if self._generation != self._registry.generation:
+            self._rebind()
+        if not self._dynamic:
+            self.static_only = True
+            return self.static
+        if self._tenant_only:
+            tenant = current_tenant.get()
+            tenant_id = tenant.id if tenant is not None else None
+            values = self._per_tenant.get(tenant_id)
+            if values is None:
+                values = self.static.copy()
+                for name in self._dynamic:
+                    values[name] = self._registry.get(name)
+                self._per_tenant[tenant_id] = values
+            return values
+
+        values = self.static.copy()
+        for name in self._dynamic:
+            values[name] = self._registry.get(name)
+        return values
+
+    async def release(self, values: dict[str, Any]) -> None:
+        """Close call-scoped instances created by ``resolve``."""
+        for name in self.call_scoped:
+            await self._registry.release(name, values[name])
@@ -0,0 +1,211 @@
+"""
+Thread and process pools for blocking and CPU-bound actions.
+
+Actions run on the event loop by default. An action module can instead set
+
+    EXECUTION_MODE = "thread"   # blocking I/O or C code that releases the GIL
+    EXECUTION_MODE = "process"  # CPU-bound Python (rendering, parsing...)
+
+and define its ``_action`` functions as plain ``def`` functions; the tool
+wrapper then runs them in the matching pool, so a long call no longer stalls
+every SSE session. Process-pool calls pickle their arguments, injected
+dependencies and result, so they should only ask for plain-value
+dependencies.
+
+The process pool uses the ``spawn`` start method (the server has threads
+running, which ``fork`` does not copy safely) and is pre-warmed during the
+app's warm-up phase when any process-mode tool is registered, so the first
+call does not pay for starting interpreters and importing action modules.
+
+Independently of the mode, ``MAX_CONCURRENCY = <n>`` caps how many calls of
+a module's actions run at once; further calls wait for a free slot.
+"""
+
+import asyncio
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from .metrics import Metric
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionMode(str, Enum):
+    """Where an action's calls run."""
+
+    LOOP = "loop"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def execution_mode(func: Callable[..., Any]) -> ExecutionMode:
+    """Return the mode declared by ``EXECUTION_MODE`` in the action's module."""
+    module = sys.modules.get(func.__module__)
+    return ExecutionMode(getattr(module, "EXECUTION_MODE", ExecutionMode.LOOP))
+
+
+def max_concurrency(func: Callable[..., Any]) -> Optional[int]:
+    """Return the per-tool call limit declared by ``MAX_CONCURRENCY``, if any."""
+    limit = getattr(sys.modules.get(func.__module__), "MAX_CONCURRENCY", None)
+    if limit is None:
+        return None
+    if not isinstance(limit, int) or limit < 1:
+        raise ValueError(f"MAX_CONCURRENCY of {func.__module__} must be a positive integer")
+    return limit
+
+
+def _init_worker(modules: tuple[str, ...]) -> None:
+    # Ctrl-C reaches the whole process group; the server shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _timed(func: Callable[..., Any], kwargs: dict[str, Any]) -> tuple[Any, float]:
+    # Runs in the worker, so the time excludes queueing and pickling
+    started = time.perf_counter()
+    return func(**kwargs), time.perf_counter() - started
+
+
+class ActionPool:
+    """A lazily created thread or process pool with utilisation counters."""
+
+    def __init__(self, mode: ExecutionMode, workers: int):
+        self.mode = mode
+        self.workers = workers
+        self.modules: set[str] = set()
+        self.in_flight = 0
+        self.calls = 0
+        self.busy_seconds = 0.0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode is ExecutionMode.PROCESS:
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(tuple(sorted(self.modules)),),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="mcp-action"
+                )
+            logger.info(f"Started {self.mode.value} pool with {self.workers} workers")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], kwargs: dict[str, Any]) -> Any:
+        """Run ``func(**kwargs)`` in the pool and return its result."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self.in_flight += 1
+        try:
+            result, seconds = await loop.run_in_executor(
+                executor, functools.partial(_timed, func, kwargs)
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next call
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            logger.error(f"Process pool broke while running {func.__name__}, restarting it")
+            raise
+        finally:
+            self.in_flight -= 1
+            self.calls += 1
+        self.busy_seconds += seconds
+        return result
+
+    async def warm_up(self) -> None:
+        """Start every worker and, for processes, import the action modules."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Submitted together so each one needs a new worker
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(executor, _ping) for _ in range(self.workers))
+        )
+        logger.info(f"Warmed up {self.mode.value} pool: {len(set(pids))} workers")
+
+    async def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    def recycle(self) -> None:
+        """
+        Start fresh workers on the next call, e.g. after action modules were
+        reloaded; calls already running finish on the old ones.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            logger.info(f"Recycling {self.mode.value} pool")
+            executor.shutdown(wait=False)
+
+
+class ActionPools:
+    """The thread and process pools shared by every action wrapper."""
+
+    def __init__(self, thread_workers: int = 8, process_workers: Optional[int] = None):
+        self.thread = ActionPool(ExecutionMode.THREAD, thread_workers)
+        self.process = ActionPool(ExecutionMode.PROCESS, process_workers or os.cpu_count() or 1)
+
+    def configure(self, thread_workers: int, process_workers: Optional[int] = None) -> None:
+        """Resize the pools; takes effect the next time each pool is started."""
+        self.thread.workers = thread_workers
+        self.process.workers = process_workers or os.cpu_count() or 1
+
+    def pool(self, mode: ExecutionMode) -> ActionPool:
+        return self.process if mode is ExecutionMode.PROCESS else self.thread
+
+    def require(self, mode: ExecutionMode, module: str) -> None:
+        """Note that an action in ``module`` runs in the ``mode`` pool."""
+        if mode is not ExecutionMode.LOOP:
+            self.pool(mode).modules.add(module)
+
+    async def warm_up(self) -> None:
+        """Pre-start the process pool if any registered action needs it."""
+        if self.process.modules and not self.process.started:
+            await self.process.warm_up()
+
+    async def shutdown(self) -> None:
+        await asyncio.gather(self.thread.shutdown(), self.process.shutdown())
+
+    def metrics(self) -> list[Metric]:
+        workers = Metric("mcp_action_pool_workers", "gauge", "Workers in each action pool")
+        busy = Metric("mcp_action_pool_busy", "gauge", "Workers running an action")
+        queued = Metric("mcp_action_pool_queued", "gauge", "Action calls waiting for a worker")
+        calls = Metric("mcp_action_pool_calls_total", "counter", "Action calls run in each pool")
+        seconds = Metric(
+            "mcp_action_pool_busy_seconds_total", "counter", "Worker time spent running actions"
+        )
+        for pool in (self.thread, self.process):
+            mode = pool.mode.value
+            workers.add(pool.workers if pool.started else 0, pool=mode)
+            busy.add(min(pool.in_flight, pool.workers), pool=mode)
+            queued.add(max(pool.in_flight - pool.workers, 0), pool=mode)
+            calls.add(pool.calls, pool=mode)
+            seconds.add(pool.busy_seconds, pool=mode)
+        return [workers, busy, queued, calls, seconds]
+
+
+# Process-wide pools used by make_wrapper
+ACTION_POOLS = ActionPools()
@@ -0,0 +1,154 @@
+"""
+Liveness and readiness reporting for the MCP server.
+
+Liveness only says the process and its event loop are responsive. Readiness
+combines everything that decides whether this replica should receive new
+traffic:
+
+- event-loop lag, sampled continuously in the background;
+- dependency probes (SMTP relay, HTTP endpoints), run in the background on an
+  interval and cached - never on the request path;
+- gauges such as active sessions or an outbox backlog, compared to a limit.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of the most recent run of a dependency probe."""
+
+    healthy: bool
+    checked_at: float
+    latency: float
+    error: Optional[str] = None
+
+
+class HealthMonitor:
+    """Background loop-lag sampler and cached dependency probes."""
+
+    def __init__(
+        self,
+        probe_interval: float = 30.0,
+        probe_timeout: float = 10.0,
+        max_loop_lag: float = 0.5,
+        lag_interval: float = 0.5,
+    ):
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.max_loop_lag = max_loop_lag
+        self.lag_interval = lag_interval
+        self._probes: dict[str, tuple[Probe, bool]] = {}
+        self._gauges: dict[str, tuple[Callable[[], float], float]] = {}
+        self._results: dict[str, ProbeResult] = {}
+        self._lag_samples: deque[float] = deque(maxlen=10)
+
+    def add_probe(self, name: str, probe: Probe, critical: bool = True) -> None:
+        """
+        Register a dependency probe.
+
+        Args:
+            name: Name reported in the readiness payload
+            probe: Coroutine function that raises if the dependency is unhealthy
+            critical: Whether a failing probe makes the replica not ready
+        """
+        self._probes[name] = (probe, critical)
+
+    def add_gauge(self, name: str, read: Callable[[], float], limit: float) -> None:
+        """Register a cheap synchronous reading that must stay below ``limit``."""
+        self._gauges[name] = (read, limit)
+
+    def set_gauge_limit(self, name: str, limit: float) -> None:
+        """Change the limit of the gauge ``name``, if one is registered."""
+        if name in self._gauges:
+            self._gauges[name] = (self._gauges[name][0], limit)
+
+    @property
+    def loop_lag(self) -> float:
+        """Worst event-loop lag among recent samples, in seconds."""
+        return max(self._lag_samples, default=0.0)
+
+    async def _run_probe(self, name: str, probe: Probe) -> None:
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.probe_timeout)
+            result = ProbeResult(True, time.time(), time.monotonic() - start)
+        except Exception as e:
+            result = ProbeResult(
+                False, time.time(), time.monotonic() - start, f"{type(e).__name__}: {e}"
+            )
+            logger.warning(f"Health probe {name} failed: {result.error}")
+        self._results[name] = result
+
+    async def run_probes(self) -> None:
+        """Run every probe once, concurrently, and cache the results."""
+        await asyncio.gather(
+            *(self._run_probe(name, probe) for name, (probe, _) in self._probes.items())
+        )
+
+    async def sample_loop_lag(self) -> None:
+        """Measure how late the event loop wakes up from a timed sleep, forever."""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.lag_interval)
+            self._lag_samples.append(max(time.monotonic() - start - self.lag_interval, 0.0))
+
+    async def probe_forever(self) -> None:
+        """
+        Re-run probes every ``probe_interval`` seconds.
+
+        The first round is expected to have run already, as part of warm-up.
+        """
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.run_probes()
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """
+        Summarize readiness from cached state only.
+
+        Returns:
+            Tuple of (ready, checks) where checks describes each input.
+        """
+        ready = True
+        checks: dict[str, Any] = {}
+
+        lag = self.loop_lag
+        lag_ok = lag <= self.max_loop_lag
+        checks["event_loop_lag"] = {
+            "healthy": lag_ok, "value": round(lag, 4), "limit": self.max_loop_lag
+        }
+        ready &= lag_ok
+
+        for name, (read, limit) in self._gauges.items():
+            value = read()
+            gauge_ok = value < limit
+            checks[name] = {"healthy": gauge_ok, "value": value, "limit": limit}
+            ready &= gauge_ok
+
+        for name, (_, critical) in self._probes.items():
+            result = self._results.get(name)
+            if result is None:
+                # Not probed yet; warm-up runs the first round before ready
+                checks[name] = {"healthy": None, "critical": critical}
+                continue
+            checks[name] = {
+                "healthy": result.healthy,
+                "critical": critical,
+                "latency": round(result.latency, 4),
+                "checked_at": result.checked_at,
+                "error": result.error,
+            }
+            if critical:
+                ready &= result.healthy
+
+        return ready, checks
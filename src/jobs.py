@@ -0,0 +1,244 @@
+"""
+Long-running tool calls as background jobs.
+
+An action module that sets ``ASYNC_JOB = True`` no longer holds the JSON-RPC
+request open while it runs. The tool call starts a job and returns its id at
+once; the action keeps running as a lifespan task, and a generated companion
+tool (``<name>_result_tool``) returns the job's status, progress and, once it
+has finished, its result or error.
+
+Actions report progress through the injected ``progress`` dependency. The
+reports are recorded on the job for the result tool and, when the client sent
+a ``progressToken`` with the call, also sent as MCP progress notifications on
+the caller's SSE stream.
+
+A job can only be read by the tenant and SSE session that started it.
+
+Jobs are kept in a bounded store: finished jobs are evicted ``ttl`` seconds
+after they finish, or earlier (oldest first) when the store is full.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Optional
+
+from mcp.server.lowlevel.server import request_ctx
+
+from .context import current_job, current_session_id, current_tenant
+from .lifespan import Lifespan
+from .metrics import Metric
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of one background tool call."""
+
+    id: str
+    tool: str
+    session_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    status: JobStatus = JobStatus.RUNNING
+    progress: float = 0.0
+    total: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+    def describe(self) -> dict[str, Any]:
+        """Job state as returned to clients."""
+        description = {
+            "job_id": self.id,
+            "tool": self.tool,
+            "status": self.status.value,
+            "progress": self.progress,
+            "total": self.total,
+        }
+        if self.status is JobStatus.SUCCEEDED:
+            description["result"] = self.result
+        elif self.status is JobStatus.FAILED:
+            description["error"] = self.error
+        return description
+
+
+class JobLimitError(RuntimeError):
+    """Raised when the store is full of running jobs."""
+
+
+def is_job_action(func: Callable[..., Any]) -> bool:
+    """Return whether the action's module opted into job mode with ``ASYNC_JOB``."""
+    return getattr(sys.modules.get(func.__module__), "ASYNC_JOB", False) is True
+
+
+def result_tool_name(tool_name: str) -> str:
+    return f"{tool_name.removesuffix('_tool')}_result_tool"
+
+
+class JobStore:
+    """Running and recently finished jobs, bounded in count and age."""
+
+    def __init__(
+        self, max_jobs: int = 1000, ttl: float = 3600.0, lifespan: Optional[Lifespan] = None
+    ):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.lifespan = lifespan
+        self._jobs: dict[str, Job] = {}
+        # Finished job ids in the order they finished, so eviction pops from the front
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def configure(self, max_jobs: int, ttl: float, lifespan: Optional[Lifespan]) -> None:
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.lifespan = lifespan
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _evict(self, room: int = 0) -> None:
+        expired = time.monotonic() - self.ttl
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > expired and len(self._jobs) + room <= self.max_jobs:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._evict()
+        return self._jobs.get(job_id)
+
+    def submit(self, tool: str, run: Callable[[], Awaitable[Any]]) -> Job:
+        """
+        Start ``run()`` as a job for ``tool``.
+
+        Raises:
+            JobLimitError: If ``max_jobs`` jobs are still running
+        """
+        self._evict(room=1)
+        if len(self._jobs) >= self.max_jobs:
+            raise JobLimitError(f"Too many running jobs ({self.max_jobs}), try again later")
+        tenant = current_tenant.get()
+        job = Job(
+            uuid.uuid4().hex,
+            tool,
+            current_session_id.get(),
+            tenant.id if tenant is not None else None,
+        )
+        self._jobs[job.id] = job
+        # The task copies the caller's context, so current_job is only set inside it
+        token = current_job.set(job)
+        try:
+            coro = self._run(job, run)
+            if self.lifespan is not None:
+                self.lifespan.spawn(coro, name=f"job-{job.id}")
+            else:
+                task = asyncio.get_running_loop().create_task(coro, name=f"job-{job.id}")
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            current_job.reset(token)
+        logger.info(f"Started job {job.id} for {tool}")
+        return job
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            job.result = await run()
+            job.status = JobStatus.SUCCEEDED
+            logger.info(f"Job {job.id} for {job.tool} succeeded")
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "Job was cancelled"
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Job {job.id} for {job.tool} failed: {str(e)}", exc_info=True)
+        finally:
+            job.finished_at = time.monotonic()
+            self._finished[job.id] = job.finished_at
+
+    def metrics(self) -> list[Metric]:
+        jobs = Metric("mcp_jobs", "gauge", "Jobs in the job store by status")
+        counts = {status: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        for status, count in counts.items():
+            jobs.add(count, status=status.value)
+        return [jobs]
+
+
+class Progress:
+    """Reports progress of the current tool call or job."""
+
+    def __init__(self, job: Optional[Job], session: Any, token: Optional[str | int]):
+        self.job = job
+        self.session = session
+        self.token = token
+
+    async def __call__(self, progress: float, total: Optional[float] = None) -> None:
+        if self.job is not None:
+            self.job.progress = progress
+            self.job.total = total
+        if self.session is None or self.token is None:
+            return
+        try:
+            await self.session.send_progress_notification(self.token, progress, total)
+        except Exception as e:
+            # The client may have disconnected; the job keeps running regardless
+            logger.debug(f"Could not send progress notification: {str(e)}")
+
+
+def progress_reporter() -> Progress:
+    """Build the ``progress`` dependency for the call being served."""
+    job = current_job.get()
+    try:
+        ctx = request_ctx.get()
+    except LookupError:
+        return Progress(job, None, None)
+    # Without a token the client did not ask for notifications; jobs still record progress
+    token = ctx.meta.progressToken if ctx.meta is not None else None
+    return Progress(job, ctx.session, token)
+
+
+def make_result_tool(tool_name: str, store: JobStore) -> Callable[..., Awaitable[dict[str, Any]]]:
+    """Build the companion tool returning the state of ``tool_name`` jobs."""
+
+    async def result_tool(job_id: str) -> dict[str, Any]:
+        job = store.get(job_id)
+        tenant = current_tenant.get()
+        if (
+            job is None
+            or job.tool != tool_name
+            or job.tenant_id != (tenant.id if tenant is not None else None)
+            or job.session_id != current_session_id.get()
+        ):
+            # Other callers' jobs look the same as missing ones
+            raise ValueError(f"Unknown or expired job: {job_id}")
+        return job.describe()
+
+    result_tool.__name__ = result_tool_name(tool_name)
+    result_tool.__doc__ = (
+        f"Get the status, progress and result of a {tool_name} job.\n\n"
+        "Args:\n"
+        f"    job_id: Id returned by {tool_name}\n"
+    )
+    return result_tool
+
+
+# Process-wide job store used by make_wrapper
+JOBS = JobStore()
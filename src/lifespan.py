@@ -0,0 +1,152 @@
+"""
+Application lifespan management for the MCP server.
+
+Utilities and actions register work that must happen once per process:
+
+- startup hooks run before the server accepts requests;
+- warm-up hooks run after the server is accepting requests, and ``ready``
+  only becomes true once they finish (so ``/health`` can hold traffic back
+  while connections are pre-opened);
+- background tasks run for the lifetime of the app;
+- shutdown hooks run after background tasks have drained.
+
+Shutdown is bounded: background tasks get ``drain_timeout`` seconds to finish
+after ``stopping`` is set before being cancelled, and shutdown hooks share
+whatever time remains.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[Any]]
+
+
+class Lifespan:
+    """Startup/shutdown hooks, warm-up and background tasks for one app."""
+
+    def __init__(self, drain_timeout: float = 10.0):
+        self.drain_timeout = drain_timeout
+        self.ready = False
+        self.stopping = asyncio.Event()
+        self._startup_hooks: list[Hook] = []
+        self._warmup_hooks: list[Hook] = []
+        self._shutdown_hooks: list[Hook] = []
+        self._background: list[tuple[str, Hook, bool]] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._undrained: set[asyncio.Task] = set()
+
+    def on_startup(self, hook: Hook) -> Hook:
+        """Run ``hook`` before the app starts serving requests."""
+        self._startup_hooks.append(hook)
+        return hook
+
+    def on_warmup(self, hook: Hook) -> Hook:
+        """Run ``hook`` after startup; the app reports ready once all warm-ups finish."""
+        self._warmup_hooks.append(hook)
+        return hook
+
+    def on_shutdown(self, hook: Hook) -> Hook:
+        """Run ``hook`` on shutdown, in reverse registration order."""
+        self._shutdown_hooks.append(hook)
+        return hook
+
+    def add_background_task(
+        self, factory: Hook, name: Optional[str] = None, drain: bool = True
+    ) -> None:
+        """
+        Run ``factory()`` as a task for the lifetime of the app.
+
+        Draining tasks are expected to finish once ``stopping`` is set; tasks
+        added with ``drain=False`` (samplers, pollers) are cancelled right away.
+        """
+        name = name or getattr(factory, "__name__", "task")
+        self._background.append((name, factory, drain))
+
+    def spawn(
+        self, coro: Coroutine[Any, Any, Any], name: Optional[str] = None
+    ) -> asyncio.Task:
+        """Start a task now that is drained (or cancelled) on shutdown."""
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Background task {task.get_name()} failed: {task.exception()}",
+                exc_info=task.exception(),
+            )
+
+    async def _warm_up(self) -> None:
+        results = await asyncio.gather(
+            *(hook() for hook in self._warmup_hooks), return_exceptions=True
+        )
+        for hook, result in zip(self._warmup_hooks, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Warm-up {getattr(hook, '__qualname__', hook)} failed: {str(result)}"
+                )
+        self.ready = True
+        logger.info("Application warm-up completed, ready for traffic")
+
+    async def _drain(self, deadline: float) -> None:
+        if not self._tasks:
+            return
+        logger.info(f"Draining {len(self._tasks)} background tasks")
+        _, pending = await asyncio.wait(
+            set(self._tasks), timeout=max(deadline - time.monotonic(), 0)
+        )
+        for task in pending:
+            logger.warning(f"Cancelling background task {task.get_name()} after drain timeout")
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=1.0)
+
+    async def startup(self) -> None:
+        """Run startup hooks, start background tasks and begin warm-up."""
+        self.ready = False
+        self.stopping = asyncio.Event()
+        for hook in self._startup_hooks:
+            await hook()
+        for name, factory, drain in self._background:
+            task = self.spawn(factory(), name=name)
+            if not drain:
+                self._undrained.add(task)
+        self.spawn(self._warm_up(), name="warm-up")
+
+    async def shutdown(self) -> None:
+        """Stop background tasks within the drain timeout, then run shutdown hooks."""
+        self.ready = False
+        self.stopping.set()
+        deadline = time.monotonic() + self.drain_timeout
+
+        for task in self._undrained:
+            task.cancel()
+        self._undrained.clear()
+        await self._drain(deadline)
+
+        for hook in reversed(self._shutdown_hooks):
+            remaining = max(deadline - time.monotonic(), 0.1)
+            try:
+                await asyncio.wait_for(hook(), timeout=remaining)
+            except Exception as e:
+                logger.error(
+                    f"Shutdown hook {getattr(hook, '__qualname__', hook)} failed: {e!r}"
+                )
+        logger.info("Application shutdown completed")
+
+    @asynccontextmanager
+    async def __call__(self, app: Any) -> AsyncIterator[None]:
+        """Starlette lifespan handler."""
+        await self.startup()
+        try:
+            yield
+        finally:
+            await self.shutdown()
@@ -0,0 +1,171 @@
+"""
+Build-time tool manifest for the MCP server.
+
+The manifest is a JSON snapshot of every discovered action (tool name, module,
+description, input schema, execution and job mode) together with a fingerprint
+of each action module's source. At startup a fresh manifest lets the server
+register tools without importing action modules or rebuilding JSON schemas; a
+stale or missing manifest falls back to normal auto-discovery.
+
+Generate it with:
+
+    python -m src.manifest
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import pkgutil
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable, Optional
+
+from . import actions
+
+MANIFEST_VERSION = 3
+DEFAULT_MANIFEST_PATH = Path(__file__).parents[1] / "tool_manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint_actions(package: ModuleType = actions) -> dict[str, Optional[str]]:
+    """
+    Fingerprint the source of every module in an actions package.
+
+    Modules are listed without being imported.
+
+    Args:
+        package: Package holding the action modules
+
+    Returns:
+        Mapping of module name to the SHA-256 of its source, or None when the
+        source file cannot be read (e.g. bytecode-only deployments).
+    """
+    fingerprints: dict[str, Optional[str]] = {}
+    package_dir = Path(package.__path__[0])
+
+    for _, module_name, is_pkg in pkgutil.iter_modules(package.__path__):
+        source = package_dir / module_name
+        source = source / "__init__.py" if is_pkg else source.with_suffix(".py")
+        try:
+            fingerprints[module_name] = hashlib.sha256(source.read_bytes()).hexdigest()
+        except OSError:
+            fingerprints[module_name] = None
+
+    return fingerprints
+
+
+def build_manifest(package: ModuleType = actions) -> dict[str, Any]:
+    """
+    Build a manifest by importing and inspecting every action module.
+
+    The dependency registry in ``mcp_tools`` must already be populated, since
+    injected parameters are excluded from each tool's schema.
+
+    Args:
+        package: Package holding the action modules
+
+    Returns:
+        Manifest dictionary ready to be serialized with ``write_manifest``.
+    """
+    # Imported lazily: mcp_tools imports this module at startup
+    from mcp.server.fastmcp.tools import Tool
+
+    from .executors import execution_mode
+    from .jobs import is_job_action
+    from .mcp_tools import DEPENDENCIES, discover_actions, make_wrapper
+
+    tools = []
+    for module_name, func in discover_actions(package):
+        wrapper = make_wrapper(func)
+        tool = Tool.from_function(wrapper)
+        tools.append(
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.parameters,
+                "module": module_name,
+                "action": func.__name__,
+                "execution_mode": execution_mode(func).value,
+                "job": is_job_action(func),
+            }
+        )
+
+    return {
+        "version": MANIFEST_VERSION,
+        "dependencies": sorted(DEPENDENCIES),
+        "modules": fingerprint_actions(package),
+        "tools": tools,
+    }
+
+
+def write_manifest(manifest: dict[str, Any], path: Path = DEFAULT_MANIFEST_PATH) -> None:
+    """Write a manifest to disk as JSON."""
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    logger.info(f"Wrote tool manifest with {len(manifest['tools'])} tools: {path}")
+
+
+def load_manifest(path: Path = DEFAULT_MANIFEST_PATH) -> Optional[dict[str, Any]]:
+    """
+    Load a manifest from disk.
+
+    Returns:
+        The manifest dictionary, or None if it is missing or unreadable.
+    """
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        logger.debug(f"No tool manifest found at {path}")
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tool manifest {path}: {str(e)}")
+    return None
+
+
+def is_manifest_fresh(
+    manifest: dict[str, Any], dependency_names: Iterable[str], package: ModuleType = actions
+) -> bool:
+    """
+    Check whether a manifest still describes the current actions package.
+
+    Args:
+        manifest: Manifest loaded with ``load_manifest``
+        dependency_names: Names currently registered for injection
+        package: Package holding the action modules the server registers
+
+    Returns:
+        True if the manifest can be used instead of auto-discovery.
+    """
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.info("Tool manifest version mismatch")
+        return False
+
+    if manifest.get("dependencies") != sorted(dependency_names):
+        logger.info("Tool manifest was built with different dependencies")
+        return False
+
+    current = fingerprint_actions(package)
+    if None in current.values() or manifest.get("modules") != current:
+        logger.info("Tool manifest is out of date with the actions package")
+        return False
+
+    return True
+
+
+def main() -> None:
+    """Generate the tool manifest from the actions package."""
+    parser = argparse.ArgumentParser(description="Generate the MCP tool manifest")
+    parser.add_argument("--output", type=Path, default=DEFAULT_MANIFEST_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .mcp_tools import populate_dependencies
+
+    # Only dependency names matter for the schemas; values are placeholders
+    populate_dependencies(api_key="manifest-build", from_email="manifest-build")
+    write_manifest(build_manifest(), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,103 +2,609 @@
 MCP tools registration for the server reference implementation.
 """
 
+import asyncio
+import base64
+import hashlib
+import hmac
 import importlib
 import inspect
+import json
 import logging
 import pkgutil
+import signal
+import sys
 import uuid
-from typing import Callable, TypeVar
+from contextlib import nullcontext
+from pathlib import Path
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, TypeVar, cast
 
+import httpx
+import mcp.types as types
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from mcp.server.fastmcp import FastMCP
-from mcp.server.sse import SseServerTransport
+from mcp.server.fastmcp.tools import Tool
+from mcp.server.fastmcp.utilities.func_metadata import ArgModelBase, FuncMetadata
+from mcp.server.lowlevel import NotificationOptions
+from pydantic import Field, PrivateAttr
+from sse_starlette import EventSourceResponse
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.routing import Mount, Route
 
 from . import actions
+from .config import Settings, load_config
+from .context import current_session_id, current_tenant
+from .dependencies import DependencyRegistry, Scope
+from .executors import ACTION_POOLS, ExecutionMode, execution_mode, max_concurrency
+from .health import HealthMonitor
+from .jobs import JOBS, is_job_action, make_result_tool, progress_reporter, result_tool_name
+from .lifespan import Lifespan
+from .manifest import fingerprint_actions, is_manifest_fresh, load_manifest
+from .metrics import CONTENT_TYPE, METRICS, Metric, circuit_breaker_metrics
+from .sse import ResumableSseTransport
+from .tenants import TENANTS, TenantRegistry, tenant_value
+from .tracing import tracer
+from .utils import email
+from .utils.attachments import AttachmentLoader, AttachmentRef, MemoryBudget
+from .utils.circuit_breaker import CircuitBreaker
+from .utils.mail_transports import (
+    FailoverTransport,
+    PostmarkHTTPTransport,
+    is_transport_failure,
+)
+from .utils.scheduler import OutboundScheduler
+from .utils.smtp_pool import SMTPConnectionPool
+from .utils.suppression import SuppressionIndex
+
+if TYPE_CHECKING:
+    # Optional subsystems, imported only when their feature is used
+    from .memory import AllocationTracer
+    from .recording import TrafficRecorder
+    from .watchdog import Watchdog
 
 # ------------------------------------------------------------
 # Central place where *all* server-supplied objects live
-DEPENDENCIES: dict[str, object] = {
-    # These will be populated by register_tools()
-    # "postmark_api_key": api_key,
-    # "sender_email": from_email,
-    # append new shared objects here ↓
-    # "weather_api_key": os.getenv("WEATHER_API_KEY"),
-}
+DEPENDENCIES = DependencyRegistry()
+# These are populated by register_tools():
+#   "postmark_api_key", "sender_email"  per-tenant values, the server's own by default
+#   "mail_transport"                    pooled SMTP behind circuit breakers (lazy, per tenant)
+#   "http_client"                       pooled httpx.AsyncClient (lazy, per tenant)
+#   "outbox"                            send-rate shaper and scheduled delivery
+#   "suppression_list"                  hashes of bounced/complaining addresses
+#   "attachment_loader"                 streams attachments within memory caps
+#   "progress"                          reports progress of the current call or job (per call)
+#   "lifespan"                          the server's Lifespan, for hooks and tasks
+# append new shared objects here ↓
+#   DEPENDENCIES.update({"weather_api_key": os.getenv("WEATHER_API_KEY")})
 
 T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 
 class APIKeyMiddleware(BaseHTTPMiddleware):
-    """Middleware for API key authentication."""
+    """
+    Middleware for API key authentication.
+
+    The server's own key grants access to every route. With a tenant
+    registry, tenant keys are accepted too, except on ``admin_prefixes``,
+    and the tenant is made current for everything the request runs.
+    ``api_key`` may be a callable returning the current key, so a reload can
+    rotate it.
+    """
 
-    def __init__(self, app, api_key: str):
+    def __init__(
+        self,
+        app,
+        api_key: str | Callable[[], str],
+        exempt_paths: Iterable[str] = (),
+        tenants: Optional[TenantRegistry] = None,
+        admin_prefixes: tuple[str, ...] = (),
+    ):
         super().__init__(app)
         self.api_key = api_key
+        self.exempt_paths = frozenset(exempt_paths)
+        self.tenants = tenants
+        self.admin_prefixes = admin_prefixes
 
     async def dispatch(self, request: Request, call_next):
+        # Platform probes are unauthenticated and too frequent to log
+        if request.url.path in self.exempt_paths:
+            return await call_next(request)
+
         request_id = str(uuid.uuid4())
 
         logger.info(f"[{request_id}] {request.method} {request.url.path}")
 
-        # Check API key
-        if request.headers.get("X-API-Key") == self.api_key:
+        with tracer.span(
+            "http.request",
+            {"http.method": request.method, "http.path": request.url.path},
+            traceparent=request.headers.get("traceparent"),
+        ) as span:
+            # Check API key
+            api_key = request.headers.get("X-API-Key")
+            server_key = self.api_key() if callable(self.api_key) else self.api_key
+            tenant = None
+            if api_key != server_key:
+                if api_key and self.tenants is not None:
+                    tenant = self.tenants.authenticate(api_key)
+                if tenant is None:
+                    logger.warning(f"[{request_id}] Unauthorized: Invalid API key")
+                    span.set_attribute("http.status_code", 401)
+                    return JSONResponse({"error": "Unauthorized"}, status_code=401)
+                if request.url.path.startswith(self.admin_prefixes):
+                    logger.warning(f"[{request_id}] Forbidden: tenant {tenant.id} on admin route")
+                    span.set_attribute("http.status_code", 403)
+                    return JSONResponse({"error": "Forbidden"}, status_code=403)
+                span.set_attribute("mcp.tenant", tenant.id)
+
             logger.debug(f"[{request_id}] API key authentication successful")
-            response = await call_next(request)
+            # Inherited by the SSE session, so its tool calls resolve tenant dependencies
+            tenant_token = current_tenant.set(tenant)
+            try:
+                response = await call_next(request)
+            finally:
+                current_tenant.reset(tenant_token)
             logger.info(f"[{request_id}] Completed with status {response.status_code}")
+            span.set_attribute("http.status_code", response.status_code)
             return response
-        else:
-            logger.warning(f"[{request_id}] Unauthorized: Invalid API key")
-            return JSONResponse({"error": "Unauthorized"}, status_code=401)
+
+
+class LazyTool(Tool):
+    """Tool registered from the manifest whose action module is imported on first call."""
+
+    loader: Callable[[], Callable[..., Any]] = Field(exclude=True)
+    _resolved: Optional[Tool] = PrivateAttr(default=None)
+
+    def resolve(self) -> Tool:
+        """Import the action and build the real tool, once."""
+        if self._resolved is None:
+            logger.info(f"Loading action for lazily registered tool: {self.name}")
+            self._resolved = Tool.from_function(
+                self.loader(), name=self.name, description=self.description
+            )
+        return self._resolved
+
+    async def run(self, arguments: dict[str, Any], context=None) -> Any:
+        return await self.resolve().run(arguments, context=context)
 
 
 class MCPServer:
     """Simplified MCP server."""
 
-    def __init__(self, api_key: str, service_name: str = "mcp-reference-server"):
+    def __init__(
+        self,
+        api_key: str,
+        service_name: str = "mcp-reference-server",
+        config: Optional[Settings] = None,
+    ):
         self.api_key = api_key
+        self.config = config or Settings()
         self.mcp = FastMCP(service_name)
+        self.lifespan = Lifespan(drain_timeout=self.config.SHUTDOWN_DRAIN_TIMEOUT)
+        # Registered first so buffered spans are flushed after everything else closed
+        self.lifespan.on_shutdown(self._flush_traces)
+        # Shared clients are warmed up after the port is bound and closed after draining
+        self.lifespan.on_warmup(DEPENDENCIES.startup)
+        self.lifespan.on_shutdown(DEPENDENCIES.shutdown)
+        # Pools stop before dependencies close, after in-flight calls drained
+        ACTION_POOLS.configure(
+            self.config.ACTION_THREAD_WORKERS, self.config.ACTION_PROCESS_WORKERS
+        )
+        self.lifespan.on_warmup(ACTION_POOLS.warm_up)
+        self.lifespan.on_shutdown(ACTION_POOLS.shutdown)
+        # Jobs run as lifespan tasks, so shutdown drains them like other background work
+        self.jobs = JOBS
+        self.jobs.configure(self.config.JOB_MAX_JOBS, self.config.JOB_RESULT_TTL, self.lifespan)
+
+        self.active_sessions = 0
+        self.recorder: Optional["TrafficRecorder"] = None
+        if self.config.TRAFFIC_RECORD_FILE:
+            from .recording import TrafficRecorder
+
+            self.recorder = TrafficRecorder(Path(self.config.TRAFFIC_RECORD_FILE))
+            self.lifespan.on_shutdown(self.recorder.close)
+        self.sse = ResumableSseTransport(
+            "/messages/",
+            self.run_session,
+            buffer_size=self.config.SSE_REPLAY_BUFFER,
+            grace=self.config.SSE_RESUME_GRACE,
+            recorder=self.recorder,
+            max_batch=self.config.SSE_MAX_BATCH,
+        )
+        # Sessions are closed before the dependencies they hold
+        self.lifespan.on_shutdown(self.sse.close_all)
+        self.health = HealthMonitor(
+            probe_interval=self.config.HEALTH_PROBE_INTERVAL,
+            probe_timeout=self.config.HEALTH_PROBE_TIMEOUT,
+            max_loop_lag=self.config.HEALTH_MAX_LOOP_LAG,
+        )
+        self.health.add_gauge(
+            "active_sessions", lambda: self.active_sessions, self.config.MAX_SESSIONS
+        )
+        # The first probe round is part of warm-up, later rounds run in the background
+        self.lifespan.on_warmup(self.health.run_probes)
+        self.lifespan.add_background_task(self.health.probe_forever, drain=False)
+        self.lifespan.add_background_task(self.health.sample_loop_lag, drain=False)
+
+        self.watchdog: Optional["Watchdog"] = None
+        if self.config.WATCHDOG_ENABLED:
+            from .watchdog import Watchdog
+
+            self.watchdog = Watchdog(stall_threshold=self.config.WATCHDOG_STALL_THRESHOLD)
+            self.lifespan.on_startup(self.watchdog.start)
+            self.lifespan.on_shutdown(self.watchdog.stop)
+            self.lifespan.add_background_task(self.watchdog.heartbeat, drain=False)
+        self._profiling = asyncio.Lock()
+        self._allocations: Optional["AllocationTracer"] = None
+        self._snapshotting = asyncio.Lock()
+        METRICS.register("server", self._collect_metrics)
+        METRICS.register("action_pools", ACTION_POOLS.metrics)
+        METRICS.register("jobs", JOBS.metrics)
+        TENANTS.configure(Path(self.config.TENANTS_FILE) if self.config.TENANTS_FILE else None)
+        if TENANTS.enabled:
+            # Loaded before serving so tenant keys work from the first request
+            self.lifespan.on_startup(lambda: self.reload_tenants(force=True))
+            self.lifespan.add_background_task(self._watch_tenants, drain=False)
+            METRICS.register("tenants", TENANTS.metrics)
+        self._list_tools_result: Optional[types.ServerResult] = None
+        # Serve tools/list from a cache that is rebuilt only when tools change
+        self.mcp._mcp_server.request_handlers[types.ListToolsRequest] = (
+            self._handle_list_tools
+        )
+        self._call_tool = self.mcp._mcp_server.request_handlers[types.CallToolRequest]
+        self.mcp._mcp_server.request_handlers[types.CallToolRequest] = (
+            self._handle_call_tool
+        )
+        # Package the actions were registered from, and the tools and source
+        # fingerprint of each of its modules, so a reload only re-registers
+        # the modules that changed
+        self.actions_package: ModuleType = actions
+        self.action_tools: dict[str, list[str]] = {}
+        self.action_fingerprints: dict[str, Optional[str]] = {}
+        self._reloading = asyncio.Lock()
+        self.lifespan.on_startup(self._install_reload_signal)
+        self.lifespan.on_shutdown(self._remove_reload_signal)
         logger.info(f"Initialized MCP server: {service_name}")
 
     def register_tool(self, func: Callable[..., T]) -> Callable[..., T]:
         """Register a function as an MCP tool."""
         logger.info(f"Registering MCP tool: {func.__name__}")
+        self._list_tools_result = None
         return self.mcp.tool()(func)
 
-    def create_app(self, debug: bool = False) -> Starlette:
-        """Create a Starlette application with MCP server."""
-        sse = SseServerTransport("/messages/")
+    def register_lazy_tool(
+        self, entry: dict[str, Any], loader: Callable[[], Callable[..., Any]]
+    ) -> None:
+        """Register a tool from a manifest entry without importing its action."""
+        logger.info(f"Registering MCP tool from manifest: {entry['name']}")
+        self.mcp._tool_manager._tools[entry["name"]] = LazyTool(
+            fn=loader,
+            loader=loader,
+            name=entry["name"],
+            description=entry["description"],
+            parameters=entry["parameters"],
+            fn_metadata=FuncMetadata(arg_model=ArgModelBase),
+            is_async=True,
+        )
+        self._list_tools_result = None
+
+    def unregister_tool(self, name: str) -> None:
+        """Remove a tool; calls already running finish normally."""
+        logger.info(f"Unregistering MCP tool: {name}")
+        self.mcp._tool_manager._tools.pop(name, None)
+        self._list_tools_result = None
+
+    @property
+    def allocations(self) -> "AllocationTracer":
+        """The tracemalloc helper of the /admin/memory endpoints, created on first use."""
+        if self._allocations is None:
+            from .memory import AllocationTracer
+
+            self._allocations = AllocationTracer(max_frames=self.config.MEMORY_TRACE_MAX_FRAMES)
+        return self._allocations
+
+    def session_stats(self) -> list[dict[str, Any]]:
+        """Per-session accounting, largest replay buffer first."""
+        return [
+            {**stats, "dependencies": DEPENDENCIES.session_instances(stats["id"])}
+            for stats in self.sse.stats()
+        ]
+
+    def _collect_metrics(self) -> list[Metric]:
+        sessions = self.sse.stats()
+        return [
+            Metric("mcp_active_sessions", "gauge", "Open SSE sessions").add(
+                self.active_sessions
+            ),
+            Metric(
+                "mcp_session_buffered_bytes", "gauge", "Bytes held in SSE replay buffers"
+            ).add(sum(session["buffered_bytes"] for session in sessions)),
+            Metric(
+                "mcp_session_outstanding_requests", "gauge", "Requests not yet answered"
+            ).add(sum(session["outstanding_requests"] for session in sessions)),
+            Metric("mcp_event_loop_lag_seconds", "gauge", "Recent worst event-loop lag").add(
+                self.health.loop_lag
+            ),
+            Metric("mcp_event_loop_stalls_total", "counter", "Event-loop stalls detected").add(
+                self.watchdog.stall_count if self.watchdog is not None else 0
+            ),
+        ]
+
+    async def _flush_traces(self) -> None:
+        tracer.shutdown()
+
+    async def reload_tenants(self, force: bool = False) -> Optional[list[str]]:
+        """Re-read the tenants file and close pools of changed or removed tenants."""
+        changed = await asyncio.to_thread(TENANTS.reload, force)
+        for tenant_id in changed or []:
+            logger.info(f"Closing dependencies of changed tenant {tenant_id}")
+            await DEPENDENCIES.close_tenant(tenant_id)
+        return changed
+
+    async def _watch_tenants(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.TENANTS_RELOAD_INTERVAL)
+            try:
+                await self.reload_tenants()
+            except Exception as e:
+                logger.error(f"Failed to reload tenants, keeping the previous ones: {str(e)}")
+
+    async def reload(self, config: Optional[Settings] = None) -> dict[str, list[str]]:
+        """
+        Apply new settings and changed action modules without dropping sessions.
+
+        Settings are re-read with ``load_config`` unless ``config`` is given.
+        If any changed, the server-supplied dependencies are rebuilt and
+        swapped in at once, and session, job and health limits are updated;
+        the outbox and suppression list keep running. Changes to settings in
+        ``RESTART_REQUIRED`` are not applied and keep their running values.
+        Action modules whose source changed are re-imported and their tools
+        replaced, and connected sessions are sent
+        ``notifications/tools/list_changed``.
+
+        Returns:
+            Names of the applied settings, of the changed settings that need
+            a restart, and of the added, updated and removed tools
+
+        Raises:
+            ValueError: If the new configuration is invalid. Errors importing
+                a changed action module are raised as well. Both are raised
+                before anything is swapped, so the running settings and
+                tools stay as they were.
+        """
+        async with self._reloading:
+            if config is None:
+                config = await asyncio.to_thread(load_config, None, True)
+            # Everything that can fail is staged first; nothing below the
+            # staging raises for a bad configuration or module
+            config, settings, restart_required, staged = self._stage_settings(config)
+            fingerprints = await asyncio.to_thread(fingerprint_actions, self.actions_package)
+            changed, removed, loaded = self._load_actions(fingerprints)
+
+            if staged is not None:
+                await self._apply_settings(config, staged, settings)
+            tools = self._apply_actions(fingerprints, changed, removed, loaded)
+            if any(tools.values()):
+                notified = self.sse.notify(types.JSONRPCMessage(types.JSONRPCNotification(
+                    jsonrpc="2.0", method="notifications/tools/list_changed"
+                )))
+                logger.info(f"Sent tools/list_changed to {notified} sessions")
+            return {"settings": settings, "restart_required": restart_required, **tools}
+
+    def _stage_settings(
+        self, config: Settings
+    ) -> tuple[Settings, list[str], list[str], Optional[DependencyRegistry]]:
+        previous, current = self.config.model_dump(), config.model_dump()
+        changed = sorted(
+            name for name in previous.keys() | current.keys()
+            if previous.get(name) != current.get(name)
+        )
+        restart_required = [name for name in changed if name in RESTART_REQUIRED]
+        if restart_required:
+            # So self.config keeps describing what is actually running
+            config = config.model_copy(
+                update={name: previous[name] for name in restart_required}
+            )
+            logger.warning(f"Reload: settings need a restart: {', '.join(restart_required)}")
+        changed = [name for name in changed if name not in RESTART_REQUIRED]
+        if not changed:
+            logger.info("Reload: no settings to apply")
+            return config, [], restart_required, None
+
+        # Built aside, so an invalid configuration leaves the running one alone
+        staged = DependencyRegistry()
+        populate_dependencies(
+            cast(str, config.POSTMARK_API_KEY),
+            cast(str, config.SENDER_EMAIL),
+            config,
+            self.lifespan,
+            registry=staged,
+        )
+        return config, changed, restart_required, staged
 
-        async def handle_sse(request: Request) -> JSONResponse | None:
-            request_id = str(uuid.uuid4())
-            logger.info(f"[{request_id}] SSE connection established")
+    async def _apply_settings(
+        self, config: Settings, staged: DependencyRegistry, changed: list[str]
+    ) -> None:
+        retired = DEPENDENCIES.replace(staged, keep=RELOAD_KEEPS)
+        self.config = config
+        self.api_key = config.MCP_SERVER_AUTH_KEY or self.api_key
+        self.jobs.configure(config.JOB_MAX_JOBS, config.JOB_RESULT_TTL, self.lifespan)
+        self.health.probe_interval = config.HEALTH_PROBE_INTERVAL
+        self.health.probe_timeout = config.HEALTH_PROBE_TIMEOUT
+        self.health.max_loop_lag = config.HEALTH_MAX_LOOP_LAG
+        self.health.set_gauge_limit("active_sessions", config.MAX_SESSIONS)
+        self.health.set_gauge_limit("outbox_backlog", config.OUTBOX_MAX_BACKLOG)
+        self.lifespan.spawn(self._retire(retired), name="retire-dependencies")
+        # Names only: values may be secrets
+        logger.info(f"Reload: settings changed: {', '.join(changed)}")
+        # Eager clients are warmed up after the swap, while calls already use them
+        await DEPENDENCIES.startup(set(staged) - set(RELOAD_KEEPS))
 
+    def _load_actions(
+        self, fingerprints: dict[str, Optional[str]]
+    ) -> tuple[list[str], list[str], dict[str, list[tuple[Callable[..., Any], Callable[..., Any]]]]]:
+        changed = [
+            module_name for module_name, fingerprint in fingerprints.items()
+            if module_name not in self.action_fingerprints
+            or fingerprint != self.action_fingerprints[module_name]
+        ]
+        removed = [name for name in self.action_fingerprints if name not in fingerprints]
+
+        # Imported before any tool is touched, so a module that fails to
+        # import leaves every tool as it was
+        importlib.invalidate_caches()
+        loaded = {
+            module_name: [
+                (func, make_wrapper(func))
+                for func in module_actions(load_action_module(module_name, self.actions_package))
+            ]
+            for module_name in changed
+        }
+        return changed, removed, loaded
+
+    def _apply_actions(
+        self,
+        fingerprints: dict[str, Optional[str]],
+        changed: list[str],
+        removed: list[str],
+        loaded: dict[str, list[tuple[Callable[..., Any], Callable[..., Any]]]],
+    ) -> dict[str, list[str]]:
+        before: set[str] = set()
+        for module_name in changed + removed:
+            for name in self.action_tools.pop(module_name, []):
+                self.unregister_tool(name)
+                before.add(name)
+        after: set[str] = set()
+        for module_name, wrappers in loaded.items():
+            self.action_tools[module_name] = []
+            for func, tool_wrapper in wrappers:
+                self.action_tools[module_name] += _register_action(self, func, tool_wrapper)
+            after.update(self.action_tools[module_name])
+        self.action_fingerprints = dict(fingerprints)
+
+        # Process workers imported the old source; threads share the reloaded modules
+        pool = ACTION_POOLS.process
+        package = self.actions_package.__name__
+        if any(f"{package}.{name}" in pool.modules for name in changed + removed):
+            pool.modules.difference_update(f"{package}.{name}" for name in removed)
+            pool.recycle()
+
+        report = {
+            "added": sorted(after - before),
+            "updated": sorted(after & before),
+            "removed": sorted(before - after),
+        }
+        if changed or removed:
+            logger.info(
+                f"Reload: action modules changed: {', '.join(changed + removed)} "
+                f"({len(report['added'])} tools added, {len(report['updated'])} updated, "
+                f"{len(report['removed'])} removed)"
+            )
+        return report
+
+    async def _retire(self, retired: list[tuple[Any, Any]]) -> None:
+        # Calls that resolved a replaced client before the swap keep using it
+        try:
+            await asyncio.wait_for(self.lifespan.stopping.wait(), self.config.RELOAD_RETIRE_DELAY)
+        except asyncio.TimeoutError:
+            pass
+        await DEPENDENCIES.close_retired(retired)
+
+    async def _reload_from_signal(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Reload failed, keeping the previous configuration: {str(e)}", exc_info=True)
+
+    async def _install_reload_signal(self) -> None:
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP,
+                lambda: self.lifespan.spawn(self._reload_from_signal(), name="reload"),
+            )
+        except (AttributeError, NotImplementedError, RuntimeError):
+            # No SIGHUP on Windows, and only the main thread can handle signals
+            logger.info("SIGHUP reload unavailable, use POST /admin/reload")
+
+    async def _remove_reload_signal(self) -> None:
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    async def run_session(
+        self,
+        session_id: str,
+        read_stream: MemoryObjectReceiveStream[types.JSONRPCMessage],
+        write_stream: MemoryObjectSendStream[types.JSONRPCMessage],
+    ) -> None:
+        """Serve one MCP session; it may outlive several SSE connections."""
+        # Tool calls on this session inherit the session id for scoped dependencies
+        current_session_id.set(session_id)
+        self.active_sessions += 1
+        try:
+            with tracer.span("mcp.sse_session", {"mcp.session_id": session_id}):
+                await self.mcp._mcp_server.run(
+                    read_stream,
+                    write_stream,
+                    # Advertised so clients re-list tools after a reload
+                    self.mcp._mcp_server.create_initialization_options(
+                        NotificationOptions(tools_changed=True)
+                    ),
+                )
+        finally:
+            self.active_sessions -= 1
+            await DEPENDENCIES.close_session(session_id)
+
+    async def _handle_list_tools(self, _: Any) -> types.ServerResult:
+        if self._list_tools_result is None:
+            tools = await self.mcp.list_tools()
+            self._list_tools_result = types.ServerResult(
+                types.ListToolsResult(tools=tools)
+            )
+        return self._list_tools_result
+
+    async def _handle_call_tool(self, req: types.CallToolRequest) -> types.ServerResult:
+        # Each call is its own trace: sessions can stay open for hours, and
+        # sampling per call keeps the ratio meaningful
+        with tracer.span(
+            "mcp.call_tool",
+            {"mcp.tool": req.params.name, "mcp.session_id": current_session_id.get()},
+            root=True,
+        ) as span:
+            result = await self._call_tool(req)
+            failed = getattr(result.root, "isError", False)
+            if failed:
+                span.status = "ERROR"
+            # Unknown tool names are not counted, so clients cannot grow the counters
+            if TENANTS.enabled and req.params.name in self.mcp._tool_manager._tools:
+                TENANTS.record(req.params.name, not failed)
+            return result
+
+    def create_app(self, debug: bool = False) -> Starlette:
+        """Create a Starlette application with MCP server."""
+        async def handle_sse(request: Request) -> EventSourceResponse | JSONResponse:
             # Quickly respond for health-check style requests to avoid blocking
             if request.method in {"HEAD", "OPTIONS"}:
                 logger.debug(
-                    f"[{request_id}] Non-streaming method {request.method} received – returning 200 without opening SSE stream"
+                    f"Non-streaming method {request.method} received – returning 200 without opening SSE stream"
                 )
                 return JSONResponse({"status": "ok"}, status_code=200)
 
-            try:
-                async with sse.connect_sse(
-                    request.scope, request.receive, request._send
-                ) as (read_stream, write_stream):
-                    await self.mcp._mcp_server.run(
-                        read_stream,
-                        write_stream,
-                        self.mcp._mcp_server.create_initialization_options(),
-                    )
-            except Exception as e:
-                logger.error(f"[{request_id}] SSE error: {str(e)}", exc_info=True)
-                raise
-            finally:
-                logger.info(f"[{request_id}] SSE connection closed")
+            # A reconnect within the grace period picks up its session where it left off
+            response = self.sse.resume(request.headers.get("last-event-id"))
+            if response is not None:
+                return response
+
+            if self.active_sessions >= self.config.MAX_SESSIONS:
+                logger.warning("Rejecting SSE connection: session cap reached")
+                return JSONResponse({"error": "Server at session capacity"}, status_code=503)
+            return self.sse.connect()
 
         async def handle_health(request: Request) -> JSONResponse:
             """Health check endpoint for Azure Container Apps and load balancers."""
@@ -108,20 +614,178 @@ class MCPServer:
                 "version": "1.0.0"
             }, status_code=200)
 
-        # Health endpoint bypasses API key middleware for Azure health checks
-        health_routes = [Route("/health", endpoint=handle_health)]
-        
+        async def handle_live(request: Request) -> JSONResponse:
+            """Liveness probe: the process and its event loop are responding."""
+            return JSONResponse({"status": "alive"}, status_code=200)
+
+        async def handle_ready(request: Request) -> JSONResponse:
+            """Readiness probe for Azure Container Apps and load balancers."""
+            if not self.lifespan.ready:
+                status, checks = "starting", {}
+            else:
+                ready, checks = self.health.readiness()
+                status = "healthy" if ready else "unhealthy"
+            return JSONResponse({
+                "status": status,
+                "service": "mcp-sse-server",
+                "version": "1.0.0",
+                "checks": checks,
+            }, status_code=200 if status == "healthy" else 503)
+
+        async def handle_profile(request: Request) -> PlainTextResponse | JSONResponse:
+            """Sample every thread for a while and return folded stacks."""
+            try:
+                seconds = float(request.query_params.get("seconds", "5"))
+                interval = float(request.query_params.get("interval", "0.01"))
+            except ValueError:
+                return JSONResponse({"error": "seconds and interval must be numbers"}, status_code=400)
+            if not 0 < seconds <= self.config.PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+                return JSONResponse({
+                    "error": f"seconds must be in (0, {self.config.PROFILE_MAX_SECONDS}]"
+                    " and interval in [0.001, 1]"
+                }, status_code=400)
+            if self._profiling.locked():
+                return JSONResponse({"error": "A profile is already running"}, status_code=409)
+
+            from .watchdog import sample_stacks
+
+            async with self._profiling:
+                logger.info(f"Sampling profile for {seconds}s every {interval}s")
+                folded = await asyncio.to_thread(sample_stacks, seconds, interval)
+            return PlainTextResponse(folded)
+
+        async def handle_memory(request: Request) -> JSONResponse:
+            """Per-session accounting and, while tracing, allocation growth since the last call."""
+            try:
+                limit = int(request.query_params.get("limit", "20"))
+            except ValueError:
+                return JSONResponse({"error": "limit must be an integer"}, status_code=400)
+            from .memory import GROUP_BY
+
+            group_by = request.query_params.get("group_by", "lineno")
+            if group_by not in GROUP_BY:
+                return JSONResponse(
+                    {"error": f"group_by must be one of {', '.join(GROUP_BY)}"}, status_code=400
+                )
+
+            sessions = self.session_stats()
+            report: dict[str, Any] = {
+                "sessions": {
+                    "count": len(sessions),
+                    "buffered_bytes": sum(s["buffered_bytes"] for s in sessions),
+                    "outstanding_requests": sum(s["outstanding_requests"] for s in sessions),
+                    "top": sessions[:limit],
+                },
+                "tracemalloc": {"tracing": self.allocations.tracing},
+            }
+            if self.allocations.tracing:
+                if self._snapshotting.locked():
+                    return JSONResponse({"error": "A snapshot is already running"}, status_code=409)
+                async with self._snapshotting:
+                    diff = await asyncio.to_thread(self.allocations.diff, limit, group_by)
+                report["tracemalloc"].update(diff)
+            return JSONResponse(report)
+
+        async def handle_memory_start(request: Request) -> JSONResponse:
+            """Start tracemalloc; later /admin/memory calls show growth between calls."""
+            try:
+                frames = int(request.query_params.get("frames", "1"))
+                await asyncio.to_thread(self.allocations.start, frames)
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
+            return JSONResponse({"tracing": True, "frames": frames})
+
+        async def handle_memory_stop(request: Request) -> JSONResponse:
+            """Stop tracemalloc and free its snapshots."""
+            self.allocations.stop()
+            return JSONResponse({"tracing": False})
+
+        async def handle_postmark_webhook(request: Request) -> JSONResponse:
+            """Ingest Postmark bounce, spam complaint and subscription events."""
+            body = await request.body()
+            if not _webhook_authorized(request, body, cast(str, self.config.POSTMARK_WEBHOOK_SECRET)):
+                logger.warning("Rejected Postmark webhook with invalid signature")
+                return JSONResponse({"error": "Invalid signature"}, status_code=401)
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return JSONResponse({"error": "Invalid JSON"}, status_code=400)
+
+            index = DEPENDENCIES.get("suppression_list")
+            events = payload if isinstance(payload, list) else [payload]
+            applied = sum(index.apply_event(event) for event in events if isinstance(event, dict))
+            logger.info(f"Postmark webhook: applied {applied} of {len(events)} events")
+            return JSONResponse({"applied": applied, "suppressed": len(index)})
+
+        async def handle_reload_tenants(request: Request) -> JSONResponse:
+            """Re-read the tenants file now."""
+            try:
+                changed = await self.reload_tenants(force=True)
+            except Exception as e:
+                logger.error(f"Failed to reload tenants: {str(e)}")
+                return JSONResponse({"error": f"Invalid tenants file: {str(e)}"}, status_code=400)
+            return JSONResponse({"tenants": len(TENANTS), "closed": changed or []})
+
+        async def handle_reload(request: Request) -> JSONResponse:
+            """Re-read settings and action modules without dropping sessions."""
+            if self._reloading.locked():
+                return JSONResponse({"error": "A reload is already running"}, status_code=409)
+            try:
+                report = await self.reload()
+            except Exception as e:
+                logger.error(f"Reload failed, keeping the previous configuration: {str(e)}", exc_info=True)
+                return JSONResponse({"error": f"Reload failed: {str(e)}"}, status_code=400)
+            return JSONResponse(report)
+
+        async def handle_metrics(request: Request) -> PlainTextResponse:
+            """Prometheus metrics."""
+            return PlainTextResponse(METRICS.render(), media_type=CONTENT_TYPE)
+
+        # Health endpoints bypass API key middleware for Azure health checks
+        health_routes = [
+            # Kept as the unconditional response existing monitors expect
+            Route("/health", endpoint=handle_health),
+            Route("/health/live", endpoint=handle_live),
+            Route("/health/ready", endpoint=handle_ready),
+        ]
+
+        # Webhooks authenticate with their own signature instead of the API key
+        webhook_routes = []
+        if self.config.POSTMARK_WEBHOOK_SECRET:
+            webhook_routes.append(Route(
+                "/webhooks/postmark", endpoint=handle_postmark_webhook, methods=["POST"]
+            ))
+
         # Protected routes with API key middleware
-        protected_middleware = [Middleware(APIKeyMiddleware, api_key=self.api_key)]
+        protected_middleware = [
+            Middleware(
+                APIKeyMiddleware,
+                api_key=lambda: self.api_key,
+                exempt_paths=[route.path for route in health_routes + webhook_routes],
+                tenants=TENANTS if TENANTS.enabled else None,
+                admin_prefixes=("/admin/", "/metrics"),
+            )
+        ]
         protected_routes = [
             Route("/sse", endpoint=handle_sse),
-            Mount("/messages/", app=sse.handle_post_message),
+            Route("/admin/profile", endpoint=handle_profile),
+            Route("/admin/memory", endpoint=handle_memory),
+            Route("/admin/memory/start", endpoint=handle_memory_start, methods=["POST"]),
+            Route("/admin/memory/stop", endpoint=handle_memory_stop, methods=["POST"]),
+            Route("/admin/reload", endpoint=handle_reload, methods=["POST"]),
+            Route("/metrics", endpoint=handle_metrics),
+            Mount("/messages/", app=self.sse.handle_post_message),
         ]
+        if TENANTS.enabled:
+            protected_routes.append(
+                Route("/admin/tenants/reload", endpoint=handle_reload_tenants, methods=["POST"])
+            )
 
         app = Starlette(
             debug=debug,
-            routes=health_routes + protected_routes,
+            routes=health_routes + webhook_routes + protected_routes,
             middleware=protected_middleware,
+            lifespan=self.lifespan,
         )
 
         logger.info("Starlette application created")
@@ -131,66 +795,363 @@ class MCPServer:
 def make_wrapper(action_func):
     """Create wrapper that injects only the dependencies the action explicitly asks for."""
     sig = inspect.signature(action_func)
-    wanted = {
-        name: value
-        for name, value in DEPENDENCIES.items()
-        if name in sig.parameters
-    }
+    wanted = [name for name in sig.parameters if name in DEPENDENCIES]
+    # Values are resolved per call, so dependencies can be lazy, scoped or replaced
+    binding = DEPENDENCIES.bind(wanted)
+
+    mode = execution_mode(action_func)
+    if mode is ExecutionMode.LOOP:
+        call = action_func
+    else:
+        if inspect.iscoroutinefunction(action_func):
+            raise TypeError(
+                f"{action_func.__name__} runs in the {mode.value} pool and must be a plain function"
+            )
+        ACTION_POOLS.require(mode, action_func.__module__)
+        pool = ACTION_POOLS.pool(mode)
+
+        async def call(**kwargs):
+            return await pool.run(action_func, kwargs)
+
+    limit = max_concurrency(action_func)
+    if limit is not None:
+        # Calls beyond the limit, e.g. from one batch, queue for a slot
+        slots = asyncio.Semaphore(limit)
+        unlimited = call
+
+        async def call(**kwargs):
+            async with slots:
+                return await unlimited(**kwargs)
+
+    async def invoke(kwargs):
+        injected = binding.resolve()
+        try:
+            return await call(**kwargs, **injected)
+        finally:
+            if binding.call_scoped:
+                await binding.release(injected)
 
     async def wrapper(**kwargs):
-        kwargs.update(wanted)       # pre-populate with server objects
-        return await action_func(**kwargs)
+        if tracer.enabled:
+            with tracer.span("mcp.action", {"mcp.action": action_func.__name__}):
+                return await invoke(kwargs)
+        # Fast path: only singleton dependencies, already resolved
+        if binding.static_only:
+            return await call(**kwargs, **binding.static)
+        return await invoke(kwargs)
+
+    tool = wrapper
+    if is_job_action(action_func):
+        async def job_wrapper(**kwargs):
+            job = JOBS.submit(tool.__name__, lambda: wrapper(**kwargs))
+            return {
+                "job_id": job.id,
+                "status": job.status.value,
+                "result_tool": result_tool_name(tool.__name__),
+            }
+
+        tool = job_wrapper
 
-    wrapper.__name__ = action_func.__name__.replace("_action", "_tool")
-    wrapper.__doc__  = action_func.__doc__
+    tool.__name__ = action_func.__name__.replace("_action", "_tool")
+    tool.__doc__  = action_func.__doc__
     
     # Build a new signature that excludes injected parameters
     params = [
         p for p in sig.parameters.values()
         if p.name not in wanted
     ]
-    wrapper.__signature__ = inspect.Signature(
+    tool.__signature__ = inspect.Signature(
         parameters=params,
         return_annotation=sig.return_annotation,
     )
     
     # Copy annotations but remove injected parameters
     if hasattr(action_func, "__annotations__"):
-        wrapper.__annotations__ = {
+        tool.__annotations__ = {
             k: v for k, v in action_func.__annotations__.items() 
             if k not in wanted
         }
     
-    return wrapper
+    return tool
 
 
-def register_tools(mcp_server: MCPServer, api_key: str, from_email: str) -> None:
-    """Register all MCP tools by auto-discovering action modules."""
+def _webhook_authorized(request: Request, body: bytes, secret: str) -> bool:
+    """
+    Check a webhook carries the shared secret.
 
-    # Populate the dependencies registry
-    DEPENDENCIES.update({
-        "postmark_api_key": api_key,
-        "sender_email": from_email,
-    })
+    Accepts an HMAC-SHA256 of the body in ``X-Webhook-Signature`` (hex,
+    optionally prefixed ``sha256=``) or, because Postmark cannot sign
+    requests itself, the secret as the basic-auth password of the webhook URL.
+    """
+    signature = request.headers.get("X-Webhook-Signature")
+    if signature:
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature.removeprefix("sha256=").encode(), expected.encode())
 
-    logger.info("Starting auto-discovery of action modules")
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        _, _, password = base64.b64decode(credentials).partition(b":")
+    except ValueError:
+        return False
+    # Bytes, as compare_digest refuses non-ASCII str
+    return hmac.compare_digest(password, secret.encode())
 
-    # Auto-discover and register all action functions
-    for _, module_name, _ in pkgutil.iter_modules(actions.__path__):
+
+def _mail_breaker(name: str, config: Settings) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_rate=config.MAIL_BREAKER_FAILURE_RATE,
+        slow_call_seconds=config.MAIL_BREAKER_SLOW_CALL_SECONDS,
+        window_size=config.MAIL_BREAKER_WINDOW,
+        min_calls=config.MAIL_BREAKER_MIN_CALLS,
+        open_seconds=config.MAIL_BREAKER_OPEN_SECONDS,
+        is_failure=is_transport_failure,
+    )
+
+
+def _build_mail_transport(
+    api_key: str, config: Settings, breakers: list[CircuitBreaker]
+) -> FailoverTransport:
+    primary = SMTPConnectionPool(
+        host=config.SMTP_HOST,
+        port=config.SMTP_PORT,
+        # Postmark uses the API key as both username and password
+        username=api_key,
+        password=api_key,
+        max_size=config.SMTP_POOL_SIZE,
+        timeout=config.SMTP_TIMEOUT,
+    )
+    transports: list[Any] = [primary]
+    if config.MAIL_FAILOVER == "postmark_http":
+        transports.append(PostmarkHTTPTransport(
+            api_key, DEPENDENCIES.get("http_client"), config.POSTMARK_API_URL
+        ))
+    elif config.MAIL_FAILOVER == "smtp":
+        transports.append(SMTPConnectionPool(
+            host=cast(str, config.SMTP_FALLBACK_HOST),
+            port=config.SMTP_FALLBACK_PORT,
+            username=config.SMTP_FALLBACK_USERNAME or api_key,
+            password=config.SMTP_FALLBACK_PASSWORD or api_key,
+            max_size=config.SMTP_POOL_SIZE,
+            timeout=config.SMTP_TIMEOUT,
+        ))
+    return FailoverTransport(list(zip(transports, breakers)))
+
+
+# Process-wide stores backed by files keep running across reloads; their
+# settings apply on the next restart
+RELOAD_KEEPS = ("outbox", "suppression_list")
+
+# Settings only read while the server starts; a reload reports changes to
+# them and keeps their running values until the next restart
+RESTART_REQUIRED = frozenset({
+    "LOG_LEVEL", "ENVIRONMENT", "FILE_LOGGING", "LOGS_DIR", "TOOL_MANIFEST_PATH",
+    "TRACING_SAMPLE_RATIO", "TRACING_EXPORTER", "TRACING_FILE",
+    "OUTBOX_PATH", "OUTBOX_MAX_ATTEMPTS", "SEND_RATE_PER_SECOND", "SEND_BURST",
+    "SUPPRESSION_PATH", "POSTMARK_WEBHOOK_SECRET",
+    "ACTION_THREAD_WORKERS", "ACTION_PROCESS_WORKERS",
+    "TENANTS_FILE", "SSE_REPLAY_BUFFER", "SSE_RESUME_GRACE", "SSE_MAX_BATCH",
+    "TRAFFIC_RECORD_FILE", "SHUTDOWN_DRAIN_TIMEOUT",
+    "HEALTH_SMTP_PROBE", "HEALTH_HTTP_PROBE_URL",
+    "WATCHDOG_ENABLED", "WATCHDOG_STALL_THRESHOLD", "MEMORY_TRACE_MAX_FRAMES",
+})
+
+
+def populate_dependencies(
+    api_key: str,
+    from_email: str,
+    config: Optional[Settings] = None,
+    lifespan: Optional[Lifespan] = None,
+    registry: Optional[DependencyRegistry] = None,
+) -> None:
+    """
+    Populate the dependencies registry with server-supplied objects.
+
+    ``registry`` defaults to ``DEPENDENCIES``; a reload fills a fresh one
+    and swaps it in. Factories always resolve other dependencies from
+    ``DEPENDENCIES``, so they see the swapped-in set.
+    """
+    config = config or Settings()
+    lifespan = lifespan or Lifespan()
+    registry = registry if registry is not None else DEPENDENCIES
+
+    registry.update({"lifespan": lifespan})
+    # A tenant's own values replace the server's; tenant scope caches them per tenant
+    registry.register_factory(
+        "postmark_api_key", lambda: tenant_value("postmark_api_key", api_key), scope=Scope.TENANT
+    )
+    registry.register_factory(
+        "sender_email", lambda: tenant_value("sender_email", from_email), scope=Scope.TENANT
+    )
+
+    if config.MAIL_FAILOVER not in (None, "postmark_http", "smtp"):
+        raise ValueError(
+            f"MAIL_FAILOVER must be 'postmark_http' or 'smtp', got {config.MAIL_FAILOVER!r}"
+        )
+    if config.MAIL_FAILOVER == "smtp" and not config.SMTP_FALLBACK_HOST:
+        raise ValueError("SMTP_FALLBACK_HOST is required when MAIL_FAILOVER is 'smtp'")
+    # Breakers outlive the transports built around them, so metrics can read them
+    breakers: dict[Optional[str], list[CircuitBreaker]] = {}
+
+    def tenant_breakers() -> list[CircuitBreaker]:
+        tenant = current_tenant.get()
+        tenant_id = tenant.id if tenant is not None else None
+        if tenant_id not in breakers:
+            prefix = f"{tenant_id}/" if tenant_id is not None else ""
+            breakers[tenant_id] = [_mail_breaker(f"{prefix}smtp", config)]
+            if config.MAIL_FAILOVER:
+                breakers[tenant_id].append(
+                    _mail_breaker(f"{prefix}{config.MAIL_FAILOVER}_fallback", config)
+                )
+        return breakers[tenant_id]
+
+    tenant_breakers()
+    METRICS.register("mail", lambda: circuit_breaker_metrics(
+        breaker for tenant in list(breakers.values()) for breaker in tenant
+    ))
+
+    # Pooled clients are only constructed when an action first asks for them,
+    # once per tenant so tenants never share connections or credentials
+    registry.register_factory(
+        "mail_transport",
+        lambda: _build_mail_transport(
+            DEPENDENCIES.get("postmark_api_key"), config, tenant_breakers()
+        ),
+        scope=Scope.TENANT,
+        startup=(
+            (lambda transport: transport.warm_up(config.SMTP_POOL_WARM_CONNECTIONS))
+            if config.SMTP_POOL_WARM_CONNECTIONS
+            else None
+        ),
+        shutdown=lambda transport: transport.close(),
+        eager=config.SMTP_POOL_WARM_CONNECTIONS > 0,
+    )
+    registry.register_factory(
+        "http_client",
+        lambda: httpx.AsyncClient(timeout=config.HTTP_CLIENT_TIMEOUT),
+        scope=Scope.TENANT,
+        shutdown=lambda client: client.aclose(),
+    )
+    registry.register_factory("progress", progress_reporter, scope=Scope.CALL)
+
+    # One memory budget for the process; each load() also has a per-call cap
+    attachment_budget = MemoryBudget(config.ATTACHMENT_MEMORY_BUDGET)
+    url_prefixes = tuple(
+        prefix.strip() for prefix in config.ATTACHMENT_URL_PREFIXES.split(",") if prefix.strip()
+    )
+    registry.register_factory(
+        "attachment_loader",
+        lambda: AttachmentLoader(
+            DEPENDENCIES.get("http_client"),
+            attachment_budget,
+            root=Path(config.ATTACHMENT_DIR) if config.ATTACHMENT_DIR else None,
+            url_prefixes=url_prefixes,
+            spool_threshold=config.ATTACHMENT_SPOOL_THRESHOLD,
+            call_memory=config.ATTACHMENT_CALL_MEMORY,
+            max_bytes=config.ATTACHMENT_MAX_BYTES,
+        ),
+        scope=Scope.TENANT,
+    )
+    METRICS.register("attachments", lambda: [
+        Metric(
+            "mcp_attachment_memory_bytes", "gauge", "Attachment bytes currently held in memory"
+        ).add(attachment_budget.used)
+    ])
+
+    def scheduled_by() -> dict[str, Any]:
+        tenant = current_tenant.get()
+        return {"tenant": tenant.id} if tenant is not None else {}
+
+    async def send_scheduled(item: dict[str, Any]) -> None:
+        item = dict(item)
+        tenant = None
+        if "tenant" in item:
+            tenant_id = item.pop("tenant")
+            tenant = TENANTS.get(tenant_id)
+            if tenant is None:
+                raise ValueError(f"Tenant {tenant_id} no longer exists")
+        # Delivered with the credentials and pools of the tenant that scheduled it
+        tenant_token = current_tenant.set(tenant)
         try:
-            mod = importlib.import_module(
-                f".actions.{module_name}", package=__package__
-            )
-            logger.debug(f"Loaded action module: {module_name}")
+            refs = [AttachmentRef(**ref) for ref in item.pop("attachments", [])]
+            loading = DEPENDENCIES.get("attachment_loader").load(refs) if refs else nullcontext([])
+            async with loading as files:
+                await email.send_email(
+                    **item,
+                    api_key=DEPENDENCIES.get("postmark_api_key"),
+                    from_email=DEPENDENCIES.get("sender_email"),
+                    transport=DEPENDENCIES.get("mail_transport"),
+                    suppression=DEPENDENCIES.get("suppression_list"),
+                    attachments=files,
+                )
+        finally:
+            current_tenant.reset(tenant_token)
 
-            for name, func in inspect.getmembers(mod, inspect.iscoroutinefunction):
-                # Convention: functions ending in _action are registerable
-                if name.endswith("_action"):
-                    logger.info(f"Registering action: {name}")
+    # Eager so messages persisted before a restart are delivered without waiting for a call
+    registry.register_factory(
+        "outbox",
+        lambda: OutboundScheduler(
+            Path(config.OUTBOX_PATH),
+            send_scheduled,
+            lifespan,
+            rate=config.SEND_RATE_PER_SECOND,
+            burst=config.SEND_BURST,
+            concurrency=config.SMTP_POOL_SIZE,
+            max_attempts=config.OUTBOX_MAX_ATTEMPTS,
+            annotate=scheduled_by,
+        ),
+        startup=lambda outbox: outbox.start(),
+        shutdown=lambda outbox: outbox.close(),
+        eager=True,
+    )
+    registry.register_factory(
+        "suppression_list",
+        lambda: SuppressionIndex(Path(config.SUPPRESSION_PATH), lifespan),
+        startup=lambda index: index.load(),
+        shutdown=lambda index: index.flush(),
+        eager=True,
+    )
+    METRICS.register("outbox", lambda: [
+        Metric("mcp_outbox_backlog", "gauge", "Scheduled emails waiting for delivery").add(
+            len(DEPENDENCIES.get("outbox"))
+        )
+    ])
+    METRICS.register("suppression", lambda: [
+        Metric("mcp_suppressed_addresses", "gauge", "Addresses on the suppression list").add(
+            len(DEPENDENCIES.get("suppression_list"))
+        )
+    ])
+
+
+def load_action_module(module_name: str, package: ModuleType = actions) -> Any:
+    """Import an action module, re-running it if it was imported before."""
+    mod = sys.modules.get(f"{package.__name__}.{module_name}")
+    if mod is not None:
+        return importlib.reload(mod)
+    return importlib.import_module(f"{package.__name__}.{module_name}")
 
-                    # Create and register the wrapper
-                    tool_wrapper = make_wrapper(func)
-                    mcp_server.register_tool(tool_wrapper)
+
+def module_actions(mod: Any) -> list[Callable[..., Any]]:
+    """The registerable action functions of an action module."""
+    # Pool-run actions are plain functions, loop actions are coroutines
+    if getattr(mod, "EXECUTION_MODE", None) in (ExecutionMode.THREAD, ExecutionMode.PROCESS):
+        predicate = inspect.isfunction
+    else:
+        predicate = inspect.iscoroutinefunction
+    # Convention: functions ending in _action are registerable
+    return [func for name, func in inspect.getmembers(mod, predicate) if name.endswith("_action")]
+
+
+def discover_actions(package: ModuleType = actions) -> Iterator[tuple[str, Callable[..., Any]]]:
+    """Import every action module and yield (module_name, action_func) pairs."""
+    for _, module_name, _ in pkgutil.iter_modules(package.__path__):
+        try:
+            mod = importlib.import_module(f"{package.__name__}.{module_name}")
+            logger.debug(f"Loaded action module: {module_name}")
+            for func in module_actions(mod):
+                yield module_name, func
 
         except Exception as e:
             logger.error(
@@ -198,4 +1159,103 @@ def register_tools(mcp_server: MCPServer, api_key: str, from_email: str) -> None
             )
             raise
 
+
+def _manifest_loader(
+    package: ModuleType, module_name: str, action_name: str
+) -> Callable[[], Callable[..., Any]]:
+    def load() -> Callable[..., Any]:
+        mod = importlib.import_module(f"{package.__name__}.{module_name}")
+        return make_wrapper(getattr(mod, action_name))
+
+    return load
+
+
+def _register_action(
+    mcp_server: MCPServer, func: Callable[..., Any], tool_wrapper: Callable[..., Any]
+) -> list[str]:
+    """Register an action's tool, and its result tool for jobs; returns the tool names."""
+    logger.info(f"Registering action: {func.__name__}")
+    mcp_server.register_tool(tool_wrapper)
+    names = [tool_wrapper.__name__]
+    if is_job_action(func):
+        mcp_server.register_tool(make_result_tool(tool_wrapper.__name__, JOBS))
+        names.append(result_tool_name(tool_wrapper.__name__))
+    return names
+
+
+async def _probe_http(url: str) -> None:
+    response = await DEPENDENCIES.get("http_client").head(url)
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP probe returned {response.status_code}")
+
+
+def register_tools(
+    mcp_server: MCPServer,
+    api_key: str,
+    from_email: str,
+    manifest_path: Optional[Path] = None,
+    config: Optional[Settings] = None,
+    actions_package: ModuleType = actions,
+) -> None:
+    """
+    Register all MCP tools by auto-discovering action modules.
+
+    When ``manifest_path`` points to a manifest that is still fresh, tools are
+    registered from it instead and action modules are imported on first call.
+    Modules are taken from ``actions_package``, which later reloads rescan.
+    """
+    config = config or Settings()
+    mcp_server.actions_package = actions_package
+    populate_dependencies(api_key, from_email, config, mcp_server.lifespan)
+
+    # Probes look up the current dependency so replaced clients are picked up
+    if config.HEALTH_SMTP_PROBE:
+        mcp_server.health.add_probe(
+            "smtp", lambda: DEPENDENCIES.get("mail_transport").probe()
+        )
+    if config.HEALTH_HTTP_PROBE_URL:
+        mcp_server.health.add_probe(
+            "http", lambda: _probe_http(config.HEALTH_HTTP_PROBE_URL)
+        )
+
+    mcp_server.health.add_gauge(
+        "outbox_backlog", lambda: len(DEPENDENCIES.get("outbox")), config.OUTBOX_MAX_BACKLOG
+    )
+
+    if manifest_path is not None:
+        manifest = load_manifest(manifest_path)
+        if manifest is not None and is_manifest_fresh(
+            manifest, DEPENDENCIES, mcp_server.actions_package
+        ):
+            logger.info(f"Registering tools from manifest: {manifest_path}")
+            mcp_server.action_fingerprints = dict(manifest["modules"])
+            for entry in manifest["tools"]:
+                # So the process pool is still pre-warmed without importing the action
+                ACTION_POOLS.require(
+                    ExecutionMode(entry["execution_mode"]),
+                    f"{mcp_server.actions_package.__name__}.{entry['module']}",
+                )
+                mcp_server.register_lazy_tool(
+                    entry,
+                    _manifest_loader(mcp_server.actions_package, entry["module"], entry["action"]),
+                )
+                names = mcp_server.action_tools.setdefault(entry["module"], [])
+                names.append(entry["name"])
+                if entry["job"]:
+                    mcp_server.register_tool(make_result_tool(entry["name"], JOBS))
+                    names.append(result_tool_name(entry["name"]))
+            return
+        logger.info("Tool manifest unavailable or stale, falling back to discovery")
+
+    logger.info("Starting auto-discovery of action modules")
+
+    # Fingerprinted first, so a module edited while discovery runs is picked
+    # up by the next reload
+    mcp_server.action_fingerprints = fingerprint_actions(mcp_server.actions_package)
+    # Auto-discover and register all action functions
+    for module_name, func in discover_actions(mcp_server.actions_package):
+        mcp_server.action_tools.setdefault(module_name, []).extend(
+            _register_action(mcp_server, func, make_wrapper(func))
+        )
+
     logger.info("Action module auto-discovery completed")
@@ -0,0 +1,93 @@
+"""
+Prometheus metrics for the MCP server.
+
+Metrics are read from the objects that already hold them (circuit breakers,
+the health monitor...) when ``/metrics`` is scraped, so nothing is counted
+twice and the request path stays untouched. Components register a collector
+under a name; registering the same name again replaces it.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+from .utils.circuit_breaker import BreakerState, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class Metric:
+    """A metric family and its samples."""
+
+    name: str
+    type: str  # "gauge" or "counter"
+    help: str
+    samples: list[tuple[dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, **labels: str) -> "Metric":
+        self.samples.append((labels, value))
+        return self
+
+
+Collector = Callable[[], Iterable[Metric]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Named collectors rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._collectors: dict[str, Collector] = {}
+
+    def register(self, name: str, collector: Collector) -> None:
+        self._collectors[name] = collector
+
+    def unregister(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        lines = []
+        for name, collector in list(self._collectors.items()):
+            try:
+                metrics = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector {name} failed: {str(e)}")
+                continue
+            for metric in metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+                for labels, value in metric.samples:
+                    lines.append(f"{metric.name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def circuit_breaker_metrics(breakers: Iterable[CircuitBreaker]) -> list[Metric]:
+    """Describe breaker states and call outcomes."""
+    state = Metric(
+        "mcp_circuit_breaker_state", "gauge", "1 for the current state of each circuit breaker"
+    )
+    calls = Metric(
+        "mcp_circuit_breaker_calls_total", "counter", "Calls through each circuit breaker by outcome"
+    )
+    for breaker in breakers:
+        for candidate in BreakerState:
+            state.add(int(breaker.state is candidate), breaker=breaker.name, state=candidate.value)
+        for outcome, count in breaker.calls.items():
+            calls.add(count, breaker=breaker.name, outcome=outcome)
+    return [state, calls]
+
+
+# Process-wide registry served at /metrics
+METRICS = MetricsRegistry()
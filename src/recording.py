@@ -0,0 +1,197 @@
+"""
+Opt-in capture of anonymised MCP traffic for replay.
+
+With ``TRAFFIC_RECORD_FILE`` set, the SSE transport hands every JSON-RPC
+message it receives or sends to a ``TrafficRecorder``, which appends one
+compact JSON line per message (gzip-compressed when the file name ends in
+``.gz``)::
+
+    {"v": 1, "format": "mcp-traffic"}
+    {"t": 0.0, "s": 1, "k": "req", "id": 1, "m": "initialize"}
+    {"t": 0.41, "s": 1, "k": "req", "id": 3, "m": "tools/call",
+     "tool": "send_email_tool", "a": {"recipients": ["r3f9c01aa@example.invalid"],
+                                      "subject": "xxxxxxx", "body": "xxxx..."}}
+    {"t": 0.52, "s": 1, "k": "res", "id": 3, "ok": true}
+
+``t`` is seconds since recording started and ``s`` numbers sessions in the
+order they appeared. Full buffers are written by a worker thread, so the
+event loop never waits on the file. Only the shape of tool arguments is kept: email
+addresses are replaced by pseudonyms (stable within one recording, so
+per-recipient patterns survive) and every other string by ``x`` repeated to
+the same length, so payload sizes stay realistic. Numbers, booleans,
+structure and ISO 8601 times (``send_at``) are kept as is. Responses are
+reduced to whether they succeeded.
+
+Replay a recording with ``python -m src.replay``.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import mcp.types as types
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+$")
+# Kept as is: times carry no personal data and replays need them to parse
+_ISO_TIME = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?$")
+
+
+class Redactor:
+    """Replaces argument values by values of the same shape."""
+
+    def __init__(self, salt: Optional[bytes] = None):
+        # Never written out, so pseudonyms cannot be matched to addresses later
+        self._salt = salt or secrets.token_bytes(16)
+
+    def pseudonym(self, address: str) -> str:
+        digest = hmac.new(self._salt, address.lower().encode(), hashlib.sha256).hexdigest()
+        return f"r{digest[:8]}@example.invalid"
+
+    def shape(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if _EMAIL.match(value):
+                return self.pseudonym(value)
+            if _ISO_TIME.match(value):
+                return value
+            return "x" * len(value)
+        if isinstance(value, dict):
+            return {key: self.shape(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.shape(item) for item in value]
+        return value
+
+
+class TrafficRecorder:
+    """Appends anonymised JSON-RPC traffic to a file, buffering writes."""
+
+    def __init__(self, path: Path, buffer_size: int = 256, redactor: Optional[Redactor] = None):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.redactor = redactor or Redactor()
+        self.started_at = time.monotonic()
+        # Numbers of open sessions only; ended sessions are dropped
+        self._sessions: dict[str, int] = {}
+        self._session_count = 0
+        self._buffer: list[str] = [json.dumps({"v": FORMAT_VERSION, "format": "mcp-traffic"})]
+        self._writer: Optional[asyncio.Task] = None
+
+    def _session(self, session_id: str) -> int:
+        if session_id not in self._sessions:
+            self._session_count += 1
+            self._sessions[session_id] = self._session_count
+        return self._sessions[session_id]
+
+    def end(self, session_id: str) -> None:
+        """Forget a closed session; its later messages would start a new number."""
+        self._sessions.pop(session_id, None)
+
+    def _write(self, session_id: str, record: dict[str, Any]) -> None:
+        record = {
+            "t": round(time.monotonic() - self.started_at, 6),
+            "s": self._session(session_id),
+            **record,
+        }
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        if len(self._buffer) >= self.buffer_size:
+            self._flush_in_background()
+
+    def inbound(self, session_id: str, message: types.JSONRPCMessage) -> None:
+        """Record a message received from the client."""
+        root = message.root
+        if isinstance(root, types.JSONRPCRequest):
+            record: dict[str, Any] = {"k": "req", "id": root.id, "m": root.method}
+            if root.method == "tools/call" and root.params:
+                record["tool"] = root.params.get("name")
+                record["a"] = self.redactor.shape(root.params.get("arguments") or {})
+            self._write(session_id, record)
+        elif isinstance(root, types.JSONRPCNotification):
+            self._write(session_id, {"k": "note", "m": root.method})
+
+    def outbound(self, session_id: str, message: types.JSONRPCMessage) -> None:
+        """Record a response sent to the client; notifications are skipped."""
+        root = message.root
+        if isinstance(root, types.JSONRPCResponse):
+            ok = not root.result.get("isError", False)
+            self._write(session_id, {"k": "res", "id": root.id, "ok": ok})
+        elif isinstance(root, types.JSONRPCError):
+            self._write(session_id, {"k": "res", "id": root.id, "ok": False})
+
+    def _flush_in_background(self) -> None:
+        lines, self._buffer = self._buffer, []
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._append(lines)
+            return
+        self._writer = loop.create_task(self._append_after(self._writer, lines))
+
+    async def _append_after(self, previous: Optional[asyncio.Task], lines: list[str]) -> None:
+        # Chained, so buffers reach the file in the order they filled up
+        if previous is not None:
+            await previous
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if self.path.suffix == ".gz" else open
+        try:
+            with opener(self.path, "at") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to write traffic recording {self.path}: {str(e)}")
+
+    def flush(self) -> None:
+        """Write buffered records now; blocks, so only call it off the event loop."""
+        lines, self._buffer = self._buffer, []
+        self._append(lines)
+
+    async def close(self) -> None:
+        """Wait for background writes, then write what is still buffered."""
+        if self._writer is not None:
+            await self._writer
+        await asyncio.to_thread(self.flush)
+        logger.info(f"Recorded traffic of {self._session_count} sessions to {self.path}")
+
+
+def read_recording(path: Path) -> list[dict[str, Any]]:
+    """
+    Read the records of a traffic file.
+
+    A file appended to by several server runs holds one header per run; the
+    runs are laid end to end, with their sessions numbered apart.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    records: list[dict[str, Any]] = []
+    time_offset, session_offset = 0.0, 0
+    with opener(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "v" in record:
+                if record["v"] != FORMAT_VERSION:
+                    raise ValueError(f"Unsupported traffic format version: {record['v']}")
+                if records:
+                    time_offset = records[-1]["t"]
+                    session_offset = max(r["s"] for r in records)
+                continue
+            record["t"] += time_offset
+            record["s"] += session_offset
+            records.append(record)
+    return records
@@ -0,0 +1,299 @@
+"""
+Replay recorded MCP traffic and report latency distributions.
+
+Drives a server with the sessions and tool calls of a file written by
+``TRAFFIC_RECORD_FILE`` (see ``src/recording.py``), keeping their original
+timing, optionally sped up, and reports per-tool latency percentiles next to
+the latencies seen when the traffic was recorded. Run it against two releases
+with the same recording to compare them on production-shaped load:
+
+    python -m src.replay traffic.jsonl.gz
+    python -m src.replay traffic.jsonl.gz --speed 4 --json report.json
+    python -m src.replay traffic.jsonl.gz --url http://127.0.0.1:8080 --api-key ...
+
+Without ``--url`` a local server is started on its own event loop and thread,
+with the mail transport replaced by a stub that waits ``--mail-latency``
+seconds per message, so no email leaves the machine.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import secrets
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+
+from .recording import read_recording
+
+logger = logging.getLogger(__name__)
+
+INITIALIZE_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "capabilities": {},
+    "clientInfo": {"name": "mcp-replay", "version": "1.0.0"},
+}
+
+
+class StubMailTransport:
+    """Mail transport that accepts every message after a fixed delay."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, msg: Any) -> None:
+        await asyncio.sleep(self.latency)
+        self.sent += 1
+
+    async def probe(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 < q <= 100)."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies: list[float], errors: int) -> dict[str, Any]:
+    summary: dict[str, Any] = {"count": len(latencies), "errors": errors}
+    if latencies:
+        for q in (50, 90, 99):
+            summary[f"p{q}_ms"] = round(percentile(latencies, q) * 1000, 3)
+        summary["max_ms"] = round(max(latencies) * 1000, 3)
+    return summary
+
+
+def _key(record: dict[str, Any]) -> str:
+    return record.get("tool") or record["m"]
+
+
+def recorded_latencies(records: list[dict[str, Any]]) -> dict[str, list[float]]:
+    """Latencies observed while recording, by tool name or method."""
+    requests = {(r["s"], r["id"]): r for r in records if r["k"] == "req"}
+    latencies: dict[str, list[float]] = defaultdict(list)
+    for record in records:
+        if record["k"] == "res" and (record["s"], record["id"]) in requests:
+            request = requests[(record["s"], record["id"])]
+            latencies[_key(request)].append(record["t"] - request["t"])
+    return latencies
+
+
+async def _events(response: httpx.Response) -> AsyncIterator[dict[str, str]]:
+    event: dict[str, str] = {}
+    async for line in response.aiter_lines():
+        if not line:
+            if event:
+                yield event
+            event = {}
+        elif not line.startswith(":"):
+            field, _, value = line.partition(":")
+            event[field] = value.removeprefix(" ")
+
+
+class SessionReplay:
+    """Replays one recorded session over its own SSE connection."""
+
+    def __init__(self, client: httpx.AsyncClient, records: list[dict[str, Any]], speed: float):
+        self.client = client
+        self.records = records
+        self.speed = speed
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._pending: dict[Any, asyncio.Future] = {}
+        self._endpoint: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def _listen(self, response: httpx.Response) -> None:
+        async for event in _events(response):
+            if event.get("event") == "endpoint" and not self._endpoint.done():
+                self._endpoint.set_result(event["data"])
+            elif event.get("event") == "message":
+                message = json.loads(event["data"])
+                future = self._pending.pop(message.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+
+    async def _call(self, record: dict[str, Any], endpoint: str, timeout: float) -> None:
+        payload: dict[str, Any] = {"jsonrpc": "2.0", "id": record["id"], "method": record["m"]}
+        if record["m"] == "initialize":
+            payload["params"] = INITIALIZE_PARAMS
+        elif record["m"] == "tools/call":
+            payload["params"] = {"name": record["tool"], "arguments": record.get("a", {})}
+        future = asyncio.get_running_loop().create_future()
+        self._pending[record["id"]] = future
+        started = time.perf_counter()
+        key = _key(record)
+        try:
+            await self.client.post(endpoint, json=payload)
+            message = await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, httpx.HTTPError):
+            self._pending.pop(record["id"], None)
+            self.errors[key] += 1
+            return
+        self.latencies[key].append(time.perf_counter() - started)
+        if "error" in message or message.get("result", {}).get("isError"):
+            self.errors[key] += 1
+
+    async def run(self, started: float, timeout: float) -> None:
+        async with self.client.stream("GET", "/sse") as response:
+            listener = asyncio.create_task(self._listen(response))
+            try:
+                endpoint = await asyncio.wait_for(self._endpoint, timeout)
+                calls = []
+                for record in self.records:
+                    delay = started + record["t"] / self.speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    if record["k"] == "note":
+                        await self.client.post(endpoint, json={"jsonrpc": "2.0", "method": record["m"]})
+                    elif record["k"] == "req":
+                        call = asyncio.create_task(self._call(record, endpoint, timeout))
+                        # The session only accepts other requests once initialized
+                        if record["m"] == "initialize":
+                            await call
+                        else:
+                            calls.append(call)
+                await asyncio.gather(*calls)
+            finally:
+                listener.cancel()
+
+
+async def replay(
+    records: list[dict[str, Any]],
+    url: str,
+    api_key: str,
+    speed: float = 1.0,
+    timeout: float = 30.0,
+) -> dict[str, dict[str, Any]]:
+    """
+    Replay ``records`` against the server at ``url``.
+
+    Returns:
+        Latency summary per tool name or method, with the recorded summary
+        under ``"recorded"`` for comparison
+    """
+    sessions: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        sessions[record["s"]].append(record)
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=url,
+        headers={"X-API-Key": api_key},
+        timeout=httpx.Timeout(timeout, read=None),
+        limits=limits,
+    ) as client:
+        replays = [SessionReplay(client, session, speed) for session in sessions.values()]
+        started = time.perf_counter()
+        await asyncio.gather(*(r.run(started, timeout) for r in replays))
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for r in replays:
+        for key, values in r.latencies.items():
+            latencies[key].extend(values)
+        for key, count in r.errors.items():
+            errors[key] += count
+    recorded = recorded_latencies(records)
+    return {
+        key: {**summarize(latencies[key], errors[key]), "recorded": summarize(recorded[key], 0)}
+        for key in sorted(set(latencies) | set(errors))
+    }
+
+
+@contextmanager
+def local_server(mail_latency: float = 0.0) -> Iterator[tuple[str, str]]:
+    """Run a server with stubbed mail on a free port; yields (url, api_key)."""
+    import uvicorn
+
+    from .config import Settings
+    from .dependencies import Scope
+    from .mcp_tools import DEPENDENCIES, MCPServer, register_tools
+
+    api_key = secrets.token_hex(16)
+    with tempfile.TemporaryDirectory() as data_dir:
+        config = Settings(
+            OUTBOX_PATH=str(Path(data_dir) / "outbox.sqlite3"),
+            SUPPRESSION_PATH=str(Path(data_dir) / "suppression.bin"),
+            HEALTH_SMTP_PROBE=False,
+            SMTP_POOL_WARM_CONNECTIONS=0,
+            TRAFFIC_RECORD_FILE=None,
+            TENANTS_FILE=None,
+        )
+        mcp_server = MCPServer(api_key=api_key, config=config)
+        register_tools(mcp_server, "replay", "replay@example.invalid", config=config)
+        DEPENDENCIES.register_factory(
+            "mail_transport", lambda: StubMailTransport(mail_latency), scope=Scope.TENANT
+        )
+        server = uvicorn.Server(uvicorn.Config(
+            mcp_server.create_app(), host="127.0.0.1", port=0, log_level="warning"
+        ))
+        # Its own thread and loop, so the replaying client does not add to server latency
+        thread = threading.Thread(target=server.run, name="replay-server", daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("Local server failed to start")
+            time.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        try:
+            yield f"http://127.0.0.1:{port}", api_key
+        finally:
+            server.should_exit = True
+            thread.join()
+
+
+def print_report(report: dict[str, dict[str, Any]]) -> None:
+    columns = ("count", "errors", "p50_ms", "p90_ms", "p99_ms", "max_ms")
+    print(f"{'tool / method':<32}" + "".join(f"{c:>10}" for c in columns) + f"{'rec p50':>10}{'rec p99':>10}")
+    for key, row in report.items():
+        values = "".join(f"{row.get(c, '-'):>10}" for c in columns)
+        recorded = row["recorded"]
+        print(f"{key:<32}{values}{recorded.get('p50_ms', '-'):>10}{recorded.get('p99_ms', '-'):>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", type=Path, help="Traffic file written by TRAFFIC_RECORD_FILE")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor (default: 1)")
+    parser.add_argument("--url", help="Server to replay against (default: a local stubbed server)")
+    parser.add_argument("--api-key", help="API key for --url")
+    parser.add_argument("--mail-latency", type=float, default=0.0, help="Stub mail delay in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a response")
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    if args.url and not args.api_key:
+        parser.error("--api-key is required with --url")
+    logging.basicConfig(level=logging.WARNING)
+
+    records = read_recording(args.recording)
+    sessions = len({record["s"] for record in records})
+    print(f"Replaying {len(records)} messages in {sessions} sessions at {args.speed}x")
+
+    if args.url:
+        report = asyncio.run(replay(records, args.url, args.api_key, args.speed, args.timeout))
+    else:
+        with local_server(args.mail_latency) as (url, api_key):
+            report = asyncio.run(replay(records, url, api_key, args.speed, args.timeout))
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
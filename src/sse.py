@@ -0,0 +1,410 @@
+"""
+Resumable SSE transport for the MCP server.
+
+The transport shipped with the MCP SDK ties a session to its HTTP connection:
+when a proxy or a flaky network drops the stream, the session and every
+in-flight tool call die with it, and the client has to initialize again. Here
+a session outlives its connection:
+
+- every SSE frame carries an event id ``<session>:<seq>``;
+- messages sent to the client are kept in a bounded per-session replay
+  buffer;
+- when the stream drops, the session stays alive for a grace period. A client
+  that reconnects within it with ``Last-Event-ID`` gets the same session back
+  and receives the messages it missed, including results of tool calls that
+  finished while it was away;
+- a request id the session has already seen is acknowledged but not run
+  again, so a client that retries its POSTs after reconnecting does not
+  execute a tool twice;
+- the messages endpoint also accepts JSON-RPC batch arrays, so a client
+  making several tool calls at once needs one POST; the calls run
+  concurrently and each result is streamed as soon as it is ready.
+
+A reconnect that cannot be resumed (unknown or expired session, another
+tenant's session, or missed messages that were already evicted from the
+buffer) falls back to a new session.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import quote
+
+import anyio
+import mcp.types as types
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from pydantic import ValidationError
+from sse_starlette import EventSourceResponse
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .tenants import tenant_label
+
+if TYPE_CHECKING:
+    from .recording import TrafficRecorder
+
+logger = logging.getLogger(__name__)
+
+# Request ids remembered per session to ignore retried POSTs
+_SEEN_REQUEST_IDS = 1024
+
+RunSession = Callable[
+    [str, MemoryObjectReceiveStream[types.JSONRPCMessage], MemoryObjectSendStream[types.JSONRPCMessage]],
+    Awaitable[None],
+]
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[tuple[str, int]]:
+    """Split a ``Last-Event-ID`` header into (session id, sequence number)."""
+    if not event_id:
+        return None
+    session_id, _, seq = event_id.strip().rpartition(":")
+    if not session_id or not seq.isdigit():
+        return None
+    return session_id, int(seq)
+
+
+class SseSession:
+    """One MCP session and the messages it sent, independent of any connection."""
+
+    def __init__(
+        self,
+        read_writer: MemoryObjectSendStream[types.JSONRPCMessage],
+        buffer_size: int,
+    ):
+        self.id = uuid.uuid4().hex
+        self.tenant = tenant_label()
+        self.read_writer = read_writer
+        self.events: deque[tuple[int, dict[str, Any]]] = deque(maxlen=buffer_size)
+        self.seq = 0
+        self.closed = False
+        # Set whenever an event is added, the session closes or a new connection takes over
+        self.changed = asyncio.Event()
+        # Incremented by each connection; only the latest one streams
+        self.subscriber = 0
+        # Server notifications such as tools/list_changed wait for the handshake
+        self.initialized = False
+        self.task: Optional[asyncio.Task] = None
+        self._expiry: Optional[asyncio.TimerHandle] = None
+        self._seen: OrderedDict[str | int, None] = OrderedDict()
+        # Accounting for /admin/memory
+        self.created_at = time.monotonic()
+        self.connected = False
+        self.messages_in = 0
+        self.messages_out = 0
+        self.buffered_bytes = 0
+        # Request id -> (tool name or method, received at) until answered
+        self.outstanding: dict[str | int, tuple[str, float]] = {}
+
+    def append(self, event: dict[str, Any]) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.buffered_bytes -= len(self.events[0][1]["data"])
+        self.seq += 1
+        self.events.append((self.seq, event))
+        self.buffered_bytes += len(event["data"])
+        self.messages_out += 1
+        self.changed.set()
+
+    def received(self, message: types.JSONRPCMessage) -> None:
+        """Count a message from the client, tracking requests until answered."""
+        self.messages_in += 1
+        root = message.root
+        if isinstance(root, types.JSONRPCRequest):
+            name = root.method
+            if root.method == "tools/call" and root.params:
+                name = str(root.params.get("name", name))
+            self.outstanding[root.id] = (name, time.monotonic())
+        elif isinstance(root, types.JSONRPCNotification) and root.method == "notifications/initialized":
+            self.initialized = True
+
+    def answered(self, message: types.JSONRPCMessage) -> None:
+        if isinstance(message.root, (types.JSONRPCResponse, types.JSONRPCError)):
+            self.outstanding.pop(message.root.id, None)
+
+    def stats(self) -> dict[str, Any]:
+        """Memory and request accounting for this session."""
+        now = time.monotonic()
+        oldest = min(self.outstanding.values(), key=lambda request: request[1], default=None)
+        return {
+            "id": self.id,
+            "tenant": self.tenant,
+            "age_seconds": round(now - self.created_at, 3),
+            "connected": self.connected,
+            "buffered_events": len(self.events),
+            "buffered_bytes": self.buffered_bytes,
+            "messages_in": self.messages_in,
+            "messages_out": self.messages_out,
+            "outstanding_requests": len(self.outstanding),
+            "oldest_request": (
+                {"name": oldest[0], "seconds": round(now - oldest[1], 3)} if oldest else None
+            ),
+        }
+
+    def can_replay_from(self, seq: int) -> bool:
+        """Return whether every event after ``seq`` is still buffered."""
+        if seq > self.seq:
+            return False
+        return not self.events or self.events[0][0] <= seq + 1
+
+    def first_seen(self, request_id: str | int) -> bool:
+        """Record a request id; False if the session has already received it."""
+        if request_id in self._seen:
+            return False
+        self._seen[request_id] = None
+        if len(self._seen) > _SEEN_REQUEST_IDS:
+            self._seen.popitem(last=False)
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        self.changed.set()
+        if self._expiry is not None:
+            self._expiry.cancel()
+        if self.task is not None:
+            self.task.cancel()
+
+
+class ResumableSseTransport:
+    """SSE transport whose sessions survive reconnects within a grace period."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        run_session: RunSession,
+        buffer_size: int = 256,
+        grace: float = 30.0,
+        recorder: Optional["TrafficRecorder"] = None,
+        max_batch: int = 100,
+    ):
+        self.endpoint = endpoint
+        self.run_session = run_session
+        self.buffer_size = buffer_size
+        self.grace = grace
+        self.recorder = recorder
+        self.max_batch = max_batch
+        self._sessions: dict[str, SseSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def connect(self) -> EventSourceResponse:
+        """Start a new session and stream it to the client."""
+        read_writer, read_stream = anyio.create_memory_object_stream[types.JSONRPCMessage](0)
+        write_stream, write_reader = anyio.create_memory_object_stream[types.JSONRPCMessage](0)
+        session = SseSession(read_writer, self.buffer_size)
+        self._sessions[session.id] = session
+        session.task = asyncio.create_task(
+            self._run(session, read_stream, write_stream, write_reader),
+            name=f"sse-session-{session.id}",
+        )
+        logger.info(f"[{session.id}] SSE session started")
+        return EventSourceResponse(self._stream(session, 0, resumed=False))
+
+    def resume(self, last_event_id: Optional[str]) -> Optional[EventSourceResponse]:
+        """
+        Reattach a client to the session named by its ``Last-Event-ID``.
+
+        Returns:
+            The stream replaying missed messages, or None if the session
+            cannot be resumed and a new one must be started
+        """
+        parsed = parse_event_id(last_event_id)
+        if parsed is None:
+            return None
+        session_id, seq = parsed
+        session = self._sessions.get(session_id)
+        if session is None or session.closed or session.tenant != tenant_label():
+            logger.info(f"[{session_id}] Cannot resume unknown or expired SSE session")
+            return None
+        if not session.can_replay_from(seq):
+            logger.warning(
+                f"[{session_id}] Cannot resume SSE session from event {seq}: "
+                "missed messages were evicted from the replay buffer"
+            )
+            session.close()
+            return None
+        logger.info(f"[{session_id}] SSE session resumed from event {seq}")
+        return EventSourceResponse(self._stream(session, seq, resumed=True))
+
+    async def _run(
+        self,
+        session: SseSession,
+        read_stream: MemoryObjectReceiveStream[types.JSONRPCMessage],
+        write_stream: MemoryObjectSendStream[types.JSONRPCMessage],
+        write_reader: MemoryObjectReceiveStream[types.JSONRPCMessage],
+    ) -> None:
+        async def pump() -> None:
+            # Always drained, so a slow or absent client never blocks the server
+            async with write_reader:
+                async for message in write_reader:
+                    if self.recorder is not None:
+                        self.recorder.outbound(session.id, message)
+                    session.answered(message)
+                    session.append({
+                        "event": "message",
+                        "data": message.model_dump_json(by_alias=True, exclude_none=True),
+                    })
+
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(pump)
+                try:
+                    async with read_stream, write_stream:
+                        await self.run_session(session.id, read_stream, write_stream)
+                finally:
+                    tg.cancel_scope.cancel()
+        except Exception as e:
+            logger.error(f"[{session.id}] SSE session error: {str(e)}", exc_info=True)
+        finally:
+            session.task = None
+            session.close()
+            self._sessions.pop(session.id, None)
+            if self.recorder is not None:
+                self.recorder.end(session.id)
+            logger.info(f"[{session.id}] SSE session closed")
+
+    async def _stream(
+        self, session: SseSession, seq: int, resumed: bool
+    ) -> AsyncIterator[dict[str, Any]]:
+        session.subscriber += 1
+        subscriber = session.subscriber
+        if session._expiry is not None:
+            session._expiry.cancel()
+            session._expiry = None
+        # Wakes the previous connection, if any, so it stops streaming
+        session.changed.set()
+        session.connected = True
+        try:
+            endpoint = {
+                "event": "endpoint",
+                "data": f"{quote(self.endpoint)}?session_id={session.id}",
+            }
+            # A resumed client already holds a later event id; don't move it back
+            if not resumed:
+                endpoint["id"] = f"{session.id}:0"
+            yield endpoint
+
+            while session.subscriber == subscriber:
+                if not session.can_replay_from(seq):
+                    logger.warning(f"[{session.id}] Client fell behind the replay buffer")
+                    session.close()
+                    return
+                pending = [(s, event) for s, event in session.events if s > seq]
+                if not pending:
+                    if session.closed:
+                        return
+                    session.changed.clear()
+                    await session.changed.wait()
+                    continue
+                for s, event in pending:
+                    yield {**event, "id": f"{session.id}:{s}"}
+                    seq = s
+        finally:
+            if session.subscriber == subscriber:
+                session.connected = False
+            if session.subscriber == subscriber and not session.closed:
+                logger.info(
+                    f"[{session.id}] SSE connection dropped, keeping session for {self.grace}s"
+                )
+                session._expiry = asyncio.get_running_loop().call_later(
+                    self.grace, self._expire, session, subscriber
+                )
+
+    def _expire(self, session: SseSession, subscriber: int) -> None:
+        if session.subscriber == subscriber and not session.closed:
+            logger.info(f"[{session.id}] SSE session expired without reconnect")
+            session.close()
+
+    async def handle_post_message(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """ASGI app receiving the client's JSON-RPC messages for a session."""
+        request = Request(scope, receive)
+        session_id = request.query_params.get("session_id")
+        if session_id is None:
+            response = Response("session_id is required", status_code=400)
+            return await response(scope, receive, send)
+
+        session = self._sessions.get(session_id)
+        if session is None or session.closed or session.tenant != tenant_label():
+            response = Response("Could not find session", status_code=404)
+            return await response(scope, receive, send)
+
+        try:
+            messages = self._parse(await request.body())
+        except ValidationError as e:
+            logger.warning(f"[{session_id}] Could not parse message: {str(e)}")
+            response = Response("Could not parse message", status_code=400)
+            return await response(scope, receive, send)
+        except ValueError as e:
+            response = Response(f"Invalid batch: {str(e)}", status_code=400)
+            return await response(scope, receive, send)
+
+        response = Response("Accepted", status_code=202)
+        await response(scope, receive, send)
+        # Server.run dispatches each request as its own task, so the calls of a
+        # batch run concurrently and each response is streamed when it is ready
+        for message in messages:
+            if isinstance(message.root, types.JSONRPCRequest) and not session.first_seen(
+                message.root.id
+            ):
+                # A retry after reconnecting; the result is replayed, not recomputed
+                logger.info(f"[{session_id}] Ignoring repeated request {message.root.id}")
+                continue
+            if self.recorder is not None:
+                self.recorder.inbound(session_id, message)
+            session.received(message)
+            try:
+                await session.read_writer.send(message)
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                logger.info(f"[{session_id}] Session closed before message was delivered")
+                return
+
+    def _parse(self, body: bytes) -> list[types.JSONRPCMessage]:
+        """Parse a single JSON-RPC message or a batch array of them."""
+        if not body.lstrip().startswith(b"["):
+            return [types.JSONRPCMessage.model_validate_json(body)]
+        items = json.loads(body)
+        if not items:
+            raise ValueError("batch is empty")
+        if len(items) > self.max_batch:
+            raise ValueError(f"more than {self.max_batch} messages")
+        return [types.JSONRPCMessage.model_validate(item) for item in items]
+
+    def notify(self, message: types.JSONRPCMessage) -> int:
+        """
+        Send a server notification to every initialized session.
+
+        It goes through the replay buffer like any other message, so a
+        session that is reconnecting receives it once it is back.
+
+        Returns:
+            Number of sessions notified
+        """
+        event = {
+            "event": "message",
+            "data": message.model_dump_json(by_alias=True, exclude_none=True),
+        }
+        sessions = [
+            session for session in self._sessions.values()
+            if session.initialized and not session.closed
+        ]
+        for session in sessions:
+            session.append(event)
+        return len(sessions)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Accounting of every open session, largest replay buffer first."""
+        stats = [session.stats() for session in self._sessions.values()]
+        return sorted(stats, key=lambda session: session["buffered_bytes"], reverse=True)
+
+    async def close_all(self) -> None:
+        """Close every session; used on shutdown."""
+        sessions = list(self._sessions.values())
+        for session in sessions:
+            session.close()
+        tasks = [session.task for session in sessions if session.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,76 @@
+"""
+Startup-time instrumentation for the MCP server.
+
+Enable with ``python mcp_server.py --profile-startup`` or by setting
+``MCP_STARTUP_PROFILE=true``. Each startup phase records its wall-clock
+duration and how many modules were imported while it ran, which makes it easy
+to see which phase pulls in heavy dependencies.
+"""
+
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+class StartupProfiler:
+    """Records timings and module imports for named startup phases."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases: list[dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase. Does nothing when profiling is disabled."""
+        if not self.enabled:
+            yield
+            return
+
+        modules_before = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            imported = sorted(set(sys.modules) - modules_before)
+            self.phases.append(
+                {
+                    "name": name,
+                    "seconds": round(elapsed, 6),
+                    "modules_imported": len(imported),
+                    "top_level_imports": sorted(
+                        {module.split(".")[0] for module in imported}
+                    ),
+                }
+            )
+
+    def report(self) -> dict[str, Any]:
+        """Return the recorded phases and total time since the profiler was created."""
+        return {
+            "phases": self.phases,
+            "total_seconds": round(time.perf_counter() - self.started_at, 6),
+        }
+
+    def log_report(
+        self, app_logger: logging.Logger, output_path: Optional[Path] = None
+    ) -> None:
+        """Log the startup report to the application logger and optionally write it as JSON."""
+        if not self.enabled:
+            return
+
+        report = self.report()
+        for phase in report["phases"]:
+            app_logger.info(
+                f"Startup phase {phase['name']}: {phase['seconds'] * 1000:.1f} ms, "
+                f"{phase['modules_imported']} modules imported"
+            )
+        app_logger.info(f"Startup total: {report['total_seconds'] * 1000:.1f} ms")
+
+        if output_path is not None:
+            output_path.write_text(json.dumps(report, indent=2))
+            app_logger.info(f"Startup profile written to {output_path}")
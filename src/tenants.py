@@ -0,0 +1,164 @@
+"""
+Tenants for the MCP server.
+
+One server can serve several customers. Each tenant has its own API key and
+its own values for per-tenant dependencies (``postmark_api_key``,
+``sender_email``...), and gets its own cached SMTP and HTTP connection pools:
+dependencies registered with ``Scope.TENANT`` are constructed once per tenant
+and resolved for the tenant that authenticated the request.
+
+Tenants are read from a JSON file::
+
+    {"tenants": [
+        {"id": "acme",
+         "api_key_sha256": "<hex SHA-256 of the tenant's API key>",
+         "postmark_api_key": "...",
+         "sender_email": "noreply@acme.example"}
+    ]}
+
+Only hashes of API keys are stored; authenticating a request is one SHA-256
+and one dict lookup. The file can be reloaded while the server runs, and the
+pools of tenants that changed or were removed are closed. Print the hash for a
+new key with:
+
+    python -m src.tenants <api-key>
+"""
+
+import hashlib
+import json
+import logging
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .context import current_tenant
+from .metrics import Metric
+
+logger = logging.getLogger(__name__)
+
+
+def hash_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """A customer with its own API key and dependency values."""
+
+    id: str
+    values: dict[str, Any] = field(default_factory=dict, hash=False)
+
+
+def tenant_value(name: str, default: Any) -> Any:
+    """Return the current tenant's value for ``name``, or ``default``."""
+    tenant = current_tenant.get()
+    if tenant is None:
+        return default
+    return tenant.values.get(name, default)
+
+
+def tenant_label() -> str:
+    tenant = current_tenant.get()
+    return tenant.id if tenant is not None else "default"
+
+
+class TenantRegistry:
+    """API key hashes mapped to tenants, reloadable from a JSON file."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._by_key: dict[str, Tenant] = {}
+        self._by_id: dict[str, Tenant] = {}
+        self._mtime: Optional[float] = None
+        # (tenant, tool, outcome) -> calls
+        self.usage: Counter[tuple[str, str, str]] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def configure(self, path: Optional[Path]) -> None:
+        self.path = path
+        self._mtime = None
+
+    def authenticate(self, api_key: str) -> Optional[Tenant]:
+        return self._by_key.get(hash_key(api_key))
+
+    def get(self, tenant_id: str) -> Optional[Tenant]:
+        return self._by_id.get(tenant_id)
+
+    def _parse(self, data: Any) -> dict[str, Tenant]:
+        by_key: dict[str, Tenant] = {}
+        ids: set[str] = set()
+        for entry in data["tenants"]:
+            values = dict(entry)
+            tenant_id = str(values.pop("id"))
+            key_hash = str(values.pop("api_key_sha256")).lower()
+            if tenant_id in ids or key_hash in by_key:
+                raise ValueError(f"Duplicate tenant id or API key: {tenant_id}")
+            tenant = Tenant(tenant_id, values)
+            ids.add(tenant_id)
+            by_key[key_hash] = tenant
+        return by_key
+
+    def reload(self, force: bool = False) -> Optional[list[str]]:
+        """
+        Re-read the tenants file if it changed since it was last read; blocks.
+
+        Returns:
+            Ids of tenants that were changed or removed (whose cached
+            dependencies must be closed), or None if the file was not re-read
+
+        Raises:
+            OSError, ValueError, KeyError: If the file cannot be read or parsed;
+                the previous tenants stay in effect
+        """
+        if self.path is None:
+            return None
+        mtime = self.path.stat().st_mtime
+        if not force and mtime == self._mtime:
+            return None
+        by_key = self._parse(json.loads(self.path.read_text()))
+        by_id = {tenant.id: tenant for tenant in by_key.values()}
+
+        changed = [
+            tenant_id
+            for tenant_id, tenant in self._by_id.items()
+            if tenant_id not in by_id or by_id[tenant_id] != tenant
+        ]
+        self._by_key, self._by_id, self._mtime = by_key, by_id, mtime
+        logger.info(f"Loaded {len(by_id)} tenants from {self.path}")
+        return changed
+
+    def record(self, tool: str, ok: bool) -> None:
+        """Count a tool call for the current tenant."""
+        self.usage[(tenant_label(), tool, "success" if ok else "error")] += 1
+
+    def metrics(self) -> list[Metric]:
+        tenants = Metric("mcp_tenants", "gauge", "Tenants loaded from the tenants file").add(
+            len(self)
+        )
+        calls = Metric("mcp_tenant_tool_calls_total", "counter", "Tool calls by tenant and outcome")
+        for (tenant, tool, outcome), count in list(self.usage.items()):
+            calls.add(count, tenant=tenant, tool=tool, outcome=outcome)
+        return [tenants, calls]
+
+
+# Process-wide registry used by the API key middleware
+TENANTS = TenantRegistry()
+
+
+def main() -> None:
+    """Print the hash to store in the tenants file for an API key."""
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m src.tenants <api-key>")
+    print(hash_key(sys.argv[1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Lightweight, OpenTelemetry-compatible tracing for the MCP server.
+
+Spans carry W3C trace/span ids and are exported using the OTLP JSON field
+names (``traceId``, ``spanId``, ``parentSpanId``, ``startTimeUnixNano``...), so
+files written by ``FileSpanExporter`` can be loaded by OTLP-aware tooling.
+Exporters work offline: ``InMemorySpanExporter`` for tests and
+``FileSpanExporter`` for JSON-lines files.
+
+Tracing is off by default. While it is off, or for traces that are not
+sampled, ``tracer.span()`` returns a shared no-op span, so instrumented code
+pays one attribute check per span.
+"""
+
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "start_time_unix_nano",
+        "end_time_unix_nano",
+        "attributes",
+        "status",
+        "_tracer",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        attributes: dict[str, Any],
+    ):
+        self._tracer = tracer
+        self._token = None
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.status = "UNSET"
+        self.start_time_unix_nano = 0
+        self.end_time_unix_nano = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.start_time_unix_nano = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_time_unix_nano = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = "ERROR"
+            self.attributes["exception.type"] = exc_type.__name__
+            self.attributes["exception.message"] = str(exc)
+        elif self.status == "UNSET":
+            self.status = "OK"
+        self._tracer.export(self)
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1e9
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize using OTLP JSON field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_time_unix_nano,
+            "endTimeUnixNano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+
+
+class _NoOpSpan:
+    """Shared stand-in for spans that are not recorded."""
+
+    __slots__ = ()
+
+    @property
+    def status(self) -> str:
+        return "UNSET"
+
+    @status.setter
+    def status(self, value: str) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoOpSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+class _UnsampledSpan(_NoOpSpan):
+    """Marks the current context as unsampled so child spans are skipped too."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "_UnsampledSpan":
+        self._token = _current_span.set(NOOP_SPAN)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+
+
+NOOP_SPAN = _NoOpSpan()
+_current_span: ContextVar[Optional[Span | _NoOpSpan]] = ContextVar(
+    "current_span", default=None
+)
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list; intended for tests."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def names(self) -> list[str]:
+        return [span.name for span in self.spans]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """Appends finished spans to a JSON-lines file, buffering writes."""
+
+    def __init__(self, path: Path, buffer_size: int = 64):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self._buffer: list[str] = []
+        # Spans also finish in worker threads (e.g. SMTP calls via to_thread)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._buffer.append(json.dumps(span.to_dict()))
+            if len(self._buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write("\n".join(self._buffer) + "\n")
+        self._buffer.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def shutdown(self) -> None:
+        self.flush()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str]]:
+    """Parse a W3C ``traceparent`` header into (trace_id, parent_span_id)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter."""
+
+    def __init__(
+        self, sample_ratio: float = 0.0, exporter: Optional[SpanExporter] = None
+    ):
+        self.configure(sample_ratio, exporter)
+
+    def configure(
+        self, sample_ratio: float, exporter: Optional[SpanExporter] = None
+    ) -> None:
+        self.sample_ratio = sample_ratio
+        self.exporter = exporter
+        self.enabled = sample_ratio > 0 and exporter is not None
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[dict[str, Any]] = None,
+        root: bool = False,
+        traceparent: Optional[str] = None,
+    ) -> Span | _NoOpSpan:
+        """
+        Start a span as a child of the current one.
+
+        Args:
+            name: Span name
+            attributes: Initial span attributes
+            root: Start a new trace even if a span is active
+            traceparent: Incoming W3C traceparent header to continue
+
+        Returns:
+            A context manager; a no-op span when tracing is off or unsampled.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        attributes = dict(attributes) if attributes else {}
+        parent = None if root else _current_span.get()
+        if parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is not None:
+            return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+        remote = parse_traceparent(traceparent)
+        if remote is not None:
+            return Span(self, name, remote[0], remote[1], attributes)
+
+        # Sampling is decided once per trace, at its root span
+        if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+            return _UnsampledSpan()
+        return Span(self, name, secrets.token_hex(16), None, attributes)
+
+    def export(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {str(e)}")
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+# Process-wide tracer, configured at startup by configure_tracing()
+tracer = Tracer()
+
+
+def configure_tracing(
+    sample_ratio: float, exporter: Optional[SpanExporter] = None
+) -> Tracer:
+    """Configure the process-wide tracer."""
+    tracer.configure(sample_ratio, exporter)
+    if tracer.enabled:
+        logger.info(f"Tracing enabled with sample ratio {sample_ratio}")
+    return tracer
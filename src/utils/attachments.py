@@ -0,0 +1,393 @@
+"""
+Streaming email attachments for the MCP server.
+
+Attachments are passed to tools as references rather than content:
+
+- ``path``: a file inside ``ATTACHMENT_DIR``, read straight from disk;
+- ``url``: fetched with the shared HTTP client from an allowed URL prefix and
+  spooled into a temporary file.
+
+Spooled content stays in memory only while it is small: a spool moves to
+disk once it passes the per-attachment threshold, once the call's in-memory
+bytes pass the per-call cap, or once the process-wide ``MemoryBudget`` is
+used up. ``StreamingMessage`` then generates the MIME message a line batch at
+a time, so neither the SMTP DATA phase nor the Postmark HTTP request body
+ever holds a whole encoded message in memory.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import mimetypes
+import quopri
+import re
+import smtplib
+import uuid
+from contextlib import asynccontextmanager
+from email import policy
+from email.message import MIMEPart
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Multiple of 57 (bytes per 76-character base64 line) and of 3 (whole base64 quanta)
+CHUNK_SIZE = 57 * 1024
+
+
+class AttachmentRef(BaseModel):
+    """Reference to attachment content; exactly one of ``path`` or ``url``."""
+
+    path: Optional[str] = None
+    url: Optional[str] = None
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+class MemoryBudget:
+    """Process-wide cap on attachment bytes held in memory."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def try_reserve(self, size: int) -> bool:
+        if self.used + size > self.limit:
+            return False
+        self.used += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.used -= size
+
+
+class Attachment:
+    """Attachment content on disk or in a spool, readable any number of times."""
+
+    def __init__(
+        self,
+        filename: str,
+        content_type: str,
+        size: int,
+        path: Optional[Path] = None,
+        spool: Optional[SpooledTemporaryFile] = None,
+    ):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.path = path
+        self.spool = spool
+
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the content in ``size`` byte chunks; blocks on file reads."""
+        if self.path is not None:
+            with self.path.open("rb") as f:
+                while chunk := f.read(size):
+                    yield chunk
+            return
+        assert self.spool is not None
+        self.spool.seek(0)
+        while chunk := self.spool.read(size):
+            yield chunk
+
+
+class _CallMemory:
+    """In-memory attachment bytes for one call, against the call and global caps."""
+
+    def __init__(self, limit: int, budget: MemoryBudget):
+        self.limit = limit
+        self.budget = budget
+        self.used = 0
+
+    def try_reserve(self, size: int) -> bool:
+        if self.used + size > self.limit or not self.budget.try_reserve(size):
+            return False
+        self.used += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.used -= size
+        self.budget.release(size)
+
+
+class AttachmentLoader:
+    """Resolves attachment references for a call within size and memory caps."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        budget: MemoryBudget,
+        root: Optional[Path] = None,
+        url_prefixes: tuple[str, ...] = (),
+        spool_threshold: int = 256 * 1024,
+        call_memory: int = 1024 * 1024,
+        max_bytes: int = 10 * 1024 * 1024,
+    ):
+        """
+        Args:
+            client: Shared HTTP client used for URL references
+            budget: Process-wide in-memory cap
+            root: Directory path references must resolve inside; None disables them
+            url_prefixes: Allowed URL prefixes; empty disables URL references
+            spool_threshold: Bytes of one attachment kept in memory before spooling to disk
+            call_memory: Bytes of all attachments of a call kept in memory
+            max_bytes: Total attachment size allowed per call
+        """
+        self.client = client
+        self.budget = budget
+        self.root = root.resolve() if root is not None else None
+        self.url_prefixes = url_prefixes
+        self._prefixes = [httpx.URL(prefix) for prefix in url_prefixes]
+        self.spool_threshold = spool_threshold
+        self.call_memory = call_memory
+        self.max_bytes = max_bytes
+
+    def _resolve_path(self, ref: AttachmentRef) -> Attachment:
+        if self.root is None:
+            raise ValueError("File attachments are not enabled on this server")
+        path = (self.root / ref.path).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            raise ValueError(f"Attachment not found in the attachment directory: {ref.path}")
+        filename = ref.filename or path.name
+        return Attachment(filename, _content_type(ref, filename), path.stat().st_size, path=path)
+
+    def _check_url(self, ref: AttachmentRef) -> str:
+        url = ref.url or ""
+        try:
+            allowed = any(_url_within(httpx.URL(url), prefix) for prefix in self._prefixes)
+        except httpx.InvalidURL:
+            allowed = False
+        if not allowed:
+            raise ValueError(f"Attachment URL is not allowed: {url}")
+        return url
+
+    async def _fetch(self, ref: AttachmentRef, memory: _CallMemory, remaining: int) -> Attachment:
+        url = self._check_url(ref)
+
+        # Spools never roll over by themselves; the caps below decide when
+        spool = SpooledTemporaryFile(max_size=0)
+        on_disk = False
+        in_memory = 0
+        size = 0
+        try:
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                if int(response.headers.get("Content-Length", 0)) > remaining:
+                    raise ValueError(f"Attachments exceed {self.max_bytes} bytes")
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > remaining:
+                        raise ValueError(f"Attachments exceed {self.max_bytes} bytes")
+                    if not on_disk and (
+                        size > self.spool_threshold or not memory.try_reserve(len(chunk))
+                    ):
+                        await asyncio.to_thread(spool.rollover)
+                        memory.release(in_memory)
+                        in_memory = 0
+                        on_disk = True
+                    if on_disk:
+                        await asyncio.to_thread(spool.write, chunk)
+                    else:
+                        spool.write(chunk)
+                        in_memory += len(chunk)
+        except BaseException:
+            # Memory reserved so far is released with the rest of the call in load()
+            spool.close()
+            raise
+
+        filename = ref.filename or Path(httpx.URL(url).path).name or "attachment"
+        return Attachment(filename, _content_type(ref, filename), size, spool=spool)
+
+    async def check(self, refs: list[AttachmentRef]) -> None:
+        """
+        Reject references ``load`` would refuse, without reading any content,
+        e.g. before a message is stored for later delivery.
+        """
+        for ref in refs:
+            if (ref.path is None) == (ref.url is None):
+                raise ValueError("Each attachment needs exactly one of path or url")
+            if ref.path is not None:
+                await asyncio.to_thread(self._resolve_path, ref)
+            else:
+                self._check_url(ref)
+
+    @asynccontextmanager
+    async def load(self, refs: Optional[list[AttachmentRef]]) -> AsyncIterator[list[Attachment]]:
+        """Resolve ``refs`` for one call, releasing memory and spools on exit."""
+        memory = _CallMemory(self.call_memory, self.budget)
+        attachments: list[Attachment] = []
+        try:
+            total = 0
+            for ref in refs or []:
+                if (ref.path is None) == (ref.url is None):
+                    raise ValueError("Each attachment needs exactly one of path or url")
+                if ref.path is not None:
+                    attachment = await asyncio.to_thread(self._resolve_path, ref)
+                else:
+                    attachment = await self._fetch(ref, memory, self.max_bytes - total)
+                attachments.append(attachment)
+                total += attachment.size
+                if total > self.max_bytes:
+                    raise ValueError(f"Attachments exceed {self.max_bytes} bytes")
+            yield attachments
+        finally:
+            for attachment in attachments:
+                if attachment.spool is not None:
+                    attachment.spool.close()
+            memory.release(memory.used)
+
+
+def _url_within(url: httpx.URL, prefix: httpx.URL) -> bool:
+    """
+    Whether ``url`` is on the scheme, host and port of ``prefix`` and below
+    its path, matched on whole path segments.
+    """
+    if url.userinfo or (url.scheme, url.host, url.port) != (prefix.scheme, prefix.host, prefix.port):
+        return False
+    # Percent-encoded dot segments survive URL normalisation
+    if ".." in url.path.split("/"):
+        return False
+    base = prefix.path if prefix.path.endswith("/") else prefix.path + "/"
+    return url.path == prefix.path or url.path.startswith(base)
+
+
+def _content_type(ref: AttachmentRef, filename: str) -> str:
+    return ref.content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+# type/subtype tokens (RFC 2045), without parameters
+_CONTENT_TYPE = re.compile(r"^[A-Za-z0-9!#$&^_.+-]+/[A-Za-z0-9!#$&^_.+-]+$")
+
+
+def _header(name: str, value: str) -> bytes:
+    """Fold one header, RFC 2047-encoding non-ASCII text; CR/LF raise ValueError."""
+    return policy.SMTP.fold_binary(*policy.SMTP.header_store_parse(name, value))
+
+
+def _attachment_headers(attachment: Attachment) -> bytes:
+    """MIME part headers of an attachment, with RFC 2231 ``filename*=`` when needed."""
+    if not _CONTENT_TYPE.match(attachment.content_type):
+        raise ValueError(f"Invalid attachment content type: {attachment.content_type!r}")
+    part = MIMEPart(policy=policy.SMTP)
+    part["Content-Type"] = attachment.content_type
+    part.set_param("name", attachment.filename)
+    part["Content-Transfer-Encoding"] = "base64"
+    part["Content-Disposition"] = "attachment"
+    part.set_param("filename", attachment.filename, header="Content-Disposition")
+    return b"".join(policy.SMTP.fold_binary(name, value) for name, value in part.items())
+
+
+_LEADING_DOT = re.compile(rb"^\.", re.MULTILINE)
+
+
+class StreamingMessage:
+    """A text email with attachments, encoded lazily while it is sent."""
+
+    def __init__(
+        self,
+        from_addr: str,
+        to_addrs: list[str],
+        subject: str,
+        body: str,
+        attachments: list[Attachment],
+    ):
+        self.from_addr = from_addr
+        self.to_addrs = to_addrs
+        self.subject = subject
+        self.body = body
+        self.attachments = attachments
+        # Encoded up front so bad header values fail before anything is sent
+        self._headers = b"".join([
+            _header("From", from_addr),
+            _header("To", ", ".join(to_addrs)),
+            _header("Subject", subject),
+        ])
+        self._part_headers = [_attachment_headers(attachment) for attachment in attachments]
+
+    def __getitem__(self, name: str) -> str:
+        # Header-style access, like EmailMessage, for logging and transports
+        return {"From": self.from_addr, "To": ", ".join(self.to_addrs), "Subject": self.subject}[name]
+
+    def iter_mime(self) -> Iterator[bytes]:
+        """
+        Yield the RFC 5322 message in chunks of whole CRLF-terminated lines.
+
+        Only one chunk of attachment data is held at a time.
+        """
+        boundary = f"=_mcp_{uuid.uuid4().hex}"
+        yield b"".join([
+            self._headers,
+            b"MIME-Version: 1.0\r\n",
+            f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n\r\n'.encode(),
+        ])
+
+        body = self.body.replace("\r\n", "\n").encode("utf-8")
+        text = quopri.encodestring(body).replace(b"\n", b"\r\n")
+        yield (
+            f"--{boundary}\r\n"
+            'Content-Type: text/plain; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+        ).encode() + text + (b"" if text.endswith(b"\r\n") else b"\r\n")
+
+        for attachment, headers in zip(self.attachments, self._part_headers):
+            yield f"--{boundary}\r\n".encode() + headers + b"\r\n"
+            for chunk in attachment.chunks():
+                yield base64.encodebytes(chunk).replace(b"\n", b"\r\n")
+
+        yield f"--{boundary}--\r\n".encode()
+
+    def send_smtp(self, server: smtplib.SMTP) -> None:
+        """Send over an open SMTP connection, streaming the DATA phase; blocks."""
+        server.ehlo_or_helo_if_needed()
+        code, response = server.mail(self.from_addr)
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(code, response, self.from_addr)
+
+        refused = {}
+        for recipient in self.to_addrs:
+            code, response = server.rcpt(recipient)
+            if code not in (250, 251):
+                refused[recipient] = (code, response)
+        if len(refused) == len(self.to_addrs):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, response = server.docmd("DATA")
+        if code != 354:
+            server.rset()
+            raise smtplib.SMTPDataError(code, response)
+        for chunk in self.iter_mime():
+            # Lines starting with "." would end DATA early, so they are doubled
+            server.send(_LEADING_DOT.sub(b"..", chunk))
+        server.send(b".\r\n")
+        code, response = server.getreply()
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
+
+    async def aiter_postmark_json(self) -> AsyncIterator[bytes]:
+        """Yield a Postmark ``/email`` JSON body, reading attachments in a worker thread."""
+        yield (
+            b'{"From":' + json.dumps(self.from_addr).encode()
+            + b',"To":' + json.dumps(", ".join(self.to_addrs)).encode()
+            + b',"Subject":' + json.dumps(self.subject).encode()
+            + b',"TextBody":' + json.dumps(self.body).encode()
+            + b',"Attachments":['
+        )
+        for index, attachment in enumerate(self.attachments):
+            yield (
+                (b"," if index else b"")
+                + b'{"Name":' + json.dumps(attachment.filename).encode()
+                + b',"ContentType":' + json.dumps(attachment.content_type).encode()
+                + b',"Content":"'
+            )
+            chunks = attachment.chunks()
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                yield base64.b64encode(chunk)
+            yield b'"}'
+        yield b"]}"
@@ -0,0 +1,153 @@
+"""
+Circuit breaker for calls to external services.
+
+The breaker watches a sliding window of recent calls. When the share of calls
+that failed or were slower than ``slow_call_seconds`` reaches
+``failure_rate``, it opens and rejects calls immediately with
+``CircuitOpenError`` instead of letting each caller wait for a timeout. After
+``open_seconds`` it lets a single trial call through (half-open): success
+closes the breaker, failure opens it again.
+"""
+
+import logging
+import time
+from collections import deque
+from contextlib import nullcontext
+from enum import Enum
+from typing import Any, AsyncContextManager, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BreakerState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker {name} is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Error-rate and latency based circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        is_failure: Callable[[BaseException], bool] = lambda error: True,
+    ):
+        """
+        Args:
+            name: Name used in logs and metrics
+            failure_rate: Share of failed or slow calls in the window that opens the breaker
+            slow_call_seconds: Calls taking at least this long count against the breaker
+            window_size: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker can open
+            open_seconds: Time to stay open before allowing a trial call
+            is_failure: Decides which exceptions count as service failures;
+                others (e.g. a rejected recipient) count as successful calls
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.is_failure = is_failure
+        self.state = BreakerState.CLOSED
+        self.calls: dict[str, int] = {"success": 0, "failure": 0, "slow": 0, "rejected": 0}
+        self._window: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def _transition(self, state: BreakerState) -> None:
+        if state is self.state:
+            return
+        logger.warning(f"Circuit breaker {self.name}: {self.state.value} -> {state.value}")
+        self.state = state
+        if state is BreakerState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state is BreakerState.CLOSED:
+            self._window.clear()
+
+    def allow(self) -> bool:
+        """Return whether a call may go ahead, claiming the trial slot when half-open."""
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(BreakerState.HALF_OPEN)
+        if self.state is BreakerState.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record(self, ok: bool, duration: float) -> None:
+        """Record the outcome of a call that ``allow`` let through."""
+        slow = duration >= self.slow_call_seconds
+        bad = not ok or slow
+        self.calls["success" if ok else "failure"] += 1
+        if slow:
+            self.calls["slow"] += 1
+
+        if self.state is BreakerState.HALF_OPEN:
+            self._trial_in_flight = False
+            self._transition(BreakerState.OPEN if bad else BreakerState.CLOSED)
+            return
+
+        self._window.append(bad)
+        if (
+            len(self._window) >= self.min_calls
+            and sum(self._window) / len(self._window) >= self.failure_rate
+        ):
+            self._transition(BreakerState.OPEN)
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        queue: Optional[AsyncContextManager[Any]] = None,
+    ) -> T:
+        """
+        Call ``func(*args)`` through the breaker.
+
+        Args:
+            func: Coroutine function to call
+            args: Its arguments
+            queue: Entered before the call is timed, e.g. a connection pool
+                slot, so waiting for capacity never counts as a slow call
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+        """
+        if not self.allow():
+            self.calls["rejected"] += 1
+            raise CircuitOpenError(self.name)
+
+        start = time.monotonic()
+        try:
+            async with queue if queue is not None else nullcontext():
+                start = time.monotonic()
+                result = await func(*args)
+        except Exception as e:
+            self.record(not self.is_failure(e), time.monotonic() - start)
+            raise
+        except BaseException:
+            # A cancelled trial call must not hold the half-open slot forever
+            self._trial_in_flight = False
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
@@ -6,7 +6,12 @@ import logging
 import re
 import smtplib
 from email.message import EmailMessage
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+from ..tracing import tracer
+from .attachments import Attachment, StreamingMessage
+from .mail_transports import MailTransport, OutgoingMessage
+from .suppression import SuppressionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -43,57 +48,123 @@ def _validate_email_addresses(email_list: List[str]) -> Tuple[List[str], List[st
     return valid_emails, invalid_emails
 
 
-async def send_email(
-    recipients: List[str], subject: str, body: str, api_key: str, from_email: str
-) -> str:
+def validate_recipients(
+    recipients: List[str], suppression: Optional[SuppressionIndex] = None
+) -> List[str]:
     """
-    Send a simple email to the specified recipients.
+    Drop invalid and suppressed addresses from ``recipients``.
 
     Args:
         recipients: List of email addresses to send to
-        subject: Email subject line
-        body: Email body content
-        api_key: Postmark API key for authentication
-        from_email: Sender email address
+        suppression: Addresses that must not be sent to (hard bounces, complaints)
 
     Returns:
-        Success message with recipient count
+        The recipients that may be sent to
 
     Raises:
-        ValueError: If no valid recipients provided
-        Exception: If email sending fails
+        ValueError: If no valid or unsuppressed recipients remain
     """
     if not recipients:
         raise ValueError("No valid email addresses provided")
 
-    logger.info(f"Sending email to {len(recipients)} recipients")
-
-    # Validate email addresses
-    valid_emails, invalid_emails = _validate_email_addresses(recipients)
+    with tracer.span("email.validate", {"email.recipients": len(recipients)}):
+        valid_emails, invalid_emails = _validate_email_addresses(recipients)
+        suppressed_emails: List[str] = []
+        if suppression is not None and valid_emails:
+            valid_emails, suppressed_emails = suppression.filter(valid_emails)
 
     if invalid_emails:
         logger.warning(f"Skipping {len(invalid_emails)} invalid email addresses")
 
+    if suppressed_emails:
+        logger.warning(f"Skipping {len(suppressed_emails)} suppressed email addresses")
+
     if not valid_emails:
+        if suppressed_emails:
+            raise ValueError("All recipients are on the suppression list")
         raise ValueError("No valid email addresses provided")
-
-    # Create email message
+    return valid_emails
+
+
+def _build_message(
+    from_email: str,
+    recipients: List[str],
+    subject: str,
+    body: str,
+    attachments: Optional[List[Attachment]] = None,
+) -> OutgoingMessage:
+    """Build the message for validated recipients, streaming if it has attachments."""
+    if attachments:
+        return StreamingMessage(from_email, recipients, subject, body, attachments)
     msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = from_email
-    msg["To"] = ", ".join(valid_emails)
+    msg["To"] = ", ".join(recipients)
     msg.set_content(body)
+    return msg
+
+
+async def send_email(
+    recipients: List[str],
+    subject: str,
+    body: str,
+    api_key: str,
+    from_email: str,
+    transport: Optional[MailTransport] = None,
+    suppression: Optional[SuppressionIndex] = None,
+    attachments: Optional[List[Attachment]] = None,
+) -> str:
+    """
+    Send a simple email to the specified recipients.
+
+    Args:
+        recipients: List of email addresses to send to
+        subject: Email subject line
+        body: Email body content
+        api_key: Postmark API key for authentication
+        from_email: Sender email address
+        transport: Shared mail transport (pooled SMTP behind circuit breakers);
+            a one-off SMTP connection is used if omitted
+        suppression: Addresses that must not be sent to (hard bounces, complaints)
+        attachments: Loaded attachments, streamed into the message as it is sent
+
+    Returns:
+        Success message with recipient count
+
+    Raises:
+        ValueError: If no valid or unsuppressed recipients provided
+        Exception: If email sending fails
+    """
+    logger.info(f"Sending email to {len(recipients)} recipients")
+
+    valid_emails = validate_recipients(recipients, suppression)
+
+    # Create email message
+    with tracer.span("email.build_message"):
+        msg = _build_message(from_email, valid_emails, subject, body, attachments)
 
     # Send email via SMTP
     try:
-        logger.info("Connecting to Postmark SMTP server")
-        with smtplib.SMTP("smtp.postmarkapp.com", 587) as server:
-            server.starttls()
-            # NOTE: Postmark requires the API key as both username and password
-            # This is Postmark's recommended authentication pattern
-            # SECURITY: API key should be stored in Azure Key Vault or secure env vars, never committed
-            server.login(api_key, api_key)
-            server.send_message(msg)
+        with tracer.span("email.send", {"email.pooled": transport is not None}):
+            if transport is not None:
+                await transport.send_message(msg)
+            else:
+                logger.info("Connecting to Postmark SMTP server")
+                with tracer.span("smtp.connect"):
+                    connection = smtplib.SMTP("smtp.postmarkapp.com", 587)
+                with connection as server:
+                    with tracer.span("smtp.starttls"):
+                        server.starttls()
+                    # NOTE: Postmark requires the API key as both username and password
+                    # This is Postmark's recommended authentication pattern
+                    # SECURITY: API key should be stored in Azure Key Vault or secure env vars, never committed
+                    with tracer.span("smtp.auth"):
+                        server.login(api_key, api_key)
+                    with tracer.span("smtp.data"):
+                        if isinstance(msg, StreamingMessage):
+                            msg.send_smtp(server)
+                        else:
+                            server.send_message(msg)
 
         success_msg = f"Email sent successfully to {len(valid_emails)} recipients"
         logger.info(success_msg)
@@ -0,0 +1,175 @@
+"""
+Mail transports and failover for the MCP server.
+
+``FailoverTransport`` puts a circuit breaker in front of each configured
+transport (the pooled Postmark SMTP relay, then optionally the Postmark HTTP
+API or a second SMTP relay) and sends through the first one whose breaker
+allows it. Only errors that say the transport itself is unhealthy - network
+errors, timeouts, temporary 4xx SMTP replies, 5xx/429 HTTP replies - count
+against a breaker and trigger failover; a rejected recipient is raised as is.
+"""
+
+import logging
+import smtplib
+from email.message import EmailMessage
+from typing import Optional, Protocol
+
+import httpx
+
+from .attachments import StreamingMessage
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .smtp_pool import SMTPConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+OutgoingMessage = EmailMessage | StreamingMessage
+
+
+class MailTransport(Protocol):
+    async def send_message(self, msg: OutgoingMessage) -> None: ...
+
+    async def probe(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class PostmarkAPIError(Exception):
+    """Error response from the Postmark HTTP API."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Postmark API returned {status_code}: {message}")
+        self.status_code = status_code
+
+
+def is_transport_failure(error: BaseException) -> bool:
+    """Return whether ``error`` means the transport, not the message, is at fault."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 4xx replies are temporary (e.g. 421 service not available)
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    if isinstance(error, PostmarkAPIError):
+        return error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, (OSError, httpx.TransportError))
+
+
+class PostmarkHTTPTransport:
+    """Sends messages through the Postmark HTTP API using the shared HTTP client."""
+
+    def __init__(
+        self,
+        server_token: str,
+        client: httpx.AsyncClient,
+        base_url: str = "https://api.postmarkapp.com",
+    ):
+        self.server_token = server_token
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+
+    @property
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Accept": "application/json",
+            "X-Postmark-Server-Token": self.server_token,
+        }
+
+    async def send_message(self, msg: OutgoingMessage) -> None:
+        if isinstance(msg, StreamingMessage):
+            # Attachments are base64-encoded into the body as it is uploaded
+            response = await self.client.post(
+                f"{self.base_url}/email",
+                headers={**self._headers, "Content-Type": "application/json"},
+                content=msg.aiter_postmark_json(),
+            )
+        else:
+            response = await self.client.post(
+                f"{self.base_url}/email",
+                headers=self._headers,
+                json={
+                    "From": msg["From"],
+                    "To": msg["To"],
+                    "Subject": msg["Subject"],
+                    "TextBody": msg.get_content(),
+                },
+            )
+        if response.status_code != 200:
+            raise PostmarkAPIError(response.status_code, response.text)
+
+    async def probe(self) -> None:
+        response = await self.client.get(f"{self.base_url}/server", headers=self._headers)
+        if response.status_code != 200:
+            raise PostmarkAPIError(response.status_code, response.text)
+
+    async def close(self) -> None:
+        # The HTTP client is shared and closed with the other dependencies
+        pass
+
+
+class FailoverTransport:
+    """Sends through the first healthy transport, each guarded by a circuit breaker."""
+
+    def __init__(self, routes: list[tuple[MailTransport, CircuitBreaker]]):
+        self.routes = routes
+
+    @property
+    def breakers(self) -> list[CircuitBreaker]:
+        return [breaker for _, breaker in self.routes]
+
+    async def send_message(self, msg: OutgoingMessage) -> None:
+        """
+        Send a message, failing over when a transport is down or its breaker open.
+
+        Raises:
+            CircuitOpenError: If every breaker is open
+            Exception: The last transport error if every transport failed,
+                or any error that is not a transport failure
+        """
+        last_error: Optional[Exception] = None
+        for index, (transport, breaker) in enumerate(self.routes):
+            try:
+                if isinstance(transport, SMTPConnectionPool):
+                    # Queueing for a pooled connection is load, not a slow relay
+                    await breaker.call(transport.send_in_slot, msg, queue=transport.slot)
+                else:
+                    await breaker.call(transport.send_message, msg)
+            except CircuitOpenError as e:
+                last_error = last_error or e
+                continue
+            except Exception as e:
+                if not breaker.is_failure(e):
+                    raise
+                logger.warning(f"Mail transport {breaker.name} failed: {str(e)}")
+                last_error = e
+                continue
+            if index > 0:
+                logger.info(f"Message sent via fallback transport {breaker.name}")
+            return
+        assert last_error is not None
+        raise last_error
+
+    async def probe(self) -> None:
+        """Succeed if any transport answers."""
+        last_error: Optional[Exception] = None
+        for transport, _ in self.routes:
+            try:
+                return await transport.probe()
+            except Exception as e:
+                last_error = e
+        assert last_error is not None
+        raise last_error
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """Warm up the primary transport."""
+        warm_up = getattr(self.routes[0][0], "warm_up", None)
+        if warm_up is not None:
+            await warm_up(connections)
+
+    async def close(self) -> None:
+        for transport, breaker in self.routes:
+            try:
+                await transport.close()
+            except Exception as e:
+                logger.error(f"Failed to close mail transport {breaker.name}: {str(e)}")
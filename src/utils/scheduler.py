@@ -0,0 +1,233 @@
+"""
+Outbound send shaping and deferred delivery for the MCP server.
+
+``OutboundScheduler`` sits in front of ``send_email``:
+
+- every send, immediate or deferred, takes a token from a ``TokenBucket`` so
+  bursts from agents are smoothed to ``rate`` messages per second (with up to
+  ``burst`` sent back to back) instead of being throttled by Postmark;
+- deferred messages (``send_at``) are kept in a heap ordered by due time and
+  a single dispatcher task sleeps until the earliest one is due - there is no
+  sleeping task per message;
+- pending messages are stored in SQLite and reloaded on startup, so a restart
+  does not lose them. Failed deferred sends are retried with backoff.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from ..lifespan import Lifespan
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second on average, ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"Send rate must be positive and burst at least 1, got {rate} and {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class _OutboxStore:
+    """SQLite table of pending messages; calls block, so run them in a thread."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first write so servers that never schedule create no file
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id TEXT PRIMARY KEY, due REAL NOT NULL, attempts INTEGER NOT NULL, payload TEXT NOT NULL)"
+            )
+        return self._conn
+
+    def load(self) -> list[tuple[str, float, int, dict[str, Any]]]:
+        if not self.path.exists():
+            return []
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, due, attempts, payload FROM outbox"
+            ).fetchall()
+        return [(id_, due, attempts, json.loads(payload)) for id_, due, attempts, payload in rows]
+
+    def put(self, id_: str, due: float, attempts: int, item: dict[str, Any]) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO outbox VALUES (?, ?, ?, ?)",
+                (id_, due, attempts, json.dumps(item)),
+            )
+
+    def delete(self, id_: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM outbox WHERE id = ?", (id_,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class OutboundScheduler:
+    """Rate-shaped, persistent outbox for immediate and deferred sends."""
+
+    def __init__(
+        self,
+        path: Path,
+        send: Sender,
+        lifespan: Lifespan,
+        rate: float = 10.0,
+        burst: int = 20,
+        concurrency: int = 4,
+        max_attempts: int = 5,
+        retry_delay: float = 30.0,
+        annotate: Optional[Callable[[], dict[str, Any]]] = None,
+    ):
+        """
+        Args:
+            path: SQLite file holding pending messages
+            send: Coroutine function delivering one stored item
+            lifespan: App lifespan; the dispatcher stops when it is stopping
+            rate: Average messages per second
+            burst: Messages that may be sent back to back
+            concurrency: Deferred messages being delivered at once
+            max_attempts: Delivery attempts before a deferred message is dropped
+            retry_delay: Seconds before the first retry, doubled for each attempt
+            annotate: Returns extra fields stored with each scheduled item,
+                e.g. who scheduled it
+        """
+        self.path = Path(path)
+        self.send = send
+        self.lifespan = lifespan
+        self.bucket = TokenBucket(rate, burst)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.annotate = annotate
+        self._store = _OutboxStore(self.path)
+        self._heap: list[tuple[float, int, str]] = []
+        self._items: dict[str, tuple[dict[str, Any], int]] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def __len__(self) -> int:
+        """Number of pending deferred messages."""
+        return len(self._items)
+
+    def _push(self, id_: str, due: float, attempts: int, item: dict[str, Any]) -> None:
+        self._items[id_] = (item, attempts)
+        heapq.heappush(self._heap, (due, next(self._seq), id_))
+
+    async def start(self) -> None:
+        """Reload pending messages and start the dispatcher."""
+        for id_, due, attempts, item in await asyncio.to_thread(self._store.load):
+            if id_ not in self._items:
+                self._push(id_, due, attempts, item)
+        if self._items:
+            logger.info(f"Reloaded {len(self._items)} pending messages from {self.path}")
+        self.lifespan.spawn(self._dispatch_forever(self.lifespan.stopping), name="outbox")
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._store.close)
+
+    async def throttle(self) -> None:
+        """Wait for the send budget; call before every immediate send."""
+        await self.bucket.acquire()
+
+    async def schedule(self, item: dict[str, Any], send_at: float) -> str:
+        """
+        Store a message for delivery at ``send_at`` (Unix time).
+
+        Returns:
+            Id of the scheduled message
+        """
+        id_ = uuid.uuid4().hex
+        if self.annotate is not None:
+            item = {**item, **self.annotate()}
+        await asyncio.to_thread(self._store.put, id_, send_at, 0, item)
+        self._push(id_, send_at, 0, item)
+        if self._heap[0][2] == id_:
+            # New earliest message: the dispatcher must sleep for less
+            self._wakeup.set()
+        return id_
+
+    async def _dispatch_forever(self, stopping: asyncio.Event) -> None:
+        stop = asyncio.ensure_future(stopping.wait())
+        try:
+            while not stopping.is_set():
+                self._wakeup.clear()
+                timeout = max(self._heap[0][0] - time.time(), 0) if self._heap else None
+                wake = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait({wake, stop}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                wake.cancel()
+
+                while self._heap and self._heap[0][0] <= time.time() and not stopping.is_set():
+                    _, _, id_ = heapq.heappop(self._heap)
+                    await self._slots.acquire()
+                    await self.bucket.acquire()
+                    self.lifespan.spawn(self._deliver(id_), name=f"outbox-{id_}")
+        finally:
+            stop.cancel()
+
+    async def _deliver(self, id_: str) -> None:
+        item, attempts = self._items[id_]
+        try:
+            await self.send(item)
+        except Exception as e:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                logger.error(f"Dropping scheduled message {id_} after {attempts} attempts: {str(e)}")
+                del self._items[id_]
+                await asyncio.to_thread(self._store.delete, id_)
+                return
+            due = time.time() + self.retry_delay * 2 ** (attempts - 1)
+            logger.warning(f"Scheduled message {id_} failed (attempt {attempts}), retrying: {str(e)}")
+            await asyncio.to_thread(self._store.put, id_, due, attempts, item)
+            self._push(id_, due, attempts, item)
+            self._wakeup.set()
+            return
+        else:
+            del self._items[id_]
+            await asyncio.to_thread(self._store.delete, id_)
+            logger.info(f"Delivered scheduled message {id_}")
+        finally:
+            self._slots.release()
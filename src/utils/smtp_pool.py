@@ -0,0 +1,142 @@
+"""
+Pooled SMTP connections for the MCP server.
+
+Opening an SMTP connection costs a TCP connect, STARTTLS and AUTH round-trip.
+The pool keeps authenticated connections open between sends and runs the
+blocking smtplib calls in worker threads so they never stall the event loop.
+"""
+
+import asyncio
+import logging
+import smtplib
+import time
+from collections import deque
+from email.message import EmailMessage
+
+from ..tracing import tracer
+from .attachments import StreamingMessage
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnectionPool:
+    """Bounded pool of authenticated SMTP connections."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        max_size: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: deque[tuple[smtplib.SMTP, float]] = deque()
+        self._slots = asyncio.Semaphore(max_size)
+
+    def _connect(self) -> smtplib.SMTP:
+        logger.info(f"Opening pooled SMTP connection to {self.host}:{self.port}")
+        with tracer.span("smtp.connect", {"smtp.host": self.host}):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            with tracer.span("smtp.starttls"):
+                server.starttls()
+            with tracer.span("smtp.auth"):
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    async def _acquire(self) -> tuple[smtplib.SMTP, bool]:
+        """Return an open connection and whether it was reused from the pool."""
+        now = time.monotonic()
+        while self._idle:
+            server, last_used = self._idle.pop()
+            if now - last_used < self.idle_timeout:
+                return server, True
+            await asyncio.to_thread(self._quit, server)
+        return await asyncio.to_thread(self._connect), False
+
+    def _send(self, server: smtplib.SMTP, msg: EmailMessage | StreamingMessage) -> None:
+        with tracer.span("smtp.data"):
+            if isinstance(msg, StreamingMessage):
+                msg.send_smtp(server)
+            else:
+                server.send_message(msg)
+
+    @property
+    def slot(self) -> asyncio.Semaphore:
+        """One of ``max_size`` sending slots; hold it around ``send_in_slot``."""
+        return self._slots
+
+    async def send_message(self, msg: EmailMessage | StreamingMessage) -> None:
+        """
+        Send a message over a pooled connection, waiting for a free slot.
+
+        A reused connection that the server has since dropped is replaced and
+        the send retried once.
+        """
+        async with self._slots:
+            await self.send_in_slot(msg)
+
+    async def send_in_slot(self, msg: EmailMessage | StreamingMessage) -> None:
+        """Like ``send_message``, for a caller already holding ``slot``."""
+        server, reused = await self._acquire()
+        try:
+            await asyncio.to_thread(self._send, server, msg)
+        except smtplib.SMTPServerDisconnected:
+            server.close()
+            if not reused:
+                raise
+            logger.info("Pooled SMTP connection was closed by server, reconnecting")
+            server = await asyncio.to_thread(self._connect)
+            try:
+                await asyncio.to_thread(self._send, server, msg)
+            except Exception:
+                server.close()
+                raise
+        except Exception:
+            server.close()
+            raise
+        self._idle.append((server, time.monotonic()))
+
+    async def probe(self) -> None:
+        """Check the relay answers, reusing (and keeping) a pooled connection."""
+        async with self._slots:
+            server, _ = await self._acquire()
+            try:
+                code, message = await asyncio.to_thread(server.noop)
+                if code != 250:
+                    raise smtplib.SMTPResponseException(code, message)
+            except Exception:
+                server.close()
+                raise
+            self._idle.append((server, time.monotonic()))
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """Open connections ahead of the first send."""
+        for _ in range(min(connections, self.max_size) - len(self._idle)):
+            server = await asyncio.to_thread(self._connect)
+            self._idle.append((server, time.monotonic()))
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        while self._idle:
+            server, _ = self._idle.pop()
+            await asyncio.to_thread(self._quit, server)
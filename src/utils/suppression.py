@@ -0,0 +1,140 @@
+"""
+Suppression list for addresses that must not receive email.
+
+Addresses Postmark reports as hard-bounced, invalid or as having filed a spam
+complaint are kept as 64-bit BLAKE2b hashes in a set, so checking a recipient
+is one hash and one set lookup, and the index stays small (8 bytes per
+address) without storing the addresses themselves.
+
+The index is persisted as a raw ``array('Q')`` snapshot that loads with a
+single ``frombytes`` call. Changes are flushed in the background a few
+seconds after they happen, and on shutdown.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ..lifespan import Lifespan
+
+logger = logging.getLogger(__name__)
+
+# Bounce types that mean the address will never accept mail
+SUPPRESSED_BOUNCE_TYPES = frozenset({"HardBounce", "BadEmailAddress", "ManuallyDeactivated"})
+
+
+def address_hash(email: str) -> int:
+    """Hash a normalized email address to 64 bits."""
+    digest = hashlib.blake2b(email.strip().lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SuppressionIndex:
+    """Hash set of suppressed addresses with a debounced on-disk snapshot."""
+
+    def __init__(
+        self, path: Path, lifespan: Optional[Lifespan] = None, flush_interval: float = 5.0
+    ):
+        self.path = Path(path)
+        self.lifespan = lifespan
+        self.flush_interval = flush_interval
+        self._hashes: set[int] = set()
+        self._dirty = False
+        self._flush_pending = False
+
+    def __contains__(self, email: object) -> bool:
+        return isinstance(email, str) and address_hash(email) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def load(self) -> None:
+        """Replace the index with the snapshot on disk, if there is one."""
+        if not self.path.exists():
+            return
+        hashes = array("Q")
+        hashes.frombytes(self.path.read_bytes())
+        self._hashes = set(hashes)
+        logger.info(f"Loaded {len(self._hashes)} suppressed addresses from {self.path}")
+
+    def _write(self, snapshot: array) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("wb") as f:
+            snapshot.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    async def flush(self) -> None:
+        """Write the snapshot atomically if the index changed since the last write."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Copied on the loop thread so the write never sees the set change
+        await asyncio.to_thread(self._write, array("Q", self._hashes))
+
+    def filter(self, emails: Iterable[str]) -> tuple[list[str], list[str]]:
+        """
+        Split addresses into those that may be sent to and suppressed ones.
+
+        Returns:
+            Tuple of (allowed, suppressed)
+        """
+        allowed, suppressed = [], []
+        for email in emails:
+            (suppressed if address_hash(email) in self._hashes else allowed).append(email)
+        return allowed, suppressed
+
+    def add(self, email: str) -> None:
+        self._hashes.add(address_hash(email))
+        self._changed()
+
+    def remove(self, email: str) -> None:
+        self._hashes.discard(address_hash(email))
+        self._changed()
+
+    def _changed(self) -> None:
+        self._dirty = True
+        if self.lifespan is not None and not self._flush_pending:
+            self._flush_pending = True
+            self.lifespan.spawn(self._flush_later(), name="suppression-flush")
+
+    async def _flush_later(self) -> None:
+        try:
+            # Batch changes arriving together, but never hold up shutdown
+            await asyncio.wait_for(self.lifespan.stopping.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._flush_pending = False
+            await self.flush()
+
+    def apply_event(self, event: dict[str, Any]) -> bool:
+        """
+        Update the index from a Postmark webhook event.
+
+        Returns:
+            Whether the event changed the index
+        """
+        record_type = event.get("RecordType")
+        if record_type in ("Bounce", "SpamComplaint"):
+            if record_type == "Bounce" and event.get("Type") not in SUPPRESSED_BOUNCE_TYPES:
+                return False
+            field = "Email"
+        elif record_type == "SubscriptionChange":
+            field = "Recipient"
+        else:
+            return False
+
+        address = event.get(field)
+        if not isinstance(address, str) or not address.strip():
+            logger.warning(f"Skipping {record_type} event without a valid {field}")
+            return False
+        if record_type == "SubscriptionChange" and not event.get("SuppressSending"):
+            self.remove(address)
+        else:
+            self.add(address)
+        return True
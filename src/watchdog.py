@@ -0,0 +1,165 @@
+"""
+Event-loop stall detection and sampling profiles for the MCP server.
+
+A heartbeat task on the event loop records when it last ran; a monitor thread
+notices when the heartbeat is late, which means a callback is blocking the
+loop (e.g. a synchronous smtplib call inside an ``async`` action). The monitor
+logs the loop thread's stack at that moment and the tool whose wrapper is on
+it, then the heartbeat logs how long the stall lasted once the loop recovers.
+
+``sample_stacks`` takes a time-boxed sampling profile of every thread and
+returns it in the folded-stack format read by flamegraph.pl and speedscope.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass
+from types import FrameType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stall:
+    """An interval during which the event loop did not run the heartbeat."""
+
+    started_at: float
+    tool: Optional[str]
+    stack: str
+    duration: Optional[float] = None
+
+
+def active_tool(frame: Optional[FrameType]) -> Optional[str]:
+    """Return the name of the tool whose ``make_wrapper`` wrapper is on the stack."""
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == "wrapper" and "action_func" in code.co_freevars:
+            action = frame.f_locals.get("action_func")
+            if action is not None:
+                return action.__name__.replace("_action", "_tool")
+        frame = frame.f_back
+    return None
+
+
+class Watchdog:
+    """Detects callbacks that block the event loop for longer than a threshold."""
+
+    def __init__(
+        self,
+        stall_threshold: float = 0.2,
+        interval: float = 0.05,
+        max_stack_depth: int = 30,
+    ):
+        self.stall_threshold = stall_threshold
+        self.interval = interval
+        self.max_stack_depth = max_stack_depth
+        self.stalls: deque[Stall] = deque(maxlen=20)
+        self.stall_count = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._current: Optional[Stall] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self) -> None:
+        """Start the monitor thread; must be called on the event loop's thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._monitor, name="event-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Event-loop watchdog started (threshold {self.stall_threshold}s)")
+
+    async def stop(self) -> None:
+        """Stop the monitor thread."""
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join, 1.0)
+            self._thread = None
+
+    async def heartbeat(self) -> None:
+        """Mark the loop as responsive every ``interval`` seconds, forever."""
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - self._last_beat - self.interval
+            stall = self._current
+            if stall is not None:
+                self._current = None
+                stall.duration = lag
+                logger.warning(
+                    f"Event loop was blocked for {lag:.3f}s"
+                    f" (tool: {stall.tool or 'none'})"
+                )
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            beat = self._last_beat
+            if self._current is not None:
+                continue
+            if time.monotonic() - beat - self.interval < self.stall_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stall = Stall(
+                started_at=beat,
+                tool=active_tool(frame),
+                stack="".join(traceback.format_stack(frame, limit=self.max_stack_depth))
+                if frame is not None
+                else "",
+            )
+            # Only report a stall once, while the heartbeat has not caught up
+            if beat != self._last_beat:
+                continue
+            self._current = stall
+            self.stalls.append(stall)
+            self.stall_count += 1
+            logger.warning(
+                f"Event loop blocked for more than {self.stall_threshold}s"
+                f" (tool: {stall.tool or 'none'}), loop thread stack:\n{stall.stack}"
+            )
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{frame.f_code.co_qualname}".replace(";", ":")
+
+
+def sample_stacks(seconds: float, interval: float = 0.01) -> str:
+    """
+    Sample every thread's stack for ``seconds`` and fold identical stacks.
+
+    Blocks the calling thread, so run it via ``asyncio.to_thread``.
+
+    Args:
+        seconds: How long to sample for
+        interval: Seconds between samples
+
+    Returns:
+        One ``thread;outer;...;inner count`` line per distinct stack.
+    """
+    me = threading.get_ident()
+    counts: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
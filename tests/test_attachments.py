@@ -0,0 +1,265 @@
+"""
+Unit tests for utils/attachments.py.
+"""
+
+import json
+from email import message_from_bytes, policy
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from src.utils.attachments import (
+    Attachment,
+    AttachmentLoader,
+    AttachmentRef,
+    MemoryBudget,
+    StreamingMessage,
+)
+
+
+def make_loader(tmp_path, handler=None, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler or (lambda r: httpx.Response(404))))
+    kwargs.setdefault("budget", MemoryBudget(1024 * 1024))
+    return AttachmentLoader(client, root=tmp_path, **kwargs)
+
+
+def attachment_from(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return Attachment(name, "application/octet-stream", len(content), path=path)
+
+
+@pytest.mark.asyncio
+async def test_path_reference_is_read_from_attachment_dir(tmp_path):
+    """Test path references resolve inside the attachment directory."""
+    (tmp_path / "report.pdf").write_bytes(b"%PDF")
+    loader = make_loader(tmp_path)
+
+    async with loader.load([AttachmentRef(path="report.pdf")]) as files:
+        assert files[0].filename == "report.pdf"
+        assert files[0].content_type == "application/pdf"
+        assert b"".join(files[0].chunks()) == b"%PDF"
+
+
+@pytest.mark.asyncio
+async def test_path_outside_attachment_dir_is_rejected(tmp_path):
+    """Test path traversal out of the attachment directory is refused."""
+    root = tmp_path / "attachments"
+    root.mkdir()
+    (tmp_path / "secret.txt").write_text("secret")
+    loader = make_loader(root)
+
+    with pytest.raises(ValueError, match="not found"):
+        async with loader.load([AttachmentRef(path="../secret.txt")]):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_url_must_match_an_allowed_prefix(tmp_path):
+    """Test URLs outside the allowlist are never fetched."""
+    handler = MagicMock(return_value=httpx.Response(200, content=b"data"))
+    loader = make_loader(tmp_path, handler, url_prefixes=("https://files.example.com/",))
+
+    with pytest.raises(ValueError, match="not allowed"):
+        async with loader.load([AttachmentRef(url="https://evil.example.com/a.txt")]):
+            pass
+    handler.assert_not_called()
+
+    async with loader.load([AttachmentRef(url="https://files.example.com/a.txt")]) as files:
+        assert files[0].filename == "a.txt"
+        assert b"".join(files[0].chunks()) == b"data"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", [
+    "https://files.example.com.attacker.net/a.txt",
+    "https://files.example.com@attacker.net/a.txt",
+    "https://user@files.example.com/docs/a.txt",
+    "http://files.example.com/docs/a.txt",
+    "https://files.example.com:8443/docs/a.txt",
+    "https://files.example.com/docsuffix/a.txt",
+    "https://files.example.com/docs/%2e%2e/admin",
+])
+async def test_url_prefix_matches_host_and_path_segments(tmp_path, url):
+    """Test look-alike hosts, userinfo, other ports and sibling paths are refused."""
+    handler = MagicMock(return_value=httpx.Response(200, content=b"data"))
+    loader = make_loader(tmp_path, handler, url_prefixes=("https://files.example.com/docs",))
+
+    with pytest.raises(ValueError, match="not allowed"):
+        async with loader.load([AttachmentRef(url=url)]):
+            pass
+    handler.assert_not_called()
+
+    async with loader.load([AttachmentRef(url="https://files.example.com/docs/a.txt")]) as files:
+        assert files[0].filename == "a.txt"
+
+
+@pytest.mark.asyncio
+async def test_small_download_stays_in_memory_until_released(tmp_path):
+    """Test small downloads count against the memory budget while loaded."""
+    budget = MemoryBudget(1024)
+    loader = make_loader(
+        tmp_path,
+        lambda r: httpx.Response(200, content=b"x" * 100),
+        budget=budget,
+        url_prefixes=("https://files.example.com/",),
+    )
+
+    async with loader.load([AttachmentRef(url="https://files.example.com/a.bin")]) as files:
+        assert budget.used == 100
+        assert not files[0].spool._rolled
+    assert budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_large_download_spools_to_disk(tmp_path):
+    """Test downloads over the threshold move to disk and hold no budget."""
+    budget = MemoryBudget(1024 * 1024)
+    loader = make_loader(
+        tmp_path,
+        lambda r: httpx.Response(200, content=b"x" * 5000),
+        budget=budget,
+        url_prefixes=("https://files.example.com/",),
+        spool_threshold=1000,
+    )
+
+    async with loader.load([AttachmentRef(url="https://files.example.com/a.bin")]) as files:
+        assert files[0].spool._rolled
+        assert files[0].size == 5000
+        assert budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_spools_to_disk(tmp_path):
+    """Test a full process-wide budget sends even small downloads to disk."""
+    budget = MemoryBudget(10)
+    loader = make_loader(
+        tmp_path,
+        lambda r: httpx.Response(200, content=b"x" * 100),
+        budget=budget,
+        url_prefixes=("https://files.example.com/",),
+    )
+
+    async with loader.load([AttachmentRef(url="https://files.example.com/a.bin")]) as files:
+        assert files[0].spool._rolled
+    assert budget.used == 0
+
+
+@pytest.mark.asyncio
+async def test_total_size_is_capped(tmp_path):
+    """Test attachments over max_bytes are rejected and memory is released."""
+    budget = MemoryBudget(1024 * 1024)
+    loader = make_loader(
+        tmp_path,
+        lambda r: httpx.Response(200, content=b"x" * 600),
+        budget=budget,
+        url_prefixes=("https://files.example.com/",),
+        max_bytes=1000,
+    )
+    refs = [AttachmentRef(url="https://files.example.com/a.bin")] * 2
+
+    with pytest.raises(ValueError, match="exceed"):
+        async with loader.load(refs):
+            pass
+    assert budget.used == 0
+
+
+def test_mime_message_parses_back(tmp_path):
+    """Test the streamed MIME message is a valid multipart message."""
+    content = bytes(range(256)) * 1000
+    msg = StreamingMessage(
+        "sender@example.com",
+        ["a@example.com", "b@example.com"],
+        "Report",
+        "Hello\nSee attached.",
+        [attachment_from(tmp_path, "data.bin", content)],
+    )
+
+    parsed = message_from_bytes(b"".join(msg.iter_mime()), policy=policy.default)
+
+    assert parsed["To"] == "a@example.com, b@example.com"
+    assert parsed["Subject"] == "Report"
+    text, attachment = parsed.iter_parts()
+    assert text.get_content().replace("\r\n", "\n") == "Hello\nSee attached."
+    assert attachment.get_filename() == "data.bin"
+    assert attachment.get_content() == content
+
+
+def test_mime_message_encodes_non_ascii_subject_and_filename(tmp_path):
+    """Test non-ASCII headers use RFC 2047 and RFC 2231 encoding and parse back."""
+    msg = StreamingMessage(
+        "sender@example.com",
+        ["a@example.com"],
+        "Grüße aus Köln",
+        "Hallo",
+        [attachment_from(tmp_path, "Bericht für März.pdf", b"%PDF")],
+    )
+
+    raw = b"".join(msg.iter_mime())
+    parsed = message_from_bytes(raw, policy=policy.default)
+
+    assert raw.isascii()
+    assert parsed["Subject"] == "Grüße aus Köln"
+    _, attachment = parsed.iter_parts()
+    assert attachment.get_filename() == "Bericht für März.pdf"
+
+
+@pytest.mark.parametrize("field", ["subject", "filename", "content_type"])
+def test_mime_message_rejects_header_injection(tmp_path, field):
+    """Test CR/LF in any header value is refused instead of adding headers."""
+    attachment = attachment_from(tmp_path, "data.bin", b"data")
+    subject = "Report"
+    if field == "subject":
+        subject = "Report\r\nBcc: victim@example.com"
+    elif field == "filename":
+        attachment.filename = "data.bin\r\nBcc: victim@example.com"
+    else:
+        attachment.content_type = "text/plain\r\nBcc: victim@example.com"
+
+    with pytest.raises(ValueError):
+        StreamingMessage("sender@example.com", ["a@example.com"], subject, "Hi", [attachment])
+
+
+def test_mime_message_rejects_malformed_content_type(tmp_path):
+    """Test attachment content types must be a bare type/subtype."""
+    attachment = attachment_from(tmp_path, "data.bin", b"data")
+    attachment.content_type = "text/plain; charset=utf-8"
+
+    with pytest.raises(ValueError, match="content type"):
+        StreamingMessage("sender@example.com", ["a@example.com"], "Hi", "Hi", [attachment])
+
+
+def test_send_smtp_streams_data_with_dot_stuffing(tmp_path):
+    """Test lines starting with a dot are doubled in the DATA phase."""
+    server = MagicMock()
+    server.mail.return_value = (250, b"OK")
+    server.rcpt.return_value = (250, b"OK")
+    server.docmd.return_value = (354, b"Go ahead")
+    server.getreply.return_value = (250, b"Queued")
+    msg = StreamingMessage("sender@example.com", ["a@example.com"], "Hi", ".hidden\nline", [])
+
+    msg.send_smtp(server)
+
+    server.docmd.assert_called_once_with("DATA")
+    sent = b"".join(call.args[0] for call in server.send.call_args_list)
+    assert b"\r\n..hidden\r\n" in sent
+    assert sent.endswith(b"\r\n.\r\n")
+
+
+@pytest.mark.asyncio
+async def test_postmark_json_body_is_valid(tmp_path):
+    """Test the streamed Postmark body decodes to the expected payload."""
+    msg = StreamingMessage(
+        "sender@example.com",
+        ["a@example.com"],
+        "Hi",
+        "Body",
+        [attachment_from(tmp_path, "a.txt", b"first"), attachment_from(tmp_path, "b.txt", b"second")],
+    )
+
+    payload = json.loads(b"".join([chunk async for chunk in msg.aiter_postmark_json()]))
+
+    assert payload["TextBody"] == "Body"
+    assert [a["Name"] for a in payload["Attachments"]] == ["a.txt", "b.txt"]
+    assert payload["Attachments"][1]["Content"] == "c2Vjb25k"
@@ -0,0 +1,103 @@
+"""
+Tests for the micro-benchmark harness.
+"""
+
+import pytest
+
+from benchmarks import suite  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import (
+    BENCHMARKS,
+    Benchmark,
+    Result,
+    compare,
+    environment,
+    load_baseline,
+    run,
+    save_baseline,
+)
+from src.mcp_tools import DEPENDENCIES
+
+
+@pytest.fixture
+def restore_dependencies():
+    """Put back the providers the suite's factories register globally."""
+    saved = (
+        dict(DEPENDENCIES._providers),
+        dict(DEPENDENCIES._singletons),
+        set(DEPENDENCIES._values),
+        {tenant: dict(instances) for tenant, instances in DEPENDENCIES._tenants.items()},
+    )
+    yield
+    (
+        DEPENDENCIES._providers,
+        DEPENDENCIES._singletons,
+        DEPENDENCIES._values,
+        DEPENDENCIES._tenants,
+    ) = saved
+    DEPENDENCIES._changed()
+
+
+def test_compare_flags_changes_beyond_threshold():
+    """Test results are classified against the baseline."""
+    baseline = {"environment": environment(), "benchmarks": {
+        "slower": {"ns_per_op": 100.0},
+        "same": {"ns_per_op": 100.0},
+        "faster": {"ns_per_op": 100.0},
+    }}
+    results = [
+        Result("slower", 10, [130.0, 140.0]),
+        Result("same", 10, [110.0]),
+        Result("faster", 10, [70.0]),
+        Result("added", 10, [5.0]),
+    ]
+
+    statuses = {row["name"]: row["status"] for row in compare(results, baseline, 0.2)}
+
+    assert statuses == {
+        "slower": "regression",
+        "same": "ok",
+        "faster": "improvement",
+        "added": "new",
+    }
+
+
+def test_compare_skips_baselines_from_other_machines():
+    """Test timings recorded elsewhere are not reported as regressions."""
+    baseline = {
+        "environment": {**environment(), "machine": "elsewhere"},
+        "benchmarks": {"slower": {"ns_per_op": 100.0}},
+    }
+
+    rows = compare([Result("slower", 10, [300.0]), Result("added", 10, [5.0])], baseline, 0.2)
+
+    assert [row["status"] for row in rows] == ["skipped", "new"]
+    assert rows[0]["change"] == 2.0
+
+
+def test_save_baseline_merges_entries(tmp_path):
+    """Test saving a subset keeps the other benchmarks' baselines."""
+    path = tmp_path / "baselines.json"
+    save_baseline(path, [Result("a", 1, [10.0]), Result("b", 1, [20.0])])
+    save_baseline(path, [Result("a", 1, [12.0])])
+
+    stored = load_baseline(path)["benchmarks"]
+
+    assert stored["a"]["ns_per_op"] == 12.0
+    assert stored["b"]["ns_per_op"] == 20.0
+
+
+def test_run_calibrates_iterations():
+    """Test rounds are long enough to time reliably."""
+    result = run(Benchmark("noop", lambda: (lambda: None)), repeat=2, min_time=0.001)
+
+    assert result.number > 1
+    assert len(result.rounds) == 2
+
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_benchmark_runs(name, restore_dependencies):
+    """Test every registered benchmark runs once."""
+    bench = BENCHMARKS[name]
+    result = run(Benchmark(name, bench.factory, number=1), repeat=1)
+    assert result.best > 0
+
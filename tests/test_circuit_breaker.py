@@ -0,0 +1,103 @@
+"""
+Unit tests for utils/circuit_breaker.py.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionRefusedError("relay down")
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    return CircuitBreaker("smtp", min_calls=2, window_size=4, open_seconds=30, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_error_rate_and_fails_fast():
+    """Test the breaker opens once enough calls fail and then rejects calls."""
+    breaker = _breaker()
+
+    assert await breaker.call(ok) == "ok"
+    with pytest.raises(ConnectionRefusedError):
+        await breaker.call(fail)
+
+    assert breaker.state is BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok)
+    assert breaker.calls == {"success": 1, "failure": 1, "slow": 0, "rejected": 1}
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_count_against_the_breaker():
+    """Test successful but slow calls open the breaker too."""
+    breaker = _breaker(slow_call_seconds=0.01)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+
+    await breaker.call(slow)
+    await breaker.call(slow)
+
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.calls["slow"] == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_that_are_not_failures_keep_breaker_closed():
+    """Test errors rejected by is_failure are treated as successful calls."""
+    breaker = _breaker(is_failure=lambda error: not isinstance(error, ValueError))
+
+    async def bad_input():
+        raise ValueError("bad recipient")
+
+    for _ in range(4):
+        with pytest.raises(ValueError):
+            await breaker.call(bad_input)
+
+    assert breaker.state is BreakerState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_one_trial_call():
+    """Test the breaker lets a single trial through after the open period."""
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(ConnectionRefusedError):
+            await breaker.call(fail)
+
+    with patch("src.utils.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 31):
+        assert breaker.allow()
+        assert breaker.state is BreakerState.HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record(False, 0.0)
+        assert breaker.state is BreakerState.OPEN
+
+    with patch("src.utils.circuit_breaker.time.monotonic", return_value=breaker._opened_at + 31):
+        assert await breaker.call(ok) == "ok"
+    assert breaker.state is BreakerState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_releases_half_open_slot():
+    """Test a cancelled trial call does not leave the breaker stuck."""
+    breaker = _breaker()
+    breaker._transition(BreakerState.HALF_OPEN)
+
+    task = asyncio.create_task(breaker.call(asyncio.sleep, 10))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert breaker.allow()
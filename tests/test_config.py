@@ -7,7 +7,7 @@ from unittest.mock import patch
 
 import pytest
 
-from src.config import load_config
+from src.config import Settings, load_config
 
 
 def test_load_config_success():
@@ -88,3 +88,29 @@ def test_load_config_validates_all_missing_keys():
             assert "MCP_SERVER_AUTH_KEY" in error_msg
             assert "POSTMARK_API_KEY" in error_msg
             assert "SENDER_EMAIL" in error_msg
+
+
+def test_reload_applies_edited_dotenv_values(tmp_path):
+    """Test a reload picks up edited .env values but not over the process environment."""
+    dotenv = tmp_path / ".env"
+    required = "MCP_SERVER_AUTH_KEY=key\nPOSTMARK_API_KEY=postmark\nSENDER_EMAIL=a@example.com\n"
+    with patch.dict(os.environ, {"SMTP_HOST": "relay.internal"}, clear=True), patch(
+        "src.config._PROCESS_ENV", frozenset({"SMTP_HOST"})
+    ):
+        dotenv.write_text(required + "SMTP_PORT=2525\nSMTP_HOST=smtp.example.com\n")
+        assert load_config(dotenv).SMTP_PORT == 2525
+
+        dotenv.write_text(required + "SMTP_PORT=2526\nSMTP_HOST=smtp.example.com\n")
+        assert load_config(dotenv).SMTP_PORT == 2525
+
+        config = load_config(dotenv, reload=True)
+        assert config.SMTP_PORT == 2526
+        assert config.SMTP_HOST == "relay.internal"
+
+
+def test_send_rate_must_be_positive():
+    """Test a zero send rate or burst is rejected when settings load."""
+    with pytest.raises(ValueError):
+        Settings(SEND_RATE_PER_SECOND=0)
+    with pytest.raises(ValueError):
+        Settings(SEND_BURST=0)
@@ -0,0 +1,221 @@
+"""
+Unit tests for dependencies.py
+"""
+
+import pytest
+
+from src.context import current_session_id, current_tenant
+from src.dependencies import DependencyRegistry, Scope
+from src.mcp_tools import DEPENDENCIES, make_wrapper
+from src.tenants import Tenant
+
+
+class Resource:
+    """Stand-in for a shared client that records its lifecycle."""
+
+    created = 0
+
+    def __init__(self):
+        Resource.created += 1
+        self.started = False
+        self.closed = False
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def reset_resource_count():
+    Resource.created = 0
+
+
+def test_singleton_is_constructed_lazily_once():
+    """Test singleton factories run on first use only."""
+    registry = DependencyRegistry()
+    registry.register_factory("client", Resource)
+
+    assert Resource.created == 0
+    assert registry.get("client") is registry.get("client")
+    assert Resource.created == 1
+
+
+def test_session_scope_is_per_session():
+    """Test session-scoped dependencies are shared within a session only."""
+    registry = DependencyRegistry()
+    registry.register_factory("cache", Resource, scope=Scope.SESSION)
+
+    token = current_session_id.set("session-a")
+    try:
+        first = registry.get("cache")
+        assert registry.get("cache") is first
+    finally:
+        current_session_id.reset(token)
+
+    token = current_session_id.set("session-b")
+    try:
+        assert registry.get("cache") is not first
+    finally:
+        current_session_id.reset(token)
+
+    with pytest.raises(RuntimeError):
+        registry.get("cache")
+
+
+def test_call_scope_builds_new_instance_each_time():
+    """Test call-scoped dependencies are never shared."""
+    registry = DependencyRegistry()
+    registry.register_factory("unit_of_work", Resource, scope=Scope.CALL)
+
+    assert registry.get("unit_of_work") is not registry.get("unit_of_work")
+
+
+def test_binding_reuses_static_values_until_registry_changes():
+    """Test bindings hand out the same kwargs dict until providers change."""
+    registry = DependencyRegistry()
+    registry.update({"api_key": "first"})
+    binding = registry.bind(["api_key"])
+
+    values = binding.resolve()
+    assert values == {"api_key": "first"}
+    assert binding.resolve() is values
+
+    registry.update({"api_key": "second"})
+    assert binding.resolve() == {"api_key": "second"}
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_hooks():
+    """Test startup warms eager singletons and shutdown closes every instance."""
+    registry = DependencyRegistry()
+    registry.update({"api_key": "value"})
+    registry.register_factory(
+        "pool", Resource, startup=Resource.start, shutdown=Resource.close, eager=True
+    )
+    registry.register_factory(
+        "session_client", Resource, scope=Scope.SESSION, shutdown=Resource.close
+    )
+
+    await registry.startup()
+    pool = registry.get("pool")
+    assert pool.started
+
+    token = current_session_id.set("session-a")
+    try:
+        session_client = registry.get("session_client")
+    finally:
+        current_session_id.reset(token)
+
+    await registry.close_session("session-a")
+    assert session_client.closed
+
+    await registry.shutdown()
+    assert pool.closed
+    # Plain values survive shutdown; factories build fresh instances afterwards
+    assert registry.get("api_key") == "value"
+    assert registry.get("pool") is not pool
+
+
+@pytest.mark.asyncio
+async def test_make_wrapper_resolves_and_releases_per_call_dependencies():
+    """Test wrappers inject dependencies per call and close call-scoped ones."""
+    DEPENDENCIES.register_factory(
+        "test_call_resource", Resource, scope=Scope.CALL, shutdown=Resource.close
+    )
+    seen = []
+
+    async def sample_action(value: int, test_call_resource: Resource) -> int:
+        seen.append(test_call_resource)
+        return value * 2
+
+    wrapper = make_wrapper(sample_action)
+
+    assert await wrapper(value=2) == 4
+    assert await wrapper(value=3) == 6
+    assert seen[0] is not seen[1]
+    assert all(resource.closed for resource in seen)
+    assert "test_call_resource" not in str(wrapper.__signature__)
+
+
+@pytest.mark.asyncio
+async def test_tenant_scope_is_per_tenant():
+    """Test tenant-scoped dependencies are cached per tenant and closed with it."""
+    registry = DependencyRegistry()
+    registry.register_factory(
+        "pool", Resource, scope=Scope.TENANT, shutdown=lambda pool: pool.close()
+    )
+
+    default = registry.get("pool")
+    token = current_tenant.set(Tenant("acme"))
+    try:
+        acme = registry.get("pool")
+        assert registry.get("pool") is acme
+    finally:
+        current_tenant.reset(token)
+
+    assert acme is not default
+    assert registry.get("pool") is default
+
+    await registry.close_tenant("acme")
+    assert acme.closed and not default.closed
+    assert registry.instances("pool") == [default]
+
+
+@pytest.mark.asyncio
+async def test_replace_swaps_providers_and_retires_old_instances():
+    """Test replace swaps providers at once, keeping listed and unrelated ones."""
+    registry = DependencyRegistry()
+    registry.update({"api_key": "old"})
+    registry.register_factory("pool", Resource, shutdown=Resource.close)
+    registry.register_factory("outbox", Resource, shutdown=Resource.close)
+    registry.register_factory("tenant_pool", Resource, scope=Scope.TENANT, shutdown=Resource.close)
+    registry.register_factory("custom", Resource)
+    binding = registry.bind(["api_key", "pool"])
+    old = binding.resolve()
+    outbox, tenant_pool, custom = (registry.get(name) for name in ("outbox", "tenant_pool", "custom"))
+
+    staged = DependencyRegistry()
+    staged.update({"api_key": "new"})
+    staged.register_factory("pool", Resource, shutdown=Resource.close)
+    staged.register_factory("outbox", Resource, shutdown=Resource.close)
+    staged.register_factory("tenant_pool", Resource, scope=Scope.TENANT, shutdown=Resource.close)
+    retired = registry.replace(staged, keep=["outbox"])
+
+    new = binding.resolve()
+    assert new["api_key"] == "new"
+    assert new["pool"] is not old["pool"]
+    assert registry.get("tenant_pool") is not tenant_pool
+    assert registry.get("outbox") is outbox
+    assert registry.get("custom") is custom
+    # Retired instances stay usable until closed
+    assert not old["pool"].closed
+
+    await registry.close_retired(retired)
+    assert old["pool"].closed and tenant_pool.closed
+    assert not outbox.closed
+
+
+@pytest.mark.asyncio
+async def test_binding_caches_tenant_values_per_tenant():
+    """Test tenant-only bindings reuse one kwargs dict per tenant until it is closed."""
+    registry = DependencyRegistry()
+    registry.update({"api_key": "value"})
+    registry.register_factory("pool", Resource, scope=Scope.TENANT, shutdown=Resource.close)
+    binding = registry.bind(["api_key", "pool"])
+
+    default = binding.resolve()
+    assert binding.resolve() is default
+    token = current_tenant.set(Tenant("acme"))
+    try:
+        acme = binding.resolve()
+        assert binding.resolve() is acme
+        assert acme["pool"] is not default["pool"]
+    finally:
+        current_tenant.reset(token)
+
+    await registry.close_tenant(None)
+    assert default["pool"].closed
+    fresh = binding.resolve()
+    assert fresh["pool"] is not default["pool"] and not fresh["pool"].closed
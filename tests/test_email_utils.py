@@ -3,11 +3,13 @@ Unit tests for email_utils.py
 """
 
 import smtplib
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.utils.attachments import Attachment, StreamingMessage
 from src.utils.email import _validate_email_addresses, send_email
+from src.utils.suppression import SuppressionIndex
 
 
 def test_validate_email_addresses():
@@ -134,3 +136,79 @@ async def test_send_email_filters_invalid_addresses():
         # Should succeed with 2 valid recipients (filtered out invalid-email)
         assert result == "Email sent successfully to 2 recipients"
         mock_server.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_email_uses_transport_when_provided():
+    """Test send_email hands the message to a shared transport instead of smtplib."""
+    transport = MagicMock()
+    transport.send_message = AsyncMock()
+
+    with patch("smtplib.SMTP") as mock_smtp:
+        result = await send_email(
+            ["test@example.com"], "Subject", "Body", "api_key", "from@example.com",
+            transport=transport,
+        )
+
+        mock_smtp.assert_not_called()
+
+    msg = transport.send_message.call_args.args[0]
+    assert msg["To"] == "test@example.com"
+    assert result == "Email sent successfully to 1 recipients"
+
+
+@pytest.mark.asyncio
+async def test_send_email_skips_suppressed_recipients(tmp_path):
+    """Test suppressed addresses are dropped before any network work."""
+    suppression = SuppressionIndex(tmp_path / "suppression.bin")
+    suppression.add("Bounced@Example.com")
+    transport = AsyncMock()
+
+    result = await send_email(
+        recipients=["bounced@example.com", "user@example.com"],
+        subject="Subject",
+        body="Body",
+        api_key="key",
+        from_email="sender@example.com",
+        transport=transport,
+        suppression=suppression,
+    )
+
+    msg = transport.send_message.call_args.args[0]
+    assert msg["To"] == "user@example.com"
+    assert result == "Email sent successfully to 1 recipients"
+
+    with pytest.raises(ValueError, match="suppression list"):
+        await send_email(
+            recipients=["bounced@example.com"],
+            subject="Subject",
+            body="Body",
+            api_key="key",
+            from_email="sender@example.com",
+            transport=transport,
+            suppression=suppression,
+        )
+    assert transport.send_message.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_send_email_with_attachments_streams_message(tmp_path):
+    """Test attachments switch send_email to a streaming message."""
+    path = tmp_path / "notes.txt"
+    path.write_text("notes")
+    transport = AsyncMock()
+
+    await send_email(
+        recipients=["user@example.com"],
+        subject="Subject",
+        body="Body",
+        api_key="key",
+        from_email="sender@example.com",
+        transport=transport,
+        attachments=[Attachment("notes.txt", "text/plain", 5, path=path)],
+    )
+
+    msg = transport.send_message.call_args.args[0]
+    assert isinstance(msg, StreamingMessage)
+    assert msg["To"] == "user@example.com"
+    assert [a.filename for a in msg.attachments] == ["notes.txt"]
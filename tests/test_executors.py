@@ -0,0 +1,188 @@
+"""
+Unit tests for executors.py and pool-run actions.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+from src.executors import (
+    ActionPool,
+    ActionPools,
+    ExecutionMode,
+    execution_mode,
+    max_concurrency,
+)
+from src.mcp_tools import ACTION_POOLS, DEPENDENCIES, make_wrapper
+
+
+def checksum(data: str, rounds: int) -> tuple[int, int]:
+    """CPU-bound stand-in; module level so the process pool can pickle it."""
+    value = 0
+    for _ in range(rounds):
+        for char in data:
+            value = (value * 31 + ord(char)) % 1_000_003
+    return value, os.getpid()
+
+
+@pytest.fixture
+def thread_module():
+    """An action module declaring the thread execution mode."""
+    module = types.ModuleType("fake_thread_actions")
+    module.EXECUTION_MODE = "thread"
+
+    def render_action(text: str, sender_email: str) -> str:
+        return f"{text} from {sender_email} on {threading.current_thread().name}"
+
+    render_action.__module__ = module.__name__
+    module.render_action = render_action
+    sys.modules[module.__name__] = module
+    yield module
+    del sys.modules[module.__name__]
+    ACTION_POOLS.thread.modules.discard(module.__name__)
+
+
+def test_execution_mode_defaults_to_loop(thread_module):
+    """Test modules without EXECUTION_MODE run on the event loop."""
+    assert execution_mode(checksum) is ExecutionMode.LOOP
+    assert execution_mode(thread_module.render_action) is ExecutionMode.THREAD
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_action_runs_in_pool_with_dependencies(thread_module):
+    """Test the wrapper runs plain-function actions in the thread pool."""
+    DEPENDENCIES.register_value("sender_email", "sender@example.com")
+    wrapper = make_wrapper(thread_module.render_action)
+
+    result = await wrapper(text="report")
+
+    assert result.startswith("report from sender@example.com on mcp-action")
+    assert "sender_email" not in wrapper.__signature__.parameters
+    await ACTION_POOLS.thread.shutdown()
+
+
+def test_pool_mode_rejects_async_actions(thread_module):
+    """Test coroutine actions cannot be declared to run in a pool."""
+
+    async def broken_action() -> str:
+        return "never"
+
+    broken_action.__module__ = thread_module.__name__
+
+    with pytest.raises(TypeError, match="plain function"):
+        make_wrapper(broken_action)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_is_warmed_and_runs_actions():
+    """Test warm-up starts every worker before the first call."""
+    pools = ActionPools(thread_workers=1, process_workers=2)
+    pools.require(ExecutionMode.PROCESS, __name__)
+    try:
+        await pools.warm_up()
+        assert pools.process.started
+
+        value, pid = await pools.process.run(checksum, {"data": "abc", "rounds": 10})
+
+        assert value == checksum("abc", 10)[0]
+        assert pid != os.getpid()
+    finally:
+        await pools.shutdown()
+    assert not pools.process.started
+
+
+@pytest.mark.asyncio
+async def test_recycled_pool_starts_fresh_workers():
+    """Test recycling lets running calls finish and starts new workers for later ones."""
+    pools = ActionPools(thread_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow() -> str:
+        started.set()
+        release.wait(1)
+        return threading.current_thread().name
+
+    try:
+        running = asyncio.ensure_future(pools.thread.run(slow, {}))
+        await asyncio.to_thread(started.wait, 1)
+        pools.thread.recycle()
+        assert not pools.thread.started
+        release.set()
+
+        assert await running
+        assert await pools.thread.run(lambda: 1, {}) == 1
+        assert pools.thread.started
+    finally:
+        await pools.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_skips_process_pool_when_unused():
+    """Test the process pool is not started when no action needs it."""
+    pools = ActionPools(thread_workers=1, process_workers=1)
+
+    await pools.warm_up()
+
+    assert not pools.process.started
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_report_utilisation():
+    """Test calls and busy time are counted per pool."""
+    pools = ActionPools(thread_workers=2, process_workers=1)
+    await pools.thread.run(checksum, {"data": "abc", "rounds": 1000})
+    await pools.shutdown()
+
+    metrics = {metric.name: dict((labels["pool"], value) for labels, value in metric.samples)
+               for metric in pools.metrics()}
+
+    assert metrics["mcp_action_pool_calls_total"] == {"thread": 1, "process": 0}
+    assert metrics["mcp_action_pool_busy_seconds_total"]["thread"] > 0
+    assert metrics["mcp_action_pool_busy"] == {"thread": 0, "process": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_call_is_counted_and_raised():
+    """Test exceptions from pool-run actions reach the caller."""
+    pool = ActionPool(ExecutionMode.THREAD, 1)
+
+    with pytest.raises(TypeError):
+        await pool.run(checksum, {"data": "abc"})
+
+    assert pool.calls == 1
+    assert pool.in_flight == 0
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_limits_calls_of_an_action():
+    """Test MAX_CONCURRENCY queues calls beyond the module's limit."""
+    module = types.ModuleType("fake_limited_actions")
+    module.MAX_CONCURRENCY = 2
+    running, peak = 0, 0
+
+    async def slow_action(n: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return n
+
+    slow_action.__module__ = module.__name__
+    sys.modules[module.__name__] = module
+    try:
+        assert max_concurrency(slow_action) == 2
+        wrapper = make_wrapper(slow_action)
+        results = await asyncio.gather(*(wrapper(n=n) for n in range(6)))
+    finally:
+        del sys.modules[module.__name__]
+
+    assert results == list(range(6))
+    assert peak == 2
+    assert max_concurrency(checksum) is None
@@ -0,0 +1,150 @@
+"""
+Unit tests for health.py and the health endpoints.
+"""
+
+import asyncio
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.config import Settings
+from src.health import HealthMonitor
+from src.mcp_tools import MCPServer
+
+
+@pytest.mark.asyncio
+async def test_probe_results_are_cached_between_rounds():
+    """Test readiness reads cached probe results instead of probing."""
+    monitor = HealthMonitor()
+    calls = []
+
+    async def smtp_probe():
+        calls.append("smtp")
+
+    monitor.add_probe("smtp", smtp_probe)
+
+    ready, checks = monitor.readiness()
+    assert ready
+    assert checks["smtp"]["healthy"] is None
+
+    await monitor.run_probes()
+    monitor.readiness()
+    monitor.readiness()
+
+    assert calls == ["smtp"]
+    assert monitor.readiness()[1]["smtp"]["healthy"] is True
+
+
+@pytest.mark.asyncio
+async def test_probe_forever_reruns_probes_after_each_interval():
+    """Test the background loop waits an interval before each later round."""
+    monitor = HealthMonitor(probe_interval=0.02)
+    calls = []
+
+    async def smtp_probe():
+        calls.append(time.monotonic())
+
+    monitor.add_probe("smtp", smtp_probe)
+    task = asyncio.create_task(monitor.probe_forever())
+    try:
+        await asyncio.sleep(0.01)
+        assert calls == []
+        await asyncio.sleep(0.05)
+        assert len(calls) >= 2
+    finally:
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_failing_probes_affect_readiness_only_when_critical():
+    """Test critical probe failures make the replica not ready."""
+    monitor = HealthMonitor(probe_timeout=0.05)
+
+    async def broken():
+        raise ConnectionRefusedError("relay down")
+
+    async def hanging():
+        await asyncio.sleep(1)
+
+    monitor.add_probe("metrics_sink", broken, critical=False)
+    await monitor.run_probes()
+    assert monitor.readiness()[0]
+
+    monitor.add_probe("smtp", hanging)
+    await monitor.run_probes()
+    ready, checks = monitor.readiness()
+
+    assert not ready
+    assert checks["smtp"]["error"].startswith("TimeoutError")
+    assert "relay down" in checks["metrics_sink"]["error"]
+
+
+def test_gauges_and_loop_lag_limits():
+    """Test gauges at their limit and excessive loop lag mark the replica not ready."""
+    monitor = HealthMonitor(max_loop_lag=0.5)
+    backlog = [10]
+    monitor.add_gauge("outbox_backlog", lambda: backlog[0], limit=100)
+
+    assert monitor.readiness()[0]
+
+    backlog[0] = 100
+    ready, checks = monitor.readiness()
+    assert not ready
+    assert checks["outbox_backlog"] == {"healthy": False, "value": 100, "limit": 100}
+
+    backlog[0] = 0
+    monitor._lag_samples.append(0.75)
+    ready, checks = monitor.readiness()
+    assert not ready
+    assert checks["event_loop_lag"]["value"] == 0.75
+
+
+@pytest.mark.asyncio
+async def test_sample_loop_lag_detects_blocked_loop():
+    """Test the lag sampler notices a synchronous stall."""
+    monitor = HealthMonitor(lag_interval=0.01)
+    sampler = asyncio.create_task(monitor.sample_loop_lag())
+    await asyncio.sleep(0)
+    time.sleep(0.1)  # block the event loop
+    await asyncio.sleep(0.02)
+    sampler.cancel()
+
+    assert monitor.loop_lag >= 0.05
+
+
+def test_live_and_ready_endpoints_skip_authentication():
+    """Test probes are reachable without an API key and report readiness."""
+    server = MCPServer(api_key="test_key", config=Settings(MAX_SESSIONS=5))
+
+    async def smtp_probe():
+        raise OSError("no route to relay")
+
+    server.health.add_probe("smtp", smtp_probe)
+
+    with TestClient(server.create_app()) as client:
+        client.portal.call(asyncio.sleep, 0.01)
+
+        assert client.get("/health/live").json() == {"status": "alive"}
+
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        body = response.json()
+        assert body["status"] == "unhealthy"
+        assert body["checks"]["smtp"]["healthy"] is False
+        assert body["checks"]["active_sessions"] == {"healthy": True, "value": 0, "limit": 5}
+
+        # Everything else still requires the key
+        assert client.get("/sse").status_code == 401
+
+
+def test_sse_rejects_connections_over_session_cap():
+    """Test new SSE sessions are shed when the session cap is reached."""
+    server = MCPServer(api_key="test_key", config=Settings(MAX_SESSIONS=1))
+    server.active_sessions = 1
+    client = TestClient(server.create_app())
+
+    response = client.get("/sse", headers={"X-API-Key": "test_key"})
+
+    assert response.status_code == 503
+    assert response.json() == {"error": "Server at session capacity"}
@@ -0,0 +1,219 @@
+"""
+Unit tests for jobs.py and job-mode actions.
+"""
+
+import asyncio
+import sys
+import types
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import mcp.types
+import pytest
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+
+from src.context import current_job, current_session_id, current_tenant
+from src.jobs import (
+    JOBS,
+    JobLimitError,
+    JobStatus,
+    JobStore,
+    make_result_tool,
+    progress_reporter,
+)
+from src.mcp_tools import MCPServer, make_wrapper, populate_dependencies, register_tools
+from src.tenants import Tenant
+
+
+@pytest.fixture
+def job_module():
+    """An action module that opted into job mode."""
+    module = types.ModuleType("fake_job_actions")
+    module.ASYNC_JOB = True
+    module.release = asyncio.Event()
+
+    async def render_action(pages: int, progress) -> str:
+        for page in range(1, pages + 1):
+            await module.release.wait()
+            await progress(page, pages)
+        return f"rendered {pages} pages"
+
+    render_action.__module__ = module.__name__
+    module.render_action = render_action
+    sys.modules[module.__name__] = module
+    yield module
+    del sys.modules[module.__name__]
+
+
+async def wait_for_job(store, job_id):
+    while store.get(job_id).status is JobStatus.RUNNING:
+        await asyncio.sleep(0.01)
+    return store.get(job_id)
+
+
+@pytest.mark.asyncio
+async def test_job_action_returns_handle_and_result(job_module):
+    """Test a job-mode tool returns at once and its result is fetched later."""
+    populate_dependencies(api_key="key", from_email="sender@example.com")
+    wrapper = make_wrapper(job_module.render_action)
+    result_tool = make_result_tool(wrapper.__name__, JOBS)
+
+    handle = await wrapper(pages=2)
+
+    assert handle["status"] == "running"
+    assert handle["result_tool"] == "render_result_tool"
+    assert "progress" not in wrapper.__signature__.parameters
+    assert (await result_tool(handle["job_id"]))["status"] == "running"
+
+    job_module.release.set()
+    await wait_for_job(JOBS, handle["job_id"])
+
+    state = await result_tool(handle["job_id"])
+    assert state["status"] == "succeeded"
+    assert state["result"] == "rendered 2 pages"
+    assert (state["progress"], state["total"]) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_reports_error():
+    """Test exceptions from the action are recorded on the job."""
+    store = JobStore()
+
+    async def fail():
+        raise ValueError("bad input")
+
+    job = store.submit("render_tool", fail)
+    await wait_for_job(store, job.id)
+
+    state = await make_result_tool("render_tool", store)(job.id)
+    assert state == {
+        "job_id": job.id,
+        "tool": "render_tool",
+        "status": "failed",
+        "progress": 0.0,
+        "total": None,
+        "error": "bad input",
+    }
+
+
+@pytest.mark.asyncio
+async def test_result_tool_only_returns_its_own_jobs():
+    """Test a job id cannot be read through another tool's result tool."""
+    store = JobStore()
+    job = store.submit("render_tool", AsyncMock(return_value="done"))
+
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        await make_result_tool("export_tool", store)(job.id)
+
+
+@pytest.mark.asyncio
+async def test_result_tool_only_returns_jobs_of_the_same_tenant_and_session():
+    """Test a job id cannot be read by another tenant or from another session."""
+    store = JobStore()
+    result_tool = make_result_tool("render_tool", store)
+    tenant_token = current_tenant.set(Tenant("acme"))
+    session_token = current_session_id.set("session-1")
+    try:
+        job = store.submit("render_tool", AsyncMock(return_value="done"))
+        await wait_for_job(store, job.id)
+        assert (await result_tool(job.id))["result"] == "done"
+
+        current_session_id.set("session-2")
+        with pytest.raises(ValueError, match="Unknown or expired"):
+            await result_tool(job.id)
+
+        current_session_id.set("session-1")
+        current_tenant.set(Tenant("globex"))
+        with pytest.raises(ValueError, match="Unknown or expired"):
+            await result_tool(job.id)
+    finally:
+        current_session_id.reset(session_token)
+        current_tenant.reset(tenant_token)
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire_after_ttl():
+    """Test finished jobs are evicted once their TTL has passed."""
+    store = JobStore(ttl=0.0)
+    job = store.submit("render_tool", AsyncMock(return_value="done"))
+    await asyncio.sleep(0.01)
+
+    assert store.get(job.id) is None
+    assert len(store) == 0
+
+
+@pytest.mark.asyncio
+async def test_store_is_bounded():
+    """Test a full store evicts finished jobs first and refuses new ones when all run."""
+    store = JobStore(max_jobs=1)
+    finished = store.submit("render_tool", AsyncMock(return_value="done"))
+    await wait_for_job(store, finished.id)
+
+    blocker = asyncio.Event()
+    running = store.submit("render_tool", blocker.wait)
+
+    assert store.get(finished.id) is None
+    with pytest.raises(JobLimitError):
+        store.submit("render_tool", AsyncMock())
+
+    blocker.set()
+    await wait_for_job(store, running.id)
+
+
+@pytest.mark.asyncio
+async def test_progress_is_sent_as_notifications():
+    """Test progress reports use the request's progress token on its session."""
+    session = MagicMock()
+    session.send_progress_notification = AsyncMock()
+    meta = mcp.types.RequestParams.Meta(progressToken="token-1")
+    token = request_ctx.set(RequestContext(1, meta, session, None))
+    try:
+        progress = progress_reporter()
+    finally:
+        request_ctx.reset(token)
+
+    await progress(1, 4)
+
+    session.send_progress_notification.assert_awaited_once_with("token-1", 1, 4)
+
+
+@pytest.mark.asyncio
+async def test_job_progress_without_token_is_only_recorded():
+    """Test no notification is sent when the client did not ask for progress."""
+    store = JobStore()
+    blocker = asyncio.Event()
+    job = store.submit("render_tool", blocker.wait)
+    session = MagicMock()
+    session.send_progress_notification = AsyncMock()
+    token = request_ctx.set(RequestContext(1, None, session, None))
+    job_token = current_job.set(job)
+    try:
+        progress = progress_reporter()
+    finally:
+        current_job.reset(job_token)
+        request_ctx.reset(token)
+
+    await progress(3, 10)
+
+    session.send_progress_notification.assert_not_called()
+    assert (job.progress, job.total) == (3, 10)
+    blocker.set()
+    await wait_for_job(store, job.id)
+
+
+@pytest.mark.asyncio
+async def test_progress_without_request_is_a_no_op():
+    """Test actions can report progress when called outside an MCP request."""
+    await progress_reporter()(1)
+
+
+def test_register_tools_adds_result_tool_for_job_actions(job_module):
+    """Test a companion result tool is registered next to each job-mode tool."""
+    server = MCPServer(api_key="test_key")
+
+    with patch("src.mcp_tools.discover_actions", return_value=[("fake", job_module.render_action)]):
+        register_tools(mcp_server=server, api_key="key", from_email="sender@example.com")
+
+    tools = server.mcp._tool_manager._tools
+    assert {"render_tool", "render_result_tool"} <= set(tools)
+    assert set(tools["render_result_tool"].parameters["properties"]) == {"job_id"}
@@ -0,0 +1,137 @@
+"""
+Unit tests for lifespan.py
+"""
+
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.lifespan import Lifespan
+from src.mcp_tools import MCPServer
+
+
+@pytest.mark.asyncio
+async def test_hooks_run_in_order_and_ready_after_warmup():
+    """Test startup, warm-up and shutdown hooks run at the right moments."""
+    lifespan = Lifespan()
+    events = []
+    warmup_started = asyncio.Event()
+    release_warmup = asyncio.Event()
+
+    @lifespan.on_startup
+    async def open_resources():
+        events.append("startup")
+
+    @lifespan.on_warmup
+    async def preopen_connections():
+        warmup_started.set()
+        await release_warmup.wait()
+        events.append("warmup")
+
+    @lifespan.on_shutdown
+    async def close_first_registered():
+        events.append("shutdown-1")
+
+    @lifespan.on_shutdown
+    async def close_last_registered():
+        events.append("shutdown-2")
+
+    async with lifespan(None):
+        await warmup_started.wait()
+        assert events == ["startup"]
+        assert not lifespan.ready
+
+        release_warmup.set()
+        await asyncio.sleep(0.01)
+        assert lifespan.ready
+
+    assert events == ["startup", "warmup", "shutdown-2", "shutdown-1"]
+    assert not lifespan.ready
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_still_becomes_ready():
+    """Test a failing warm-up is logged rather than blocking readiness forever."""
+    lifespan = Lifespan()
+
+    @lifespan.on_warmup
+    async def broken_warmup():
+        raise ConnectionError("relay unavailable")
+
+    async with lifespan(None):
+        await asyncio.sleep(0.01)
+        assert lifespan.ready
+
+
+@pytest.mark.asyncio
+async def test_background_tasks_drain_then_cancel_after_timeout():
+    """Test background tasks see stopping, and stragglers are cancelled at the deadline."""
+    lifespan = Lifespan(drain_timeout=0.1)
+    drained = []
+    cancelled = []
+
+    async def flusher():
+        await lifespan.stopping.wait()
+        drained.append("flusher")
+
+    async def stuck_worker():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append("stuck_worker")
+            raise
+
+    lifespan.add_background_task(flusher)
+    lifespan.add_background_task(stuck_worker)
+
+    async with lifespan(None):
+        await asyncio.sleep(0.01)
+
+    assert drained == ["flusher"]
+    assert cancelled == ["stuck_worker"]
+
+
+@pytest.mark.asyncio
+async def test_spawned_task_is_awaited_on_shutdown():
+    """Test tasks spawned at runtime are drained before shutdown hooks run."""
+    lifespan = Lifespan()
+    events = []
+
+    async def send_later():
+        await asyncio.sleep(0.01)
+        events.append("task")
+
+    @lifespan.on_shutdown
+    async def close_transport():
+        events.append("shutdown")
+
+    async with lifespan(None):
+        lifespan.spawn(send_later())
+
+    assert events == ["task", "shutdown"]
+
+
+def test_health_reports_starting_until_warmup_completes():
+    """Test /health/ready returns 503 until the lifespan is ready, /health stays 200."""
+    server = MCPServer(api_key="test_key")
+    release = asyncio.Event()
+
+    @server.lifespan.on_warmup
+    async def slow_warmup():
+        await release.wait()
+
+    app = server.create_app()
+
+    with TestClient(app) as client:
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+        assert client.get("/health").status_code == 200
+
+        client.portal.call(release.set)
+        client.portal.call(asyncio.sleep, 0.01)
+
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "healthy"
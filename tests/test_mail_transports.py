@@ -0,0 +1,133 @@
+"""
+Unit tests for utils/mail_transports.py.
+"""
+
+import asyncio
+import smtplib
+import time
+from email.message import EmailMessage
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.utils.mail_transports import (
+    FailoverTransport,
+    PostmarkAPIError,
+    PostmarkHTTPTransport,
+    is_transport_failure,
+)
+from src.utils.smtp_pool import SMTPConnectionPool
+
+
+def _message() -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Subject"
+    msg["From"] = "sender@example.com"
+    msg["To"] = "user@example.com"
+    msg.set_content("Body")
+    return msg
+
+
+def _route(name: str, transport) -> tuple:
+    breaker = CircuitBreaker(name, min_calls=1, is_failure=is_transport_failure)
+    return transport, breaker
+
+
+def test_is_transport_failure_classifies_errors():
+    """Test only errors about the transport itself count as failures."""
+    assert is_transport_failure(ConnectionRefusedError())
+    assert is_transport_failure(smtplib.SMTPServerDisconnected())
+    assert is_transport_failure(smtplib.SMTPResponseException(421, b"try later"))
+    assert is_transport_failure(PostmarkAPIError(503, "unavailable"))
+    assert is_transport_failure(httpx.ConnectTimeout("timeout"))
+    assert not is_transport_failure(smtplib.SMTPRecipientsRefused({}))
+    assert not is_transport_failure(smtplib.SMTPResponseException(550, b"no mailbox"))
+    assert not is_transport_failure(PostmarkAPIError(422, "invalid"))
+
+
+@pytest.mark.asyncio
+async def test_failover_uses_secondary_and_then_skips_open_primary():
+    """Test a failing primary trips its breaker and sends go to the fallback."""
+    primary = AsyncMock()
+    primary.send_message.side_effect = TimeoutError("connect timed out")
+    secondary = AsyncMock()
+    transport = FailoverTransport([_route("smtp", primary), _route("fallback", secondary)])
+
+    await transport.send_message(_message())
+    await transport.send_message(_message())
+
+    assert primary.send_message.await_count == 1
+    assert secondary.send_message.await_count == 2
+    assert transport.breakers[0].calls["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failover_does_not_retry_rejected_messages():
+    """Test message errors are raised without trying the fallback."""
+    primary = AsyncMock()
+    primary.send_message.side_effect = smtplib.SMTPRecipientsRefused({})
+    secondary = AsyncMock()
+    transport = FailoverTransport([_route("smtp", primary), _route("fallback", secondary)])
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        await transport.send_message(_message())
+
+    secondary.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failover_fails_fast_when_every_breaker_is_open():
+    """Test CircuitOpenError is raised without touching any transport."""
+    primary = AsyncMock()
+    primary.send_message.side_effect = ConnectionRefusedError()
+    transport = FailoverTransport([_route("smtp", primary)])
+
+    with pytest.raises(ConnectionRefusedError):
+        await transport.send_message(_message())
+    with pytest.raises(CircuitOpenError):
+        await transport.send_message(_message())
+
+    assert primary.send_message.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_postmark_http_transport_posts_message():
+    """Test the HTTP transport sends the message fields to the Postmark API."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/email":
+            return httpx.Response(200, json={"ErrorCode": 0})
+        return httpx.Response(503, text="unavailable")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        transport = PostmarkHTTPTransport("token", client, "https://api.example.com")
+        await transport.send_message(_message())
+        with pytest.raises(PostmarkAPIError):
+            await transport.probe()
+
+    assert requests[0].headers["X-Postmark-Server-Token"] == "token"
+    assert b'"To":"user@example.com"' in requests[0].content.replace(b" ", b"")
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_pool_slot_does_not_count_as_slow():
+    """Test a saturated but healthy SMTP pool does not trip its breaker."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        mock_smtp.return_value.send_message.side_effect = lambda msg: time.sleep(0.05)
+        pool = SMTPConnectionPool("smtp.example.com", 587, "user", "secret", max_size=1)
+        breaker = CircuitBreaker(
+            "smtp", slow_call_seconds=0.08, min_calls=1, is_failure=is_transport_failure
+        )
+        fallback = AsyncMock()
+        transport = FailoverTransport([(pool, breaker), _route("fallback", fallback)])
+
+        # Each send waits for the ones before it: up to 0.2 s end to end
+        await asyncio.gather(*(transport.send_message(_message()) for _ in range(5)))
+
+    assert breaker.calls == {"success": 5, "failure": 0, "slow": 0, "rejected": 0}
+    assert breaker.state.value == "closed"
+    fallback.send_message.assert_not_awaited()
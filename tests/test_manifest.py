@@ -0,0 +1,165 @@
+"""
+Unit tests for manifest.py
+"""
+
+import importlib
+import sys
+from unittest.mock import patch
+
+import mcp.types as types
+import pytest
+
+from src.manifest import (
+    build_manifest,
+    fingerprint_actions,
+    is_manifest_fresh,
+    load_manifest,
+    write_manifest,
+)
+from src.mcp_tools import (
+    DEPENDENCIES,
+    LazyTool,
+    MCPServer,
+    populate_dependencies,
+    register_tools,
+)
+
+
+@pytest.fixture
+def manifest():
+    populate_dependencies(api_key="test_api_key", from_email="test@example.com")
+    return build_manifest()
+
+
+def test_build_manifest_describes_actions(manifest):
+    """Test the manifest lists every action with its schema and module."""
+    tools = {tool["name"]: tool for tool in manifest["tools"]}
+
+    assert set(tools) == {"send_email_tool", "status_tool"}
+    assert tools["send_email_tool"]["module"] == "send_email"
+    assert tools["send_email_tool"]["action"] == "send_email_action"
+    assert tools["send_email_tool"]["execution_mode"] == "loop"
+    assert tools["send_email_tool"]["job"] is False
+
+    # Injected dependencies are not part of the client-facing schema
+    properties = tools["send_email_tool"]["parameters"]["properties"]
+    assert set(properties) == {"recipients", "subject", "body", "send_at", "attachments"}
+    assert set(manifest["modules"]) == {"send_email", "status"}
+
+
+def test_manifest_round_trip_and_freshness(manifest, tmp_path):
+    """Test a written manifest loads back and is considered fresh."""
+    path = tmp_path / "tool_manifest.json"
+    write_manifest(manifest, path)
+
+    loaded = load_manifest(path)
+
+    assert loaded == manifest
+    assert is_manifest_fresh(loaded, DEPENDENCIES)
+
+
+def test_manifest_is_stale_when_sources_change(manifest):
+    """Test the manifest is rejected when an action module changes."""
+    changed = dict(fingerprint_actions(), status="0" * 64)
+
+    with patch("src.manifest.fingerprint_actions", return_value=changed):
+        assert not is_manifest_fresh(manifest, DEPENDENCIES)
+
+    assert not is_manifest_fresh(manifest, ["postmark_api_key"])
+
+
+@pytest.fixture
+def other_package(tmp_path, monkeypatch):
+    """An actions package other than ``src.actions``, holding one action."""
+    path = tmp_path / "other_actions"
+    path.mkdir()
+    (path / "__init__.py").write_text("")
+    (path / "ping.py").write_text('async def ping_action() -> str:\n    """Ping."""\n    return "pong"\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield importlib.import_module("other_actions")
+    for name in [name for name in sys.modules if name.split(".")[0] == "other_actions"]:
+        del sys.modules[name]
+
+
+def test_manifest_freshness_uses_the_given_package(other_package):
+    """Test a manifest is checked against the package it was built from."""
+    populate_dependencies(api_key="test_api_key", from_email="test@example.com")
+    manifest = build_manifest(other_package)
+
+    assert [tool["name"] for tool in manifest["tools"]] == ["ping_tool"]
+    assert set(manifest["modules"]) == {"ping"}
+    assert is_manifest_fresh(manifest, DEPENDENCIES, other_package)
+    assert not is_manifest_fresh(manifest, DEPENDENCIES)
+
+
+def test_load_manifest_missing_or_corrupt(tmp_path):
+    """Test missing or unreadable manifests are ignored."""
+    assert load_manifest(tmp_path / "missing.json") is None
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert load_manifest(corrupt) is None
+
+
+@pytest.mark.asyncio
+async def test_register_tools_from_manifest_imports_lazily(manifest, tmp_path):
+    """Test tools registered from a manifest defer importing the action module."""
+    path = tmp_path / "tool_manifest.json"
+    write_manifest(manifest, path)
+    server = MCPServer(api_key="test_key")
+
+    with patch("src.mcp_tools.discover_actions") as mock_discover:
+        register_tools(
+            mcp_server=server,
+            api_key="test_api_key",
+            from_email="test@example.com",
+            manifest_path=path,
+        )
+        mock_discover.assert_not_called()
+
+    tool = server.mcp._tool_manager.get_tool("status_tool")
+    assert isinstance(tool, LazyTool)
+
+    result = await server.mcp.call_tool("status_tool", {})
+    assert '"status": "ok"' in result[0].text
+
+
+def test_register_tools_falls_back_when_manifest_stale(manifest, tmp_path):
+    """Test a stale manifest falls back to auto-discovery."""
+    manifest["modules"]["status"] = "0" * 64
+    path = tmp_path / "tool_manifest.json"
+    write_manifest(manifest, path)
+    server = MCPServer(api_key="test_key")
+
+    register_tools(
+        mcp_server=server,
+        api_key="test_api_key",
+        from_email="test@example.com",
+        manifest_path=path,
+    )
+
+    tool = server.mcp._tool_manager.get_tool("status_tool")
+    assert tool is not None
+    assert not isinstance(tool, LazyTool)
+
+
+@pytest.mark.asyncio
+async def test_list_tools_result_is_cached_until_tools_change():
+    """Test tools/list reuses its response until a tool is registered."""
+    server = MCPServer(api_key="test_key")
+    handler = server.mcp._mcp_server.request_handlers[types.ListToolsRequest]
+
+    async def first_tool() -> str:
+        return "first"
+
+    server.register_tool(first_tool)
+    first = await handler(None)
+    assert await handler(None) is first
+
+    async def second_tool() -> str:
+        return "second"
+
+    server.register_tool(second_tool)
+    second = await handler(None)
+    assert second is not first
+    assert [tool.name for tool in second.root.tools] == ["first_tool", "second_tool"]
@@ -2,6 +2,11 @@
 Unit tests for mcp_tools.py
 """
 
+import asyncio
+import importlib
+import os
+import signal
+import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -11,7 +16,15 @@ from starlette.responses import Response
 from starlette.routing import Route
 from starlette.testclient import TestClient
 
-from src.mcp_tools import APIKeyMiddleware, MCPServer, register_tools
+from src import actions
+from src.config import Settings
+from src.mcp_tools import (
+    DEPENDENCIES,
+    APIKeyMiddleware,
+    MCPServer,
+    populate_dependencies,
+    register_tools,
+)
 
 
 class TestAPIKeyMiddleware:
@@ -60,6 +73,27 @@ class TestAPIKeyMiddleware:
         assert response.status_code == 401
         assert response.json() == {"error": "Unauthorized"}
 
+    def test_api_key_middleware_skips_exempt_paths(self):
+        """Test middleware lets exempt paths through without an API key."""
+
+        async def dummy_endpoint(request):
+            return Response("OK", status_code=200)
+
+        app = Starlette(
+            middleware=[
+                Middleware(APIKeyMiddleware, api_key="key", exempt_paths=["/health"])
+            ],
+            routes=[
+                Route("/health", endpoint=dummy_endpoint),
+                Route("/test", endpoint=dummy_endpoint),
+            ],
+        )
+
+        client = TestClient(app)
+
+        assert client.get("/health").status_code == 200
+        assert client.get("/test").status_code == 401
+
 
 class TestMCPServer:
     """Test the MCPServer class."""
@@ -157,3 +191,212 @@ class TestRegisterTools:
                 api_key="test_api_key",
                 from_email="test@example.com",
             )
+
+
+class TestPopulateDependencies:
+    """Test the server-supplied dependencies."""
+
+    def test_mail_transport_routes_follow_failover_setting(self):
+        """Test the mail transport gets a breaker-guarded fallback when configured."""
+        populate_dependencies(
+            "key", "sender@example.com", Settings(MAIL_FAILOVER="smtp", SMTP_FALLBACK_HOST="relay.example.com")
+        )
+        transport = DEPENDENCIES.get("mail_transport")
+
+        assert [breaker.name for breaker in transport.breakers] == ["smtp", "smtp_fallback"]
+        assert transport.routes[1][0].host == "relay.example.com"
+
+    def test_invalid_failover_setting_is_rejected(self):
+        """Test an unknown or incomplete failover configuration fails at startup."""
+        with pytest.raises(ValueError):
+            populate_dependencies("key", "sender@example.com", Settings(MAIL_FAILOVER="carrier_pigeon"))
+        with pytest.raises(ValueError):
+            populate_dependencies("key", "sender@example.com", Settings(MAIL_FAILOVER="smtp"))
+
+
+@pytest.fixture
+def probe_package(tmp_path, monkeypatch):
+    """A throwaway actions package on sys.path holding one stable action module."""
+    path = tmp_path / "probe_actions"
+    path.mkdir()
+    (path / "__init__.py").write_text("")
+    (path / "stable.py").write_text('async def stable_action() -> str:\n    """Stable."""\n    return "ok"\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield path
+    for name in [name for name in sys.modules if name.split(".")[0] == "probe_actions"]:
+        del sys.modules[name]
+
+
+def _server(tmp_path, actions_package=actions, **settings) -> MCPServer:
+    config = Settings(
+        MCP_SERVER_AUTH_KEY="key",
+        POSTMARK_API_KEY="postmark",
+        SENDER_EMAIL="sender@example.com",
+        OUTBOX_PATH=str(tmp_path / "outbox.sqlite3"),
+        SUPPRESSION_PATH=str(tmp_path / "suppression.bin"),
+        HEALTH_SMTP_PROBE=False,
+        WATCHDOG_ENABLED=False,
+        TRAFFIC_RECORD_FILE=None,
+        TENANTS_FILE=None,
+        **settings,
+    )
+    server = MCPServer(api_key="key", config=config)
+    register_tools(
+        server, "postmark", "sender@example.com", config=config, actions_package=actions_package
+    )
+    return server
+
+
+class TestReload:
+    """Test reloading settings and action modules in place."""
+
+    @pytest.mark.asyncio
+    async def test_reload_replaces_only_changed_action_modules(self, tmp_path, probe_package):
+        """Test added, edited and deleted action modules are re-registered alone."""
+        server = _server(tmp_path, importlib.import_module("probe_actions"))
+        tools = server.mcp._tool_manager._tools
+        stable = tools["stable_tool"]
+        probe_module = probe_package / "reload_probe.py"
+
+        probe_module.write_text('async def probe_action() -> str:\n    """Probe."""\n    return "v1"\n')
+        report = await server.reload(server.config)
+        assert report == {
+            "settings": [], "restart_required": [], "added": ["probe_tool"], "updated": [], "removed": []
+        }
+        assert tools["stable_tool"] is stable
+
+        probe_module.write_text(
+            'async def probe_action(name: str) -> str:\n    """Probe."""\n    return name\n'
+        )
+        report = await server.reload(server.config)
+        assert report["updated"] == ["probe_tool"]
+        assert "name" in tools["probe_tool"].parameters["properties"]
+        assert tools["stable_tool"] is stable
+
+        probe_module.unlink()
+        report = await server.reload(server.config)
+        assert report["removed"] == ["probe_tool"]
+        assert "probe_tool" not in tools
+
+    @pytest.mark.asyncio
+    async def test_reload_keeps_tools_of_module_failing_to_import(self, tmp_path, probe_package):
+        """Test a broken edit leaves the module's previous tools registered."""
+        server = _server(tmp_path, importlib.import_module("probe_actions"))
+        probe_module = probe_package / "reload_probe.py"
+        probe_module.write_text('async def probe_action() -> str:\n    """Probe."""\n    return "v1"\n')
+        await server.reload(server.config)
+
+        probe_module.write_text("async def probe_action(:\n")
+        with pytest.raises(SyntaxError):
+            await server.reload(server.config)
+        assert "probe_tool" in server.mcp._tool_manager._tools
+
+    @pytest.mark.asyncio
+    async def test_failed_module_import_leaves_settings_unchanged(self, tmp_path, probe_package):
+        """Test settings are only swapped once every changed module imported."""
+        server = _server(tmp_path, importlib.import_module("probe_actions"))
+        transport = DEPENDENCIES.get("mail_transport")
+        previous = server.config
+        (probe_package / "reload_probe.py").write_text("async def probe_action(:\n")
+
+        with pytest.raises(SyntaxError):
+            await server.reload(previous.model_copy(
+                update={"MCP_SERVER_AUTH_KEY": "rotated", "SMTP_HOST": "relay.example.com"}
+            ))
+
+        assert DEPENDENCIES.get("mail_transport") is transport
+        assert server.config is previous
+        assert server.api_key == "key"
+
+    @pytest.mark.asyncio
+    async def test_reload_swaps_dependencies_and_keeps_stores(self, tmp_path):
+        """Test changed settings rebuild clients while the outbox keeps running."""
+        server = _server(tmp_path)
+        transport = DEPENDENCIES.get("mail_transport")
+        outbox = DEPENDENCIES.get("outbox")
+        config = server.config.model_copy(
+            update={"SMTP_HOST": "relay.example.com", "RELOAD_RETIRE_DELAY": 0}
+        )
+
+        report = await server.reload(config)
+
+        assert report["settings"] == ["RELOAD_RETIRE_DELAY", "SMTP_HOST"]
+        replaced = DEPENDENCIES.get("mail_transport")
+        assert replaced is not transport
+        assert replaced.routes[0][0].host == "relay.example.com"
+        assert DEPENDENCIES.get("outbox") is outbox
+        assert server.config is config
+        # Lets the retired transport close
+        await asyncio.sleep(0.05)
+
+    @pytest.mark.asyncio
+    async def test_reload_applies_limits_and_defers_startup_only_settings(self, tmp_path):
+        """Test runtime limits change at once and startup-only settings keep their values."""
+        server = _server(tmp_path)
+        config = server.config.model_copy(update={
+            "MAX_SESSIONS": 5,
+            "JOB_MAX_JOBS": 7,
+            "HEALTH_MAX_LOOP_LAG": 2.0,
+            "SSE_REPLAY_BUFFER": 1,
+            "LOG_LEVEL": "WARNING",
+            "RELOAD_RETIRE_DELAY": 0,
+        })
+        log_level = server.config.LOG_LEVEL
+
+        report = await server.reload(config)
+
+        assert report["settings"] == [
+            "HEALTH_MAX_LOOP_LAG", "JOB_MAX_JOBS", "MAX_SESSIONS", "RELOAD_RETIRE_DELAY"
+        ]
+        assert report["restart_required"] == ["LOG_LEVEL", "SSE_REPLAY_BUFFER"]
+        assert server.config.LOG_LEVEL == log_level
+        assert server.config.MAX_SESSIONS == 5
+        assert server.jobs.max_jobs == 7
+        assert server.health.max_loop_lag == 2.0
+        assert server.health.readiness()[1]["active_sessions"]["limit"] == 5
+        await asyncio.sleep(0.05)
+
+    @pytest.mark.asyncio
+    async def test_invalid_settings_are_rejected_without_changes(self, tmp_path):
+        """Test a reload with an invalid configuration keeps the running one."""
+        server = _server(tmp_path)
+        transport = DEPENDENCIES.get("mail_transport")
+        previous = server.config
+
+        with pytest.raises(ValueError):
+            await server.reload(previous.model_copy(update={"MAIL_FAILOVER": "carrier_pigeon"}))
+
+        assert DEPENDENCIES.get("mail_transport") is transport
+        assert server.config is previous
+
+    def test_reload_endpoint_rotates_api_key(self, tmp_path):
+        """Test POST /admin/reload applies a new server key to later requests."""
+        server = _server(tmp_path)
+        rotated = server.config.model_copy(
+            update={"MCP_SERVER_AUTH_KEY": "rotated", "RELOAD_RETIRE_DELAY": 0}
+        )
+
+        with patch("src.mcp_tools.load_config", return_value=rotated):
+            with TestClient(server.create_app()) as client:
+                response = client.post("/admin/reload", headers={"X-API-Key": "key"})
+                assert response.status_code == 200
+                assert "MCP_SERVER_AUTH_KEY" in response.json()["settings"]
+
+                assert client.get("/metrics", headers={"X-API-Key": "key"}).status_code == 401
+                assert client.get("/metrics", headers={"X-API-Key": "rotated"}).status_code == 200
+
+    @pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+    @pytest.mark.asyncio
+    async def test_sighup_triggers_reload(self, tmp_path):
+        """Test SIGHUP starts a reload once the app has started."""
+        server = _server(tmp_path)
+        with patch.object(server, "reload", AsyncMock()) as reload:
+            await server._install_reload_signal()
+            try:
+                assert signal.getsignal(signal.SIGHUP) is not signal.SIG_DFL
+                os.kill(os.getpid(), signal.SIGHUP)
+                await asyncio.sleep(0.05)
+            finally:
+                await server._remove_reload_signal()
+
+        reload.assert_awaited_once()
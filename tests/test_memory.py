@@ -0,0 +1,71 @@
+"""
+Unit tests for memory.py and the /admin/memory endpoints.
+"""
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.mcp_tools import MCPServer
+from src.memory import AllocationTracer
+
+_retained = []
+
+
+def allocate_blocks():
+    _retained.extend(bytearray(1024) for _ in range(200))
+
+
+def test_diff_shows_growth_since_previous_snapshot():
+    """Test allocations made between snapshots top the diff."""
+    tracer = AllocationTracer()
+    tracer.start(frames=1)
+    try:
+        allocate_blocks()
+        diff = tracer.diff(limit=5)
+        assert any(
+            "test_memory.py" in site["site"][0] and site["size_diff_bytes"] >= 200 * 1024
+            for site in diff["top"]
+        )
+
+        # Nothing new was allocated there since the last snapshot
+        again = tracer.diff(limit=50)
+        assert not any(
+            "test_memory.py" in site["site"][0] and site["size_diff_bytes"] >= 200 * 1024
+            for site in again["top"]
+        )
+    finally:
+        tracer.stop()
+        _retained.clear()
+    assert not tracer.tracing
+
+
+def test_diff_requires_tracing_and_valid_arguments():
+    """Test misuse is reported instead of silently starting tracing."""
+    tracer = AllocationTracer(max_frames=5)
+    with pytest.raises(RuntimeError):
+        tracer.diff()
+    with pytest.raises(ValueError):
+        tracer.start(frames=10)
+    assert not tracer.tracing
+
+
+def test_memory_endpoints():
+    """Test the admin endpoints report sessions and control tracemalloc."""
+    client = TestClient(MCPServer(api_key="test-key").create_app())
+    headers = {"X-API-Key": "test-key"}
+
+    assert client.get("/admin/memory").status_code == 401
+
+    report = client.get("/admin/memory", headers=headers).json()
+    assert report["sessions"]["count"] == 0
+    assert report["tracemalloc"] == {"tracing": False}
+
+    try:
+        assert client.post("/admin/memory/start?frames=2", headers=headers).status_code == 200
+        report = client.get("/admin/memory?limit=3&group_by=filename", headers=headers).json()
+        assert report["tracemalloc"]["tracing"] is True
+        assert len(report["tracemalloc"]["top"]) <= 3
+    finally:
+        assert client.post("/admin/memory/stop", headers=headers).json() == {"tracing": False}
+
+    assert client.get("/admin/memory?group_by=nope", headers=headers).status_code == 400
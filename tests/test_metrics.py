@@ -0,0 +1,59 @@
+"""
+Unit tests for metrics.py and the /metrics endpoint.
+"""
+
+from starlette.testclient import TestClient
+
+from src.config import Settings
+from src.mcp_tools import MCPServer, populate_dependencies
+from src.metrics import Metric, MetricsRegistry, circuit_breaker_metrics
+from src.utils.circuit_breaker import BreakerState, CircuitBreaker
+
+
+def test_render_prometheus_text():
+    """Test collectors are rendered in the Prometheus text format."""
+    registry = MetricsRegistry()
+    registry.register("test", lambda: [
+        Metric("requests_total", "counter", "Requests").add(3, path='/a"b')
+    ])
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b"} 3\n'
+    )
+
+
+def test_failing_collector_is_skipped():
+    """Test one broken collector does not break the scrape."""
+    registry = MetricsRegistry()
+    registry.register("broken", lambda: 1 / 0)
+    registry.register("ok", lambda: [Metric("up", "gauge", "Up").add(1)])
+
+    assert registry.render().endswith("up 1\n")
+
+
+def test_circuit_breaker_metrics():
+    """Test breaker state is exported as one sample per state."""
+    breaker = CircuitBreaker("smtp")
+    breaker._transition(BreakerState.OPEN)
+
+    state, calls = circuit_breaker_metrics([breaker])
+
+    assert ({"breaker": "smtp", "state": "open"}, 1) in state.samples
+    assert ({"breaker": "smtp", "state": "closed"}, 0) in state.samples
+    assert ({"breaker": "smtp", "outcome": "rejected"}, 0) in calls.samples
+
+
+def test_metrics_endpoint_requires_api_key():
+    """Test /metrics serves server and mail breaker metrics behind the API key."""
+    server = MCPServer(api_key="test-key")
+    populate_dependencies("key", "sender@example.com", Settings(MAIL_FAILOVER="postmark_http"))
+    client = TestClient(server.create_app())
+
+    assert client.get("/metrics").status_code == 401
+
+    response = client.get("/metrics", headers={"X-API-Key": "test-key"})
+    assert response.status_code == 200
+    assert "mcp_active_sessions 0" in response.text
+    assert 'mcp_circuit_breaker_state{breaker="postmark_http_fallback",state="closed"} 1' in response.text
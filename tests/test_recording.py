@@ -0,0 +1,103 @@
+"""
+Unit tests for recording.py.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import mcp.types as types
+import pytest
+
+from src.recording import Redactor, TrafficRecorder, read_recording
+
+
+def message(payload):
+    return types.JSONRPCMessage.model_validate(payload)
+
+
+def test_redactor_keeps_shape_but_not_content():
+    """Test strings are masked to their length and addresses pseudonymised."""
+    redactor = Redactor(salt=b"salt")
+
+    shaped = redactor.shape({
+        "recipients": ["Alice@example.com", "alice@example.com", "bob@example.com"],
+        "subject": "Invoice",
+        "send_at": "2026-01-02T03:04:05+00:00",
+        "count": 3,
+    })
+
+    first, second, third = shaped["recipients"]
+    assert first == second != third
+    assert first.endswith("@example.invalid") and "alice" not in first
+    assert shaped["subject"] == "xxxxxxx"
+    assert shaped["send_at"] == "2026-01-02T03:04:05+00:00"
+    assert shaped["count"] == 3
+
+
+def test_recorder_round_trip_gzip(tmp_path):
+    """Test recorded requests and responses read back anonymised."""
+    path = tmp_path / "traffic.jsonl.gz"
+    recorder = TrafficRecorder(path)
+    recorder.inbound("session-a", message({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": "send_email_tool", "arguments": {"body": "secret"}},
+    }))
+    recorder.outbound("session-a", message({
+        "jsonrpc": "2.0", "id": 1, "result": {"content": [], "isError": True}
+    }))
+    recorder.inbound("session-b", message({"jsonrpc": "2.0", "method": "notifications/initialized"}))
+    recorder.flush()
+
+    request, response, note = read_recording(path)
+
+    assert request["tool"] == "send_email_tool"
+    assert request["a"] == {"body": "xxxxxx"}
+    assert (request["s"], response["s"], note["s"]) == (1, 1, 2)
+    assert response == {**response, "k": "res", "id": 1, "ok": False}
+    assert note["m"] == "notifications/initialized"
+    assert b"secret" not in path.read_bytes()
+
+
+def test_appended_runs_are_laid_end_to_end(tmp_path):
+    """Test a file written by two server runs keeps sessions apart."""
+    path = tmp_path / "traffic.jsonl"
+    for _ in range(2):
+        recorder = TrafficRecorder(path)
+        recorder.inbound("same-id", message({"jsonrpc": "2.0", "id": 1, "method": "ping"}))
+        recorder.flush()
+
+    first, second = read_recording(path)
+
+    assert (first["s"], second["s"]) == (1, 2)
+    assert second["t"] >= first["t"]
+
+
+@pytest.mark.asyncio
+async def test_full_buffers_are_written_off_the_loop(tmp_path):
+    """Test full buffers are appended by a worker thread, in order, by close()."""
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(path, buffer_size=2)
+
+    with patch("src.recording.asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+        for request_id in range(5):
+            recorder.inbound("session-a", message({"jsonrpc": "2.0", "id": request_id, "method": "ping"}))
+        await recorder.close()
+
+    assert to_thread.call_count >= 2
+    assert [record["id"] for record in read_recording(path)] == [0, 1, 2, 3, 4]
+
+
+def test_ended_sessions_are_forgotten(tmp_path):
+    """Test closed sessions are dropped while later sessions keep new numbers."""
+    recorder = TrafficRecorder(tmp_path / "traffic.jsonl")
+    recorder.inbound("session-a", message({"jsonrpc": "2.0", "id": 1, "method": "ping"}))
+    recorder.end("session-a")
+    recorder.inbound("session-b", message({"jsonrpc": "2.0", "id": 1, "method": "ping"}))
+    recorder.flush()
+
+    first, second = read_recording(tmp_path / "traffic.jsonl")
+
+    assert (first["s"], second["s"]) == (1, 2)
+    assert "session-a" not in recorder._sessions
@@ -0,0 +1,47 @@
+"""
+Tests for replay.py.
+"""
+
+import asyncio
+
+from src.replay import local_server, percentile, recorded_latencies, replay
+
+
+def test_percentile_nearest_rank():
+    """Test percentiles pick an observed value by nearest rank."""
+    values = [0.1 * i for i in range(1, 11)]
+    assert percentile(values, 50) == values[4]
+    assert percentile(values, 90) == values[8]
+    assert percentile(values, 100) == values[9]
+
+
+def test_recorded_latencies_pair_requests_and_responses():
+    """Test latencies are matched by session and request id."""
+    records = [
+        {"t": 0.0, "s": 1, "k": "req", "id": 1, "m": "tools/call", "tool": "a_tool"},
+        {"t": 0.1, "s": 2, "k": "req", "id": 1, "m": "ping"},
+        {"t": 0.3, "s": 1, "k": "res", "id": 1, "ok": True},
+        {"t": 0.2, "s": 2, "k": "res", "id": 1, "ok": True},
+    ]
+
+    latencies = recorded_latencies(records)
+
+    assert latencies["a_tool"] == [0.3]
+    assert [round(v, 6) for v in latencies["ping"]] == [0.1]
+
+
+def test_replay_against_local_server():
+    """Test a recorded session replays against a stubbed local server."""
+    records = [
+        {"t": 0.0, "s": 1, "k": "req", "id": 1, "m": "initialize"},
+        {"t": 0.01, "s": 1, "k": "note", "m": "notifications/initialized"},
+        {"t": 0.02, "s": 1, "k": "req", "id": 2, "m": "tools/list"},
+        {"t": 0.03, "s": 1, "k": "req", "id": 3, "m": "tools/call", "tool": "missing_tool", "a": {}},
+    ]
+
+    with local_server() as (url, api_key):
+        report = asyncio.run(replay(records, url, api_key, speed=10, timeout=5))
+
+    assert report["tools/list"]["count"] == 1
+    assert report["tools/list"]["errors"] == 0
+    assert report["missing_tool"]["errors"] == 1
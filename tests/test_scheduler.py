@@ -0,0 +1,114 @@
+"""
+Unit tests for utils/scheduler.py.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.lifespan import Lifespan
+from src.utils.scheduler import OutboundScheduler, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_shapes_bursts():
+    """Test sends beyond the burst are spread out at the configured rate."""
+    bucket = TokenBucket(rate=100, burst=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # Two tokens are free, the other four arrive every 10ms
+    assert 0.03 <= elapsed < 0.2
+
+
+def _scheduler(tmp_path, send, lifespan, **kwargs) -> OutboundScheduler:
+    return OutboundScheduler(
+        tmp_path / "outbox.sqlite3", send, lifespan, rate=1000, burst=10, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_deferred_messages_are_sent_in_due_order(tmp_path):
+    """Test one dispatcher delivers scheduled messages when due, earliest first."""
+    sent = []
+
+    async def send(item):
+        sent.append((item["n"], time.time()))
+
+    lifespan = Lifespan()
+    await lifespan.startup()
+    scheduler = _scheduler(tmp_path, send, lifespan)
+    await scheduler.start()
+
+    now = time.time()
+    await scheduler.schedule({"n": 2}, now + 0.1)
+    await scheduler.schedule({"n": 1}, now + 0.05)
+    assert len(scheduler) == 2
+
+    await asyncio.sleep(0.2)
+    await lifespan.shutdown()
+    await scheduler.close()
+
+    assert [n for n, _ in sent] == [1, 2]
+    assert sent[0][1] >= now + 0.05
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_messages_survive_restart(tmp_path):
+    """Test messages stored before a restart are reloaded and delivered."""
+    first = _scheduler(tmp_path, None, Lifespan())
+    await first.schedule({"n": 1}, time.time() + 0.05)
+    await first.close()
+
+    sent = []
+
+    async def send(item):
+        sent.append(item)
+
+    lifespan = Lifespan()
+    await lifespan.startup()
+    second = _scheduler(tmp_path, send, lifespan)
+    await second.start()
+    assert len(second) == 1
+
+    await asyncio.sleep(0.15)
+    await lifespan.shutdown()
+    await second.close()
+
+    assert sent == [{"n": 1}]
+
+
+@pytest.mark.asyncio
+async def test_failed_deliveries_are_retried_then_dropped(tmp_path):
+    """Test failed deferred sends are retried with backoff up to max_attempts."""
+    attempts = []
+
+    async def send(item):
+        attempts.append(time.time())
+        raise ConnectionRefusedError("relay down")
+
+    lifespan = Lifespan()
+    await lifespan.startup()
+    scheduler = _scheduler(tmp_path, send, lifespan, max_attempts=3, retry_delay=0.02)
+    await scheduler.start()
+    await scheduler.schedule({"n": 1}, time.time())
+
+    await asyncio.sleep(0.2)
+    await lifespan.shutdown()
+    await scheduler.close()
+
+    assert len(attempts) == 3
+    assert attempts[2] - attempts[1] >= attempts[1] - attempts[0]
+    assert len(scheduler) == 0
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 5), (-1, 5), (10, 0)])
+def test_token_bucket_rejects_non_positive_rate_or_burst(rate, burst):
+    """Test a zero or negative rate, or an empty burst, is refused up front."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, burst=burst)
@@ -2,11 +2,12 @@
 Unit tests for actions/send_email.py
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from src.actions.send_email import send_email_action
+from src.utils.attachments import AttachmentLoader, AttachmentRef, MemoryBudget
 
 
 @pytest.mark.asyncio
@@ -40,6 +41,9 @@ async def test_send_email_action_delegates_correctly():
             body=body,
             api_key=api_key,
             from_email=from_email,
+            transport=None,
+            suppression=None,
+            attachments=[],
         )
 
         assert result == expected_result
@@ -96,4 +100,134 @@ async def test_send_email_action_extracts_kwargs():
             body=body,
             api_key="extracted_api_key",
             from_email="extracted@sender.com",
+            transport=None,
+            suppression=None,
+            attachments=[],
         )
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_forwards_mail_transport():
+    """Test that an injected mail transport is passed through to send_email."""
+    transport = object()
+
+    with patch(
+        "src.actions.send_email.email.send_email", new_callable=AsyncMock
+    ) as mock_send_email:
+        mock_send_email.return_value = "Success"
+
+        await send_email_action(
+            recipients=["test@example.com"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            mail_transport=transport,
+        )
+
+        assert mock_send_email.call_args.kwargs["transport"] is transport
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_schedules_deferred_delivery():
+    """Test send_at stores the email in the outbox instead of sending it."""
+    outbox = AsyncMock()
+    outbox.schedule.return_value = "abc123"
+
+    with patch(
+        "src.actions.send_email.email.send_email", new_callable=AsyncMock
+    ) as mock_send_email:
+        result = await send_email_action(
+            recipients=["test@example.com"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            outbox=outbox,
+            send_at="2030-01-01T09:00:00",
+        )
+
+    mock_send_email.assert_not_called()
+    item, due = outbox.schedule.call_args.args
+    assert item == {"recipients": ["test@example.com"], "subject": "Test Subject", "body": "Test Body"}
+    assert due == 1893488400.0
+    assert "abc123" in result
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_throttles_immediate_sends():
+    """Test immediate sends wait for the outbox send budget."""
+    outbox = AsyncMock()
+
+    with patch(
+        "src.actions.send_email.email.send_email", new_callable=AsyncMock
+    ):
+        await send_email_action(
+            recipients=["test@example.com"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            outbox=outbox,
+        )
+
+    outbox.throttle.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_rejects_invalid_scheduled_recipients():
+    """Test a scheduled email with no valid recipients is refused, not stored."""
+    outbox = AsyncMock()
+
+    with pytest.raises(ValueError, match="No valid email addresses"):
+        await send_email_action(
+            recipients=["not-an-address"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            outbox=outbox,
+            send_at="2030-01-01T09:00:00",
+        )
+
+    outbox.schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_rejects_missing_scheduled_attachment(tmp_path):
+    """Test attachment references are checked before the email is stored."""
+    outbox = AsyncMock()
+    loader = AttachmentLoader(MagicMock(), MemoryBudget(1024), root=tmp_path)
+
+    with pytest.raises(ValueError, match="not found"):
+        await send_email_action(
+            recipients=["test@example.com"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            outbox=outbox,
+            send_at="2030-01-01T09:00:00",
+            attachments=[AttachmentRef(path="missing.pdf")],
+            attachment_loader=loader,
+        )
+
+    outbox.schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_email_action_validates_before_throttling():
+    """Test a call that will be rejected does not use up send budget."""
+    outbox = AsyncMock()
+
+    with pytest.raises(ValueError, match="No valid email addresses"):
+        await send_email_action(
+            recipients=["not-an-address"],
+            subject="Test Subject",
+            body="Test Body",
+            postmark_api_key="test_key",
+            sender_email="sender@example.com",
+            outbox=outbox,
+        )
+
+    outbox.throttle.assert_not_called()
@@ -0,0 +1,101 @@
+"""
+Unit tests for utils/smtp_pool.py
+"""
+
+import smtplib
+from email.message import EmailMessage
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.smtp_pool import SMTPConnectionPool
+
+
+def _pool(**kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool("smtp.example.com", 587, "user", "secret", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_authenticated_connection():
+    """Test consecutive sends share one connection."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        server = mock_smtp.return_value
+        pool = _pool()
+
+        await pool.send_message(EmailMessage())
+        await pool.send_message(EmailMessage())
+
+        mock_smtp.assert_called_once_with("smtp.example.com", 587, timeout=30.0)
+        server.starttls.assert_called_once()
+        server.login.assert_called_once_with("user", "secret")
+        assert server.send_message.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_when_server_dropped_connection():
+    """Test a stale pooled connection is replaced and the send retried."""
+    stale, fresh = MagicMock(), MagicMock()
+    stale.send_message.side_effect = [None, smtplib.SMTPServerDisconnected()]
+
+    with patch("src.utils.smtp_pool.smtplib.SMTP", side_effect=[stale, fresh]):
+        pool = _pool()
+        await pool.send_message(EmailMessage())
+        await pool.send_message(EmailMessage())
+
+    stale.close.assert_called_once()
+    fresh.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_connection_on_error():
+    """Test failed sends close the connection and propagate the error."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        server = mock_smtp.return_value
+        server.send_message.side_effect = smtplib.SMTPRecipientsRefused({})
+        pool = _pool()
+
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            await pool.send_message(EmailMessage())
+
+        server.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_and_close():
+    """Test warm-up opens connections up front and close quits them."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        pool = _pool(max_size=2)
+
+        await pool.warm_up(5)
+        assert mock_smtp.call_count == 2
+
+        await pool.close()
+        assert mock_smtp.return_value.quit.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_probe_checks_relay_and_keeps_connection():
+    """Test probing issues a NOOP and leaves the connection pooled for sends."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        server = mock_smtp.return_value
+        server.noop.return_value = (250, b"OK")
+        pool = _pool()
+
+        await pool.probe()
+        await pool.send_message(EmailMessage())
+
+        server.noop.assert_called_once()
+        mock_smtp.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_probe_fails_on_bad_noop_reply():
+    """Test an unexpected NOOP reply fails the probe and drops the connection."""
+    with patch("src.utils.smtp_pool.smtplib.SMTP") as mock_smtp:
+        server = mock_smtp.return_value
+        server.noop.return_value = (421, b"Service not available")
+
+        with pytest.raises(smtplib.SMTPResponseException):
+            await _pool().probe()
+
+        server.close.assert_called_once()
@@ -0,0 +1,233 @@
+"""
+Unit tests for sse.py.
+"""
+
+import asyncio
+import json
+
+import httpx
+import mcp.types as types
+import pytest
+
+from src.context import current_tenant
+from src.sse import ResumableSseTransport, parse_event_id
+from src.tenants import Tenant
+
+
+async def echo(session_id, read_stream, write_stream):
+    """Session that sends every received message straight back."""
+    async for message in read_stream:
+        await write_stream.send(message)
+
+
+def request(request_id):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "ping"}
+
+
+async def post(transport, session_id, payload):
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=transport.handle_post_message),
+        base_url="http://test",
+    )
+    async with client:
+        return await client.post(f"/?session_id={session_id}", json=payload)
+
+
+async def next_event(stream):
+    return await asyncio.wait_for(stream.__anext__(), 1)
+
+
+def test_parse_event_id():
+    """Test Last-Event-ID values split into session and sequence."""
+    assert parse_event_id("abc:12") == ("abc", 12)
+    assert parse_event_id("abc") is None
+    assert parse_event_id("abc:x") is None
+    assert parse_event_id(None) is None
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_missed_messages():
+    """Test a resumed session receives messages sent while it was away."""
+    transport = ResumableSseTransport("/messages/", echo, grace=5)
+    stream = transport.connect().body_iterator
+    endpoint = await next_event(stream)
+    session_id = endpoint["data"].split("session_id=")[1]
+    assert endpoint["id"] == f"{session_id}:0"
+
+    await post(transport, session_id, request(1))
+    first = await next_event(stream)
+    assert first["id"] == f"{session_id}:1"
+    await stream.aclose()
+
+    # Sent while disconnected; the session keeps running
+    await post(transport, session_id, request(2))
+    await asyncio.sleep(0.05)
+
+    resumed = transport.resume(first["id"]).body_iterator
+    assert "id" not in await next_event(resumed)
+    replayed = await next_event(resumed)
+    assert replayed["id"] == f"{session_id}:2"
+    assert json.loads(replayed["data"])["id"] == 2
+    await resumed.aclose()
+    await transport.close_all()
+
+
+@pytest.mark.asyncio
+async def test_repeated_request_id_is_not_run_again():
+    """Test a retried POST is acknowledged without being forwarded twice."""
+    received = []
+
+    async def record(session_id, read_stream, write_stream):
+        async for message in read_stream:
+            received.append(message)
+
+    transport = ResumableSseTransport("/messages/", record)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+
+    assert (await post(transport, session_id, request(7))).status_code == 202
+    assert (await post(transport, session_id, request(7))).status_code == 202
+    await asyncio.sleep(0.05)
+
+    assert [m.root.id for m in received if isinstance(m.root, types.JSONRPCRequest)] == [7]
+    await stream.aclose()
+    await transport.close_all()
+
+
+@pytest.mark.asyncio
+async def test_resume_refused_when_messages_were_evicted():
+    """Test a reconnect that missed evicted messages starts over."""
+    transport = ResumableSseTransport("/messages/", echo, buffer_size=2, grace=5)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+    await stream.aclose()
+
+    for request_id in range(3):
+        await post(transport, session_id, request(request_id))
+    await asyncio.sleep(0.05)
+
+    assert transport.resume(f"{session_id}:0") is None
+    await asyncio.sleep(0.05)
+    assert len(transport) == 0
+
+
+@pytest.mark.asyncio
+async def test_resume_refused_for_another_tenant():
+    """Test a tenant cannot attach to another tenant's session."""
+    transport = ResumableSseTransport("/messages/", echo, grace=5)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+    await stream.aclose()
+
+    token = current_tenant.set(Tenant("acme"))
+    try:
+        assert transport.resume(f"{session_id}:0") is None
+        assert (await post(transport, session_id, request(1))).status_code == 404
+    finally:
+        current_tenant.reset(token)
+    assert transport.resume(f"{session_id}:0") is not None
+    await transport.close_all()
+
+
+@pytest.mark.asyncio
+async def test_session_expires_after_grace_period():
+    """Test a disconnected session is closed once the grace period passes."""
+    ended = asyncio.Event()
+
+    async def run(session_id, read_stream, write_stream):
+        try:
+            await echo(session_id, read_stream, write_stream)
+        finally:
+            ended.set()
+
+    transport = ResumableSseTransport("/messages/", run, grace=0.05)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+    await stream.aclose()
+
+    await asyncio.wait_for(ended.wait(), 1)
+    await asyncio.sleep(0)
+    assert transport.resume(f"{session_id}:0") is None
+
+
+@pytest.mark.asyncio
+async def test_session_stats_track_buffer_and_outstanding_requests():
+    """Test accounting of buffered bytes and unanswered requests."""
+    received = asyncio.Event()
+
+    async def hold(session_id, read_stream, write_stream):
+        async for message in read_stream:
+            received.set()
+
+    transport = ResumableSseTransport("/messages/", hold)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+
+    await post(transport, session_id, {
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "slow_tool"}
+    })
+    await asyncio.wait_for(received.wait(), 1)
+
+    (stats,) = transport.stats()
+    assert stats["connected"] is True
+    assert stats["outstanding_requests"] == 1
+    assert stats["oldest_request"]["name"] == "slow_tool"
+    assert stats["buffered_bytes"] == 0
+
+    session = transport._sessions[session_id]
+    session.answered(types.JSONRPCMessage.model_validate(
+        {"jsonrpc": "2.0", "id": 1, "result": {}}
+    ))
+    session.append({"event": "message", "data": "x" * 10})
+    await stream.aclose()
+
+    (stats,) = transport.stats()
+    assert stats["outstanding_requests"] == 0
+    assert stats["buffered_bytes"] == 10
+    assert stats["connected"] is False
+    await transport.close_all()
+
+
+@pytest.mark.asyncio
+async def test_batch_is_dispatched_and_answered_per_message():
+    """Test a JSON-RPC batch array is split into individually streamed messages."""
+    transport = ResumableSseTransport("/messages/", echo, max_batch=3)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+
+    response = await post(transport, session_id, [request(1), request(2), request(1)])
+    assert response.status_code == 202
+    replies = [json.loads((await next_event(stream))["data"])["id"] for _ in range(2)]
+    assert replies == [1, 2]
+
+    assert (await post(transport, session_id, [])).status_code == 400
+    too_many = [request(n) for n in range(10, 14)]
+    assert (await post(transport, session_id, too_many)).status_code == 400
+    await stream.aclose()
+    await transport.close_all()
+
+
+@pytest.mark.asyncio
+async def test_notify_reaches_initialized_sessions():
+    """Test server notifications go to sessions that completed the handshake."""
+    transport = ResumableSseTransport("/messages/", echo, grace=5)
+    stream = transport.connect().body_iterator
+    session_id = (await next_event(stream))["data"].split("session_id=")[1]
+    pending = transport.connect().body_iterator
+    await next_event(pending)
+
+    await post(transport, session_id, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+    # Echoed back by the test session
+    await next_event(stream)
+
+    notification = types.JSONRPCMessage(types.JSONRPCNotification(
+        jsonrpc="2.0", method="notifications/tools/list_changed"
+    ))
+    assert transport.notify(notification) == 1
+    event = await next_event(stream)
+    assert json.loads(event["data"])["method"] == "notifications/tools/list_changed"
+    assert event["id"] == f"{session_id}:2"
+
+    await stream.aclose()
+    await pending.aclose()
+    await transport.close_all()
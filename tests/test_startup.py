@@ -0,0 +1,152 @@
+"""
+Unit tests for startup.py and the server startup budget.
+"""
+
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.startup import StartupProfiler
+
+PROJECT_ROOT = Path(__file__).parents[1]
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5.0"))
+
+
+def test_profiler_records_phases_and_imports():
+    """Test each phase records its duration and the modules it imported."""
+    profiler = StartupProfiler(enabled=True)
+    sys.modules.pop("colorsys", None)
+
+    with profiler.phase("imports"):
+        import colorsys  # noqa: F401
+
+    with profiler.phase("idle"):
+        pass
+
+    report = profiler.report()
+    imports, idle = report["phases"]
+
+    assert imports["name"] == "imports"
+    assert "colorsys" in imports["top_level_imports"]
+    assert imports["modules_imported"] >= 1
+    assert idle["modules_imported"] == 0
+    assert report["total_seconds"] >= imports["seconds"] + idle["seconds"]
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    """Test a disabled profiler is a no-op."""
+    profiler = StartupProfiler(enabled=False)
+
+    with profiler.phase("config_load"):
+        pass
+    profiler.log_report(logging.getLogger("test"), tmp_path / "profile.json")
+
+    assert profiler.phases == []
+    assert not (tmp_path / "profile.json").exists()
+
+
+def test_log_report_writes_json(tmp_path):
+    """Test the report is written as JSON when an output path is given."""
+    profiler = StartupProfiler(enabled=True)
+    with profiler.phase("config_load"):
+        pass
+
+    output = tmp_path / "profile.json"
+    profiler.log_report(logging.getLogger("test"), output)
+
+    assert json.loads(output.read_text())["phases"][0]["name"] == "config_load"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_optional_subsystems_are_not_imported_at_startup():
+    """Test recording, replay, watchdog and memory tracing load only when used."""
+    code = (
+        "import sys\n"
+        "from src.mcp_tools import MCPServer\n"
+        "from src.config import Settings\n"
+        "MCPServer(api_key='key', config=Settings(WATCHDOG_ENABLED=False))\n"
+        "print(','.join(m for m in ('src.recording', 'src.replay', 'src.watchdog', 'src.memory')"
+        " if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_startup_to_first_health_check_within_budget(tmp_path):
+    """Test the server answers its first health check within the startup budget."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        MCP_SERVER_AUTH_KEY="startup_test_key",
+        POSTMARK_API_KEY="startup_test_postmark",
+        SENDER_EMAIL="startup@example.com",
+        FILE_LOGGING="false",
+        LOG_LEVEL="WARNING",
+        # No network in tests: readiness must not wait on the SMTP relay
+        HEALTH_SMTP_PROBE="false",
+        OUTBOX_PATH=str(tmp_path / "outbox.sqlite3"),
+    )
+    profile_path = tmp_path / "startup.json"
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "mcp_server.py",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--profile-startup",
+            "--profile-startup-output", str(profile_path),
+        ],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        elapsed = None
+        while time.perf_counter() - started < STARTUP_BUDGET_SECONDS * 2:
+            if process.poll() is not None:
+                pytest.fail(f"Server exited during startup with code {process.returncode}")
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=0.5)
+                if response.status_code == 200:
+                    elapsed = time.perf_counter() - started
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    assert elapsed is not None, "Server never became healthy"
+    assert elapsed < STARTUP_BUDGET_SECONDS, (
+        f"Startup took {elapsed:.2f}s, budget is {STARTUP_BUDGET_SECONDS:.2f}s"
+    )
+
+    phases = [phase["name"] for phase in json.loads(profile_path.read_text())["phases"]]
+    assert phases == [
+        "config_load",
+        "logging_setup",
+        "server_init",
+        "tool_discovery",
+        "app_creation",
+        "server_import",
+    ]
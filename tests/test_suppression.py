@@ -0,0 +1,175 @@
+"""
+Unit tests for utils/suppression.py and the Postmark webhook route.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.config import Settings
+from src.lifespan import Lifespan
+from src.mcp_tools import DEPENDENCIES, MCPServer, populate_dependencies
+from src.utils.suppression import SuppressionIndex, address_hash
+
+
+def test_addresses_are_normalized_before_hashing():
+    """Test lookups ignore case and surrounding whitespace."""
+    assert address_hash(" User@Example.COM ") == address_hash("user@example.com")
+    assert address_hash("user@example.com") < 2**64
+
+
+def test_filter_splits_allowed_and_suppressed(tmp_path):
+    """Test filter keeps the order of allowed recipients."""
+    index = SuppressionIndex(tmp_path / "suppression.bin")
+    index.add("b@example.com")
+
+    assert "B@example.com" in index
+    assert index.filter(["a@example.com", "b@example.com", "c@example.com"]) == (
+        ["a@example.com", "c@example.com"],
+        ["b@example.com"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip(tmp_path):
+    """Test the index is persisted as 8 bytes per address and reloaded."""
+    path = tmp_path / "suppression.bin"
+    index = SuppressionIndex(path)
+    for n in range(100):
+        index.add(f"user{n}@example.com")
+    await index.flush()
+
+    assert path.stat().st_size == 800
+
+    reloaded = SuppressionIndex(path)
+    reloaded.load()
+    assert len(reloaded) == 100
+    assert "user42@example.com" in reloaded
+
+
+@pytest.mark.asyncio
+async def test_changes_are_flushed_in_background(tmp_path):
+    """Test changes are written after the flush interval without an explicit save."""
+    lifespan = Lifespan()
+    await lifespan.startup()
+    index = SuppressionIndex(tmp_path / "suppression.bin", lifespan, flush_interval=0.01)
+
+    index.add("a@example.com")
+    index.add("b@example.com")
+    await lifespan.shutdown()
+
+    reloaded = SuppressionIndex(tmp_path / "suppression.bin")
+    reloaded.load()
+    assert len(reloaded) == 2
+
+
+def test_apply_event_handles_postmark_record_types(tmp_path):
+    """Test hard bounces, complaints and subscription changes update the index."""
+    index = SuppressionIndex(tmp_path / "suppression.bin")
+
+    assert index.apply_event({"RecordType": "Bounce", "Type": "HardBounce", "Email": "a@example.com"})
+    assert not index.apply_event({"RecordType": "Bounce", "Type": "SoftBounce", "Email": "b@example.com"})
+    assert index.apply_event({"RecordType": "SpamComplaint", "Email": "c@example.com"})
+    assert index.apply_event(
+        {"RecordType": "SubscriptionChange", "Recipient": "a@example.com", "SuppressSending": False}
+    )
+    assert not index.apply_event({"RecordType": "Delivery", "Recipient": "d@example.com"})
+
+    assert index.filter(["a@example.com", "b@example.com", "c@example.com"])[1] == ["c@example.com"]
+
+
+def test_apply_event_skips_events_without_an_address(tmp_path):
+    """Test events with a missing, null or non-string address are ignored."""
+    index = SuppressionIndex(tmp_path / "suppression.bin")
+
+    assert not index.apply_event({"RecordType": "Bounce", "Type": "HardBounce"})
+    assert not index.apply_event({"RecordType": "SpamComplaint", "Email": None})
+    assert not index.apply_event({"RecordType": "SubscriptionChange", "Recipient": ["a@example.com"]})
+    assert len(index) == 0
+
+
+@pytest.fixture
+def webhook_client(tmp_path):
+    config = Settings(POSTMARK_WEBHOOK_SECRET="s3cret", SUPPRESSION_PATH=str(tmp_path / "s.bin"))
+    server = MCPServer(api_key="test-key", config=config)
+    populate_dependencies("key", "sender@example.com", config, server.lifespan)
+    return TestClient(server.create_app())
+
+
+def test_webhook_accepts_signed_events(webhook_client):
+    """Test an HMAC-signed webhook suppresses the bounced address without the API key."""
+    body = json.dumps({"RecordType": "Bounce", "Type": "HardBounce", "Email": "gone@example.com"})
+    signature = hmac.new(b"s3cret", body.encode(), hashlib.sha256).hexdigest()
+
+    response = webhook_client.post(
+        "/webhooks/postmark", content=body, headers={"X-Webhook-Signature": f"sha256={signature}"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"applied": 1, "suppressed": 1}
+    assert "gone@example.com" in DEPENDENCIES.get("suppression_list")
+
+
+def test_webhook_accepts_basic_auth_secret(webhook_client):
+    """Test the secret can be supplied as the basic-auth password Postmark sends."""
+    credentials = base64.b64encode(b"postmark:s3cret").decode()
+    response = webhook_client.post(
+        "/webhooks/postmark",
+        json=[{"RecordType": "SpamComplaint", "Email": "angry@example.com"}],
+        headers={"Authorization": f"Basic {credentials}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["applied"] == 1
+
+
+def test_webhook_rejects_bad_signatures(webhook_client):
+    """Test unsigned or wrongly signed webhooks are rejected."""
+    body = {"RecordType": "SpamComplaint", "Email": "x@example.com"}
+
+    assert webhook_client.post("/webhooks/postmark", json=body).status_code == 401
+    assert webhook_client.post(
+        "/webhooks/postmark", json=body, headers={"X-Webhook-Signature": "sha256=00"}
+    ).status_code == 401
+
+
+def test_webhook_route_disabled_without_secret():
+    """Test the webhook is not exposed when no secret is configured."""
+    client = TestClient(MCPServer(api_key="test-key").create_app())
+
+    response = client.post("/webhooks/postmark", json={}, headers={"X-API-Key": "test-key"})
+    assert response.status_code == 404
+
+
+def test_webhook_skips_malformed_events(webhook_client):
+    """Test malformed events in a batch are skipped instead of failing the request."""
+    credentials = base64.b64encode(b"postmark:s3cret").decode()
+    response = webhook_client.post(
+        "/webhooks/postmark",
+        json=[
+            {"RecordType": "SpamComplaint"},
+            {"RecordType": "Bounce", "Type": "HardBounce", "Email": None},
+            {"RecordType": "SpamComplaint", "Email": "angry@example.com"},
+        ],
+        headers={"Authorization": f"Basic {credentials}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["applied"] == 1
+
+
+def test_webhook_rejects_non_ascii_credentials(webhook_client):
+    """Test non-ASCII passwords and signatures are rejected rather than raising."""
+    credentials = base64.b64encode("postmark:sécret".encode()).decode()
+    body = {"RecordType": "SpamComplaint", "Email": "x@example.com"}
+
+    assert webhook_client.post(
+        "/webhooks/postmark", json=body, headers={"Authorization": f"Basic {credentials}"}
+    ).status_code == 401
+    assert webhook_client.post(
+        "/webhooks/postmark", json=body, headers={"X-Webhook-Signature": "sha256=é".encode("latin-1")}
+    ).status_code == 401
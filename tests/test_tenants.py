@@ -0,0 +1,161 @@
+"""
+Unit tests for tenants.py and tenant-aware authentication.
+"""
+
+import json
+
+import mcp.types as types
+import pytest
+from starlette.testclient import TestClient
+
+from src.config import Settings
+from src.context import current_tenant
+from src.mcp_tools import DEPENDENCIES, MCPServer, populate_dependencies
+from src.metrics import METRICS
+from src.tenants import TENANTS, Tenant, TenantRegistry, hash_key
+
+
+def write_tenants(path, *tenants):
+    path.write_text(json.dumps({"tenants": list(tenants)}))
+
+
+ACME = {
+    "id": "acme",
+    "api_key_sha256": hash_key("acme-key"),
+    "postmark_api_key": "acme-postmark",
+    "sender_email": "noreply@acme.example",
+}
+GLOBEX = {
+    "id": "globex",
+    "api_key_sha256": hash_key("globex-key"),
+    "postmark_api_key": "globex-postmark",
+}
+
+
+@pytest.fixture
+def tenants_file(tmp_path):
+    path = tmp_path / "tenants.json"
+    write_tenants(path, ACME, GLOBEX)
+    yield path
+    TENANTS.configure(None)
+
+
+def test_registry_authenticates_by_key_hash(tenants_file):
+    """Test API keys map to tenants through their SHA-256."""
+    registry = TenantRegistry(tenants_file)
+    registry.reload()
+
+    tenant = registry.authenticate("acme-key")
+    assert tenant.id == "acme"
+    assert tenant.values == {
+        "postmark_api_key": "acme-postmark",
+        "sender_email": "noreply@acme.example",
+    }
+    assert registry.authenticate("wrong-key") is None
+    assert len(registry) == 2
+
+
+def test_reload_reports_changed_and_removed_tenants(tenants_file):
+    """Test reloads return tenants whose cached dependencies must be closed."""
+    registry = TenantRegistry(tenants_file)
+    registry.reload()
+    assert registry.reload() is None  # unchanged file is not re-read
+
+    write_tenants(tenants_file, {**ACME, "sender_email": "hello@acme.example"})
+
+    assert registry.reload(force=True) == ["acme", "globex"]
+    assert registry.authenticate("globex-key") is None
+
+
+def test_invalid_file_keeps_previous_tenants(tenants_file):
+    """Test a broken tenants file leaves the loaded tenants in effect."""
+    registry = TenantRegistry(tenants_file)
+    registry.reload()
+    write_tenants(tenants_file, ACME, {**GLOBEX, "id": "acme"})
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        registry.reload(force=True)
+    assert registry.authenticate("globex-key").id == "globex"
+
+
+def test_tenant_dependencies_resolve_per_tenant():
+    """Test tenants get their own values and connection pools."""
+    populate_dependencies("server-postmark", "server@example.com", Settings())
+    default_transport = DEPENDENCIES.get("mail_transport")
+
+    token = current_tenant.set(Tenant("acme", {"postmark_api_key": "acme-postmark"}))
+    try:
+        assert DEPENDENCIES.get("postmark_api_key") == "acme-postmark"
+        assert DEPENDENCIES.get("sender_email") == "server@example.com"
+        transport = DEPENDENCIES.get("mail_transport")
+        assert DEPENDENCIES.get("outbox").annotate() == {"tenant": "acme"}
+    finally:
+        current_tenant.reset(token)
+
+    assert transport is not default_transport
+    assert transport.routes[0][0].username == "acme-postmark"
+    assert [breaker.name for breaker in transport.breakers] == ["acme/smtp"]
+    assert DEPENDENCIES.get("postmark_api_key") == "server-postmark"
+    assert DEPENDENCIES.get("outbox").annotate() == {}
+
+
+def test_middleware_accepts_tenant_keys_except_on_admin_routes(tenants_file):
+    """Test tenant keys reach MCP routes but not admin routes."""
+    server = MCPServer(api_key="server-key", config=Settings(TENANTS_FILE=str(tenants_file)))
+
+    with TestClient(server.create_app()) as client:
+        assert client.get("/metrics", headers={"X-API-Key": "acme-key"}).status_code == 403
+        assert client.get("/metrics", headers={"X-API-Key": "server-key"}).status_code == 200
+        assert client.get("/metrics", headers={"X-API-Key": "other-key"}).status_code == 401
+
+        response = client.post("/messages/", headers={"X-API-Key": "acme-key"})
+        assert response.status_code not in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_reload_closes_pools_of_changed_tenants(tenants_file):
+    """Test changing a tenant discards its cached connection pools."""
+    server = MCPServer(api_key="server-key", config=Settings(TENANTS_FILE=str(tenants_file)))
+    populate_dependencies("server-postmark", "server@example.com", Settings())
+    await server.reload_tenants(force=True)
+
+    token = current_tenant.set(TENANTS.get("acme"))
+    try:
+        client = DEPENDENCIES.get("http_client")
+    finally:
+        current_tenant.reset(token)
+
+    write_tenants(tenants_file, {**ACME, "postmark_api_key": "rotated"}, GLOBEX)
+    assert await server.reload_tenants(force=True) == ["acme"]
+
+    assert client.is_closed
+    token = current_tenant.set(TENANTS.get("acme"))
+    try:
+        assert DEPENDENCIES.get("postmark_api_key") == "rotated"
+    finally:
+        current_tenant.reset(token)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_counted_per_tenant(tenants_file):
+    """Test usage counters record each known tool call under its tenant."""
+    server = MCPServer(api_key="server-key", config=Settings(TENANTS_FILE=str(tenants_file)))
+    TENANTS.usage.clear()
+
+    async def status_tool() -> str:
+        return "ok"
+
+    server.register_tool(status_tool)
+    token = current_tenant.set(Tenant("acme"))
+    try:
+        for name in ("status_tool", "status_tool", "unknown_tool"):
+            await server._handle_call_tool(types.CallToolRequest(
+                method="tools/call", params=types.CallToolRequestParams(name=name, arguments={})
+            ))
+    finally:
+        current_tenant.reset(token)
+
+    assert TENANTS.usage == {("acme", "status_tool", "success"): 2}
+    assert 'mcp_tenant_tool_calls_total{tenant="acme",tool="status_tool",outcome="success"} 2' in (
+        METRICS.render()
+    )
@@ -0,0 +1,177 @@
+"""
+Unit tests for tracing.py and the spans emitted by the server.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import mcp.types as types
+import pytest
+from starlette.testclient import TestClient
+
+from src.config import Settings
+from src.mcp_tools import MCPServer
+from src.tracing import (
+    NOOP_SPAN,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    parse_traceparent,
+    tracer,
+)
+from src.utils.email import send_email
+
+
+@pytest.fixture
+def exporter():
+    """Enable the process-wide tracer with an in-memory exporter."""
+    exporter = InMemorySpanExporter()
+    tracer.configure(1.0, exporter)
+    yield exporter
+    tracer.configure(0.0, None)
+
+
+def test_disabled_tracer_returns_noop_span():
+    """Test spans cost nothing when tracing is off."""
+    disabled = Tracer(sample_ratio=0.0, exporter=InMemorySpanExporter())
+
+    assert not disabled.enabled
+    assert disabled.span("anything") is NOOP_SPAN
+
+
+def test_child_spans_share_the_trace_of_their_parent():
+    """Test nested spans are parented and exported innermost first."""
+    exporter = InMemorySpanExporter()
+    local = Tracer(sample_ratio=1.0, exporter=exporter)
+
+    with local.span("outer") as outer:
+        with local.span("inner", {"k": "v"}) as inner:
+            pass
+
+    assert exporter.names() == ["inner", "outer"]
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_span_id == outer.span_id
+    assert inner.attributes == {"k": "v"}
+    assert outer.status == "OK"
+
+
+def test_unsampled_traces_skip_their_children():
+    """Test sampling is decided once at the root span."""
+    exporter = InMemorySpanExporter()
+    local = Tracer(sample_ratio=0.5, exporter=exporter)
+
+    with patch("src.tracing.random.random", return_value=0.9):
+        with local.span("root"):
+            assert local.span("child") is NOOP_SPAN
+
+    assert exporter.spans == []
+
+
+def test_span_records_exceptions():
+    """Test a failing block marks its span as an error."""
+    exporter = InMemorySpanExporter()
+    local = Tracer(sample_ratio=1.0, exporter=exporter)
+
+    with pytest.raises(ValueError):
+        with local.span("failing"):
+            raise ValueError("boom")
+
+    span = exporter.spans[0]
+    assert span.status == "ERROR"
+    assert span.attributes["exception.type"] == "ValueError"
+
+
+def test_traceparent_continues_remote_trace():
+    """Test an incoming W3C traceparent header is honoured."""
+    header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    local = Tracer(sample_ratio=1.0, exporter=InMemorySpanExporter())
+
+    with local.span("request", traceparent=header) as span:
+        pass
+
+    assert span.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert span.parent_span_id == "00f067aa0ba902b7"
+    assert parse_traceparent("garbage") is None
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path):
+    """Test spans are buffered and written with OTLP field names."""
+    path = tmp_path / "traces.jsonl"
+    local = Tracer(sample_ratio=1.0, exporter=FileSpanExporter(path, buffer_size=10))
+
+    with local.span("one"):
+        pass
+    assert not path.exists()
+
+    local.shutdown()
+    record = json.loads(path.read_text().strip())
+    assert record["name"] == "one"
+    assert record["status"] == {"code": "OK"}
+    assert len(record["traceId"]) == 32
+    assert record["endTimeUnixNano"] >= record["startTimeUnixNano"]
+
+
+@pytest.mark.asyncio
+async def test_send_email_records_each_smtp_stage(exporter):
+    """Test the legacy SMTP path gets a span per protocol stage."""
+    mock_server = MagicMock()
+    mock_server.__enter__ = MagicMock(return_value=mock_server)
+    mock_server.__exit__ = MagicMock(return_value=None)
+
+    with patch("smtplib.SMTP", return_value=mock_server):
+        with tracer.span("test"):
+            await send_email(
+                recipients=["user@example.com"],
+                subject="Subject",
+                body="Body",
+                api_key="key",
+                from_email="sender@example.com",
+            )
+
+    assert exporter.names() == [
+        "email.validate",
+        "email.build_message",
+        "smtp.connect",
+        "smtp.starttls",
+        "smtp.auth",
+        "smtp.data",
+        "email.send",
+        "test",
+    ]
+    trace_ids = {span.trace_id for span in exporter.spans}
+    assert len(trace_ids) == 1
+
+
+@pytest.mark.asyncio
+async def test_call_tool_starts_a_trace_per_call(exporter):
+    """Test tool calls are traced from dispatch down to the action."""
+    server = MCPServer(api_key="test-key", config=Settings())
+
+    @server.register_tool
+    async def echo_tool(text: str) -> str:
+        with tracer.span("work"):
+            return text
+
+    handler = server.mcp._mcp_server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name="echo_tool", arguments={"text": "hi"}),
+    )
+    await handler(request)
+
+    assert exporter.names() == ["work", "mcp.call_tool"]
+    work, call = exporter.spans
+    assert call.parent_span_id is None
+    assert call.attributes["mcp.tool"] == "echo_tool"
+    assert work.parent_span_id == call.span_id
+
+
+def test_middleware_span_records_status(exporter):
+    """Test authenticated requests are wrapped in an http.request span."""
+    client = TestClient(MCPServer(api_key="test-key").create_app())
+
+    client.get("/sse", headers={"X-API-Key": "wrong"})
+    client.get("/health/live")
+
+    assert exporter.names() == ["http.request"]
+    assert exporter.spans[0].attributes["http.status_code"] == 401
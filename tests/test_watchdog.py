@@ -0,0 +1,95 @@
+"""
+Unit tests for watchdog.py and the profiling endpoint.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.mcp_tools import MCPServer, make_wrapper
+from src.watchdog import Watchdog, sample_stacks
+
+
+async def blocking_action(seconds: float) -> str:
+    """Action that wrongly blocks the event loop."""
+    time.sleep(seconds)
+    return "done"
+
+
+@pytest.mark.asyncio
+async def test_watchdog_attributes_stall_to_tool():
+    """Test a blocking call inside a tool is reported with its stack and tool name."""
+    watchdog = Watchdog(stall_threshold=0.05, interval=0.01)
+    await watchdog.start()
+    heartbeat = asyncio.create_task(watchdog.heartbeat())
+    try:
+        await asyncio.sleep(0.05)
+        await make_wrapper(blocking_action)(seconds=0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        heartbeat.cancel()
+        await watchdog.stop()
+
+    assert watchdog.stall_count == 1
+    stall = watchdog.stalls[0]
+    assert stall.tool == "blocking_tool"
+    assert "time.sleep(seconds)" in stall.stack
+    assert stall.duration >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_watchdog_ignores_responsive_loop():
+    """Test short callbacks are not reported."""
+    watchdog = Watchdog(stall_threshold=0.1, interval=0.01)
+    await watchdog.start()
+    heartbeat = asyncio.create_task(watchdog.heartbeat())
+    try:
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+    finally:
+        heartbeat.cancel()
+        await watchdog.stop()
+
+    assert watchdog.stall_count == 0
+
+
+def busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_returns_folded_stacks():
+    """Test samples are folded into flamegraph-compatible lines."""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="busy")
+    worker.start()
+    try:
+        folded = sample_stacks(0.1, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    busy_lines = [line for line in folded.splitlines() if line.startswith("busy;")]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    assert "tests.test_watchdog.busy_worker" in stack
+    assert int(count) > 0
+
+
+def test_profile_endpoint_requires_api_key():
+    """Test the profiling endpoint is authenticated and validates its input."""
+    client = TestClient(MCPServer(api_key="test-key").create_app())
+
+    assert client.get("/admin/profile?seconds=0.05").status_code == 401
+
+    headers = {"X-API-Key": "test-key"}
+    response = client.get("/admin/profile?seconds=0.05&interval=0.005", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text.strip()
+
+    assert client.get("/admin/profile?seconds=999", headers=headers).status_code == 400
+    assert client.get("/admin/profile?seconds=abc", headers=headers).status_code == 400